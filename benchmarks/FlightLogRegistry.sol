@@ -0,0 +1,35 @@
+// SPDX-License-Identifier: MIT
+// Matches services/FlightLogRegistry_abi.json; deployed on the local
+// chain by the benchmark suite.
+pragma solidity ^0.8.20;
+
+contract FlightLogRegistry {
+    struct FlightLog {
+        string s3Key;
+        uint256 timestamp;
+        address uploader;
+    }
+
+    mapping(bytes32 => FlightLog) public flightLogs;
+
+    event FlightLogged(
+        bytes32 indexed missionId,
+        string s3Key,
+        uint256 timestamp,
+        address indexed uploader
+    );
+
+    function logFlight(bytes32 missionId, string calldata s3Key) external {
+        flightLogs[missionId] = FlightLog(s3Key, block.timestamp, msg.sender);
+        emit FlightLogged(missionId, s3Key, block.timestamp, msg.sender);
+    }
+
+    function getFlight(bytes32 missionId)
+        external
+        view
+        returns (string memory s3Key, uint256 timestamp, address uploader)
+    {
+        FlightLog storage f = flightLogs[missionId];
+        return (f.s3Key, f.timestamp, f.uploader);
+    }
+}
@@ -0,0 +1,123 @@
+# benchmarks/local_chain.py
+
+import os
+from pathlib import Path
+from typing import Optional
+
+from web3 import Web3
+
+from services.fee_oracle import FeeOracle
+from services.flight_registry import registry_abi
+from services.nonce_manager import NonceManager, send_signed
+
+HERE = Path(__file__).resolve().parent
+SOURCE_PATH = HERE / "FlightLogRegistry.sol"
+SOLC_VERSION = os.getenv("BENCH_SOLC_VERSION", "0.8.24")
+
+# First dev account of anvil / hardhat node; funded on those chains.
+DEV_NODE_PRIVATE_KEY = "0xac0974bec39a17e36ba4a6b4d238ff944bacb478cbed5efcae784d7bf4f2ff80"
+# Throwaway key funded from the eth-tester coinbase.
+TESTER_PRIVATE_KEY = "0x" + "42" * 32
+TESTER_FUNDING_WEI = 10**21
+
+
+class LocalChain:
+    """A Web3 connection, a funded account and a deployed FlightLogRegistry."""
+
+    def __init__(self, w3, account, contract, backend: str):
+        self.w3 = w3
+        self.account = account
+        self.contract = contract
+        self.backend = backend
+        self._nonces = NonceManager(w3, account.address)
+        self._oracle = FeeOracle(w3)
+        self._chain_id = w3.eth.chain_id
+
+    def send(self, fn) -> str:
+        """
+        Sign and send the contract call `fn` the way FlightRegistry.send
+        does (shared nonces, cached fees) and return the tx hash.
+        """
+        def _send(nonce):
+            tx = fn.build_transaction(self._oracle.tx_params(fn, {
+                "from": self.account.address,
+                "nonce": nonce,
+                "chainId": self._chain_id,
+            }))
+            return send_signed(self.w3, self.account.sign_transaction(tx))
+
+        return Web3.to_hex(self._nonces.send(_send))
+
+
+def contract_bytecode(bytecode_path: Optional[str] = None) -> str:
+    """
+    Creation bytecode for FlightLogRegistry: read from `bytecode_path`, or
+    compiled from FlightLogRegistry.sol with py-solc-x.
+    """
+    if bytecode_path:
+        return Path(bytecode_path).read_text().strip()
+    try:
+        import solcx
+    except ImportError:
+        raise RuntimeError(
+            "Compiling FlightLogRegistry.sol needs py-solc-x; "
+            "install it or pass --bytecode <file>"
+        )
+    if SOLC_VERSION not in [str(v) for v in solcx.get_installed_solc_versions()]:
+        solcx.install_solc(SOLC_VERSION)
+    out = solcx.compile_files(
+        [str(SOURCE_PATH)], output_values=["bin"], solc_version=SOLC_VERSION
+    )
+    return next(v["bin"] for k, v in out.items() if k.endswith(":FlightLogRegistry"))
+
+
+def _tester_web3():
+    try:
+        from web3 import EthereumTesterProvider
+        w3 = Web3(EthereumTesterProvider())
+        w3.eth.chain_id  # fails here if eth-tester's py-evm backend is missing
+    except Exception as e:
+        raise RuntimeError(
+            f"In-process EVM unavailable ({e}); install eth-tester[py-evm] "
+            "or pass --rpc-url of a local node (anvil, hardhat)"
+        )
+    account = w3.eth.account.from_key(TESTER_PRIVATE_KEY)
+    w3.eth.wait_for_transaction_receipt(w3.eth.send_transaction({
+        "from": w3.eth.accounts[0],
+        "to": account.address,
+        "value": TESTER_FUNDING_WEI,
+    }))
+    return w3, account
+
+
+def start_local_chain(rpc_url: Optional[str] = None, bytecode_path: Optional[str] = None) -> LocalChain:
+    """
+    Connect to a local EVM and deploy a fresh FlightLogRegistry.
+
+    With `rpc_url` (a dev node such as anvil or hardhat) the key comes from
+    BENCH_PRIVATE_KEY, defaulting to the nodes' first dev account;
+    otherwise an in-process eth-tester chain is used.
+    """
+    if rpc_url:
+        w3 = Web3(Web3.HTTPProvider(rpc_url))
+        if not w3.is_connected():
+            raise RuntimeError(f"No node at {rpc_url}")
+        account = w3.eth.account.from_key(os.getenv("BENCH_PRIVATE_KEY", DEV_NODE_PRIVATE_KEY))
+        backend = rpc_url
+    else:
+        w3, account = _tester_web3()
+        backend = "eth-tester"
+
+    abi = registry_abi()
+    factory = w3.eth.contract(abi=abi, bytecode=contract_bytecode(bytecode_path))
+    constructor = factory.constructor()
+    tx = constructor.build_transaction(FeeOracle(w3).tx_params(constructor, {
+        "from": account.address,
+        "nonce": w3.eth.get_transaction_count(account.address),
+        "chainId": w3.eth.chain_id,
+    }))
+    signed = account.sign_transaction(tx)
+    receipt = w3.eth.wait_for_transaction_receipt(w3.eth.send_raw_transaction(signed.raw_transaction))
+
+    contract = w3.eth.contract(address=receipt.contractAddress, abi=abi)
+    return LocalChain(w3, account, contract, backend)
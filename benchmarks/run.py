@@ -0,0 +1,311 @@
+import os
+import sys
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# --- Bootstrap Django settings (same as services/logUploadSim.py) ---
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "uavledger.settings")
+
+import django
+django.setup()
+
+from django.test import override_settings
+from django.test.utils import setup_databases, teardown_databases
+from web3 import Web3
+
+from benchmarks.s3_stub import InMemoryS3
+from services.chain_health import LatencyWindow
+from storage.s3_client import set_s3_client, flight_key
+
+BENCH_BUCKET = "uav-ledger-bench"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, text=True
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def write_log(path: Path, size_mb: int, seed: int = 0):
+    """Synthetic telemetry log of roughly `size_mb` MiB (CSV-like lines)."""
+    rng = random.Random(seed)
+    target = size_mb * 1024 * 1024
+    written = 0
+    with open(path, "w") as f:
+        t = 0
+        while written < target:
+            line = (
+                f"{t},{rng.uniform(-90, 90):.6f},{rng.uniform(-180, 180):.6f},"
+                f"{rng.uniform(0, 500):.2f},{rng.uniform(0, 40):.2f},{rng.randint(0, 100)}\n"
+            )
+            f.write(line)
+            written += len(line)
+            t += 10
+
+
+# -----------------------------
+# S3 side
+# -----------------------------
+def bench_simulate_uploads(workdir: Path, size_mb: int, chunks: int, repeats: int) -> dict:
+    from services.logUploadSim import simulate_uploads
+
+    source = workdir / "flight.log"
+    write_log(source, size_mb)
+    source_bytes = source.stat().st_size
+
+    out = {"source_bytes": source_bytes, "chunks": chunks}
+    # "segmented" is the gzip segment + manifest layout (mode is ignored there)
+    for name, layout, mode in (
+        ("full", "object", "full"),
+        ("append", "object", "append"),
+        ("segmented", "segmented", "full"),
+    ):
+        runs = []
+        for r in range(repeats):
+            s3 = InMemoryS3()
+            set_s3_client(s3)
+            with override_settings(AWS_S3_FLIGHT_LAYOUT=layout), \
+                    contextlib.redirect_stdout(io.StringIO()):
+                seconds, _ = timed(
+                    simulate_uploads, source, f"bench-{name}-{r}", chunks, BENCH_BUCKET, mode
+                )
+            runs.append(seconds)
+        best = min(runs)
+        out[name] = {
+            "seconds": runs,
+            "best_seconds": round(best, 4),
+            "source_mb_per_s": round(source_bytes / best / 2**20, 2),
+            "bytes_sent": s3.bytes_in,
+            "bytes_stored": s3.stored_bytes,
+            "s3_calls": dict(s3.calls),
+        }
+    return out
+
+
+def seed_bucket(s3: InMemoryS3, flights: int, versions_per_flight: int):
+    for i in range(flights):
+        key = flight_key(f"flight-{i:05d}")
+        for v in range(versions_per_flight):
+            s3.put_object(Bucket=BENCH_BUCKET, Key=key, Body=b"x" * (v + 1))
+
+
+def bench_list_flight_ids(s3: InMemoryS3, repeats: int) -> dict:
+    from storage.utils import list_flight_ids
+
+    window = LatencyWindow(size=repeats)
+    before = s3.calls["ListObjectsV2"]
+    for _ in range(repeats):
+        seconds, flights = timed(list_flight_ids)
+        window.record(seconds)
+    return {
+        "flights": len(flights),
+        "list_calls_per_run": (s3.calls["ListObjectsV2"] - before) // repeats,
+        "latency_ms": window.summary(),
+    }
+
+
+def bench_list_versions(s3: InMemoryS3, flights: int, sample: int) -> dict:
+    from storage.utils import list_versions
+
+    ids = [f"flight-{i:05d}" for i in range(flights)]
+
+    # Index every flight so the table is at full size, then time lookups
+    build_seconds = 0.0
+    for flight_id in ids:
+        seconds, _ = timed(list_versions, flight_id)
+        build_seconds += seconds
+
+    picked = random.Random(1).sample(ids, min(sample, len(ids)))
+
+    def run():
+        window = LatencyWindow(size=len(picked))
+        for flight_id in picked:
+            seconds, _ = timed(list_versions, flight_id)
+            window.record(seconds)
+        return window.summary()
+
+    warm = run()
+    for flight_id in picked:
+        s3.put_object(Bucket=BENCH_BUCKET, Key=flight_key(flight_id), Body=b"new")
+    after_append = run()
+
+    return {
+        "index_build_seconds": round(build_seconds, 3),
+        "sample": len(picked),
+        "warm_latency_ms": warm,
+        "one_new_version_latency_ms": after_append,
+    }
+
+
+def run_s3(args, workdir: Path) -> dict:
+    results = {"simulate_uploads": bench_simulate_uploads(workdir, args.size_mb, args.chunks, args.repeats)}
+
+    s3 = InMemoryS3()
+    set_s3_client(s3)
+    seconds, _ = timed(seed_bucket, s3, args.flights, args.versions_per_flight)
+    print(f"Seeded {args.flights} flights x {args.versions_per_flight} versions in {seconds:.1f}s")
+
+    results["list_flight_ids"] = bench_list_flight_ids(s3, args.repeats)
+    results["list_versions"] = bench_list_versions(s3, args.flights, args.sample)
+    return results
+
+
+# -----------------------------
+# Chain side
+# -----------------------------
+def bench_tx_submit(chain, count: int) -> dict:
+    """logFlight sends through NonceManager + FeeOracle, as send_txn does."""
+    from services.fee_oracle import FeeOracle
+    from services.nonce_manager import NonceManager, send_signed
+
+    w3, account, contract = chain.w3, chain.account, chain.contract
+    nonces = NonceManager(w3, account.address)
+    oracle = FeeOracle(w3)
+    chain_id = w3.eth.chain_id
+
+    keys = [Web3.keccak(text=f"bench-mission-{i}") for i in range(count)]
+
+    def send(key):
+        fn = contract.functions.logFlight(key, f"flights/{key.hex()}/flight.log")
+
+        def _send(nonce):
+            tx = fn.build_transaction(oracle.tx_params(fn, {
+                "from": account.address,
+                "nonce": nonce,
+                "chainId": chain_id,
+            }))
+            return send_signed(w3, account.sign_transaction(tx))
+
+        return nonces.send(_send)
+
+    start = time.perf_counter()
+    hashes = [send(k) for k in keys]
+    submitted = time.perf_counter() - start
+    receipts = [w3.eth.wait_for_transaction_receipt(h) for h in hashes]
+    mined = time.perf_counter() - start
+
+    return {
+        "transactions": count,
+        "submit_seconds": round(submitted, 3),
+        "submit_tx_per_s": round(count / submitted, 1),
+        "mined_seconds": round(mined, 3),
+        "mined_tx_per_s": round(count / mined, 1),
+        "reverted": sum(1 for r in receipts if r.status != 1),
+    }, keys
+
+
+def bench_get_flight(chain, keys, reads: int) -> dict:
+    from services.multicall import get_flights
+
+    rng = random.Random(2)
+    window = LatencyWindow(size=reads)
+    start = time.perf_counter()
+    for _ in range(reads):
+        t = time.perf_counter()
+        chain.contract.functions.getFlight(rng.choice(keys)).call()
+        window.record(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    out = {"reads": reads, "qps": round(reads / elapsed, 1), "latency_ms": window.summary()}
+
+    try:
+        seconds, (_, flights) = timed(get_flights, chain.w3, chain.contract, keys)
+        out["bulk"] = {
+            "missions": len(keys),
+            "seconds": round(seconds, 4),
+            "missions_per_s": round(len(keys) / seconds, 1),
+            "failed": sum(1 for f in flights if f is None),
+        }
+    except Exception as e:
+        out["bulk"] = {"error": str(e)}
+    return out
+
+
+def run_chain(args) -> dict:
+    from benchmarks.local_chain import start_local_chain
+
+    try:
+        chain = start_local_chain(args.rpc_url, args.bytecode)
+    except Exception as e:
+        print(f"Skipping chain benchmarks: {e}")
+        return {"skipped": str(e)}
+
+    submit, keys = bench_tx_submit(chain, args.tx)
+    return {
+        "backend": chain.backend,
+        "tx_submit": submit,
+        "get_flight": bench_get_flight(chain, keys, args.reads),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Offline benchmarks against an in-memory S3 bucket and a local EVM."
+    )
+    parser.add_argument("--only", choices=["s3", "chain"], default=None, help="Run one side only.")
+    parser.add_argument("--out", default=None, help="Results file (defaults to benchmarks/results/<time>-<commit>.json).")
+    parser.add_argument("--repeats", type=int, default=3, help="Repetitions for the timed S3 runs.")
+    parser.add_argument("--size-mb", type=int, default=64, help="Size of the synthetic flight log.")
+    parser.add_argument("--chunks", type=int, default=10, help="Cumulative uploads per simulated flight.")
+    parser.add_argument("--flights", type=int, default=10_000, help="Flights in the seeded bucket.")
+    parser.add_argument("--versions-per-flight", type=int, default=5, help="Versions per seeded flight.")
+    parser.add_argument("--sample", type=int, default=500, help="Flights timed for list_versions.")
+    parser.add_argument("--tx", type=int, default=200, help="logFlight transactions to submit.")
+    parser.add_argument("--reads", type=int, default=2000, help="Single getFlight calls to time.")
+    parser.add_argument("--rpc-url", default=None, help="Local dev node (anvil, hardhat); default is in-process eth-tester.")
+    parser.add_argument("--bytecode", default=None, help="File with FlightLogRegistry creation bytecode (skips solc).")
+    args = parser.parse_args()
+
+    results = {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": vars(args),
+        "benchmarks": {},
+    }
+
+    if args.only in (None, "s3"):
+        # Fresh test database, so the dev database is never touched
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with override_settings(AWS_S3_BUCKET=BENCH_BUCKET), tempfile.TemporaryDirectory() as tmp:
+                results["benchmarks"]["s3"] = run_s3(args, Path(tmp))
+        finally:
+            set_s3_client(None)
+            teardown_databases(old_config, verbosity=0)
+
+    if args.only in (None, "chain"):
+        results["benchmarks"]["chain"] = run_chain(args)
+
+    out = Path(args.out) if args.out else RESULTS_DIR / (
+        f"{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}-{results['commit']}.json"
+    )
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2, default=str))
+    print(json.dumps(results["benchmarks"], indent=2, default=str))
+    print(f"Results written to {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+# benchmarks/s3_stub.py
+
+import bisect
+import hashlib
+import io
+import threading
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+from botocore.exceptions import ClientError
+from botocore.response import StreamingBody
+
+LIST_PAGE_SIZE = 1000  # S3's own cap on MaxKeys
+
+
+def _error(code: str, message: str, operation: str):
+    return ClientError({"Error": {"Code": code, "Message": message}}, operation)
+
+
+def _read_body(body) -> bytes:
+    if isinstance(body, (bytes, bytearray, memoryview)):
+        return bytes(body)
+    return body.read()
+
+
+def _parse_range(header: str, size: int, operation: str):
+    # "bytes=a-b" (inclusive) -> [a, b + 1)
+    start, _, end = header[len("bytes="):].partition("-")
+    if not start:
+        return max(size - int(end), 0), size
+    if int(start) >= size:
+        raise _error("InvalidRange", "The requested range is not satisfiable", operation)
+    return int(start), min(int(end) + 1 if end else size, size)
+
+
+class _Version:
+    __slots__ = ("version_id", "data", "etag", "last_modified", "content_type")
+
+    def __init__(self, data: bytes, content_type: str = "binary/octet-stream", etag: str = None):
+        self.version_id = uuid.uuid4().hex
+        self.data = data
+        self.etag = etag or f'"{hashlib.md5(data).hexdigest()}"'
+        self.last_modified = datetime.now(timezone.utc)
+        self.content_type = content_type
+
+
+class InMemoryS3:
+    """
+    In-process stand-in for a versioned S3 bucket, covering the client
+    calls this project makes (put/get/head, multipart with UploadPartCopy,
+    list_objects_v2 with or without a Delimiter, list_object_versions).
+
+    Listing pages, version ordering and error codes follow S3, so code
+    under test makes the same number of calls it would against AWS;
+    `calls` counts them per operation and `bytes_in` counts request
+    payload bytes (what would have gone over the wire). Thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._objects = {}  # (bucket, key) -> [_Version, ...] oldest first
+        self._keys = {}  # bucket -> sorted [key, ...]
+        self._uploads = {}  # upload id -> (bucket, key, content type, {part no: bytes})
+        self.calls = Counter()
+        self.bytes_in = 0
+
+    def _count(self, operation: str, nbytes: int = 0):
+        with self._lock:
+            self.calls[operation] += 1
+            self.bytes_in += nbytes
+
+    @property
+    def stored_bytes(self) -> int:
+        """Bytes held across all object versions (what S3 would bill)."""
+        with self._lock:
+            return sum(len(v.data) for versions in self._objects.values() for v in versions)
+
+    # ------------------------------------------------------------------
+    # Objects
+    # ------------------------------------------------------------------
+    def _store(self, bucket: str, key: str, version: _Version) -> _Version:
+        with self._lock:
+            versions = self._objects.get((bucket, key))
+            if versions is None:
+                versions = self._objects[(bucket, key)] = []
+                bisect.insort(self._keys.setdefault(bucket, []), key)
+            versions.append(version)
+        return version
+
+    def _version(self, bucket: str, key: str, version_id, operation: str) -> _Version:
+        versions = self._objects.get((bucket, key))
+        if not versions:
+            raise _error("NoSuchKey", "The specified key does not exist.", operation)
+        if version_id is None:
+            return versions[-1]
+        for v in versions:
+            if v.version_id == version_id:
+                return v
+        raise _error("NoSuchVersion", "The specified version does not exist.", operation)
+
+    def put_object(self, Bucket, Key, Body=b"", ContentType="binary/octet-stream", **kwargs):
+        data = _read_body(Body)
+        self._count("PutObject", len(data))
+        v = self._store(Bucket, Key, _Version(data, ContentType))
+        return {"ETag": v.etag, "VersionId": v.version_id}
+
+    def get_object(self, Bucket, Key, VersionId=None, Range=None, **kwargs):
+        self._count("GetObject")
+        with self._lock:
+            v = self._version(Bucket, Key, VersionId, "GetObject")
+        data = v.data
+        resp = {"VersionId": v.version_id, "ETag": v.etag, "LastModified": v.last_modified,
+                "ContentType": v.content_type, "AcceptRanges": "bytes"}
+        if Range:
+            start, end = _parse_range(Range, len(data), "GetObject")
+            resp["ContentRange"] = f"bytes {start}-{end - 1}/{len(data)}"
+            data = data[start:end]
+        resp["ContentLength"] = len(data)
+        resp["Body"] = StreamingBody(io.BytesIO(data), len(data))
+        return resp
+
+    def head_object(self, Bucket, Key, VersionId=None, **kwargs):
+        self._count("HeadObject")
+        with self._lock:
+            v = self._version(Bucket, Key, VersionId, "HeadObject")
+        return {"VersionId": v.version_id, "ETag": v.etag, "LastModified": v.last_modified,
+                "ContentLength": len(v.data), "ContentType": v.content_type}
+
+    # ------------------------------------------------------------------
+    # Multipart
+    # ------------------------------------------------------------------
+    def create_multipart_upload(self, Bucket, Key, ContentType="binary/octet-stream", **kwargs):
+        self._count("CreateMultipartUpload")
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            self._uploads[upload_id] = (Bucket, Key, ContentType, {})
+        return {"Bucket": Bucket, "Key": Key, "UploadId": upload_id}
+
+    def _parts(self, upload_id: str, operation: str) -> dict:
+        upload = self._uploads.get(upload_id)
+        if upload is None:
+            raise _error("NoSuchUpload", "The specified upload does not exist.", operation)
+        return upload[3]
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body, **kwargs):
+        data = _read_body(Body)
+        self._count("UploadPart", len(data))
+        with self._lock:
+            self._parts(UploadId, "UploadPart")[PartNumber] = data
+        return {"ETag": f'"{hashlib.md5(data).hexdigest()}"'}
+
+    def upload_part_copy(self, Bucket, Key, UploadId, PartNumber, CopySource, CopySourceRange=None, **kwargs):
+        self._count("UploadPartCopy")
+        with self._lock:
+            source = self._version(
+                CopySource["Bucket"], CopySource["Key"], CopySource.get("VersionId"), "UploadPartCopy"
+            )
+            data = source.data
+            if CopySourceRange:
+                start, end = _parse_range(CopySourceRange, len(data), "UploadPartCopy")
+                data = data[start:end]
+            self._parts(UploadId, "UploadPartCopy")[PartNumber] = data
+        return {"CopyPartResult": {"ETag": f'"{hashlib.md5(data).hexdigest()}"'}}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload, **kwargs):
+        self._count("CompleteMultipartUpload")
+        with self._lock:
+            parts = self._parts(UploadId, "CompleteMultipartUpload")
+            _, _, content_type, _ = self._uploads.pop(UploadId)
+        numbers = [p["PartNumber"] for p in MultipartUpload["Parts"]]
+        data = b"".join(parts[n] for n in numbers)
+        v = self._store(Bucket, Key, _Version(data, content_type, etag=f'"{uuid.uuid4().hex}-{len(numbers)}"'))
+        return {"Bucket": Bucket, "Key": Key, "ETag": v.etag, "VersionId": v.version_id}
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId, **kwargs):
+        self._count("AbortMultipartUpload")
+        with self._lock:
+            self._uploads.pop(UploadId, None)
+        return {}
+
+    # ------------------------------------------------------------------
+    # Listing
+    # ------------------------------------------------------------------
+    def _keys_from(self, bucket: str, prefix: str, marker: str = None):
+        """Keys under `prefix` in order, from `marker` (inclusive) on."""
+        keys = self._keys.get(bucket, [])
+        i = bisect.bisect_left(keys, max(prefix, marker or ""))
+        while i < len(keys) and keys[i].startswith(prefix):
+            yield keys[i]
+            i += 1
+
+    def list_objects_v2(self, Bucket, Prefix="", MaxKeys=LIST_PAGE_SIZE, ContinuationToken=None,
+                        Delimiter=None, **kwargs):
+        self._count("ListObjectsV2")
+        limit = min(MaxKeys, LIST_PAGE_SIZE)
+        contents, prefixes = [], []
+        # The token is the last key or common prefix returned
+        last = ContinuationToken
+        with self._lock:
+            for key in self._keys_from(Bucket, Prefix, ContinuationToken):
+                if last is not None and (key == last or (Delimiter and key.startswith(last)
+                                                         and last.endswith(Delimiter))):
+                    continue
+                cut = key.find(Delimiter, len(Prefix)) if Delimiter else -1
+                if len(contents) + len(prefixes) == limit:
+                    resp = {"KeyCount": limit, "IsTruncated": True, "NextContinuationToken": last}
+                    break
+                if cut >= 0:
+                    # Keys below a delimiter roll up into one common prefix
+                    last = key[:cut + len(Delimiter)]
+                    prefixes.append({"Prefix": last})
+                    continue
+                last = key
+                v = self._objects[(Bucket, key)][-1]
+                contents.append({"Key": key, "Size": len(v.data), "ETag": v.etag,
+                                 "LastModified": v.last_modified})
+            else:
+                resp = {"KeyCount": len(contents) + len(prefixes), "IsTruncated": False}
+        resp["Contents"] = contents
+        if prefixes:
+            resp["CommonPrefixes"] = prefixes
+        return resp
+
+    def list_object_versions(self, Bucket, Prefix="", MaxKeys=LIST_PAGE_SIZE,
+                             KeyMarker=None, VersionIdMarker=None, **kwargs):
+        self._count("ListObjectVersions")
+        limit = min(MaxKeys, LIST_PAGE_SIZE)
+        out = []
+        with self._lock:
+            # Keys ascending, each key's versions newest first
+            for key in self._keys_from(Bucket, Prefix, KeyMarker):
+                versions = self._objects[(Bucket, key)][::-1]
+                if key == KeyMarker:
+                    if not VersionIdMarker:
+                        continue
+                    ids = [v.version_id for v in versions]
+                    versions = versions[ids.index(VersionIdMarker) + 1:] if VersionIdMarker in ids else []
+                latest = self._objects[(Bucket, key)][-1]
+                for v in versions:
+                    if len(out) == limit:
+                        return {"Versions": out, "IsTruncated": True,
+                                "NextKeyMarker": out[-1]["Key"],
+                                "NextVersionIdMarker": out[-1]["VersionId"]}
+                    out.append({"Key": key, "VersionId": v.version_id, "IsLatest": v is latest,
+                                "Size": len(v.data), "ETag": v.etag, "LastModified": v.last_modified})
+        return {"Versions": out, "IsTruncated": False}
@@ -1,3 +1,15 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import (
+    CheckpointBatch,
+    CheckpointProof,
+    FlightLogEvent,
+    IndexerCursor,
+    TransactionJob,
+)
+
+admin.site.register(CheckpointBatch)
+admin.site.register(CheckpointProof)
+admin.site.register(TransactionJob)
+admin.site.register(FlightLogEvent)
+admin.site.register(IndexerCursor)
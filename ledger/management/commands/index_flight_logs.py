@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+
+from services.flight_registry import flight_registry
+from services.flight_indexer import (
+    DEFAULT_CONFIRMATIONS,
+    FlightLogIndexer,
+)
+
+
+class Command(BaseCommand):
+    help = "Backfill FlightLogged events into the database and optionally keep following new blocks."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from-block",
+            type=int,
+            default=0,
+            help="Block to start from when there is no saved cursor yet (e.g. the contract deploy block).",
+        )
+        parser.add_argument(
+            "--confirmations",
+            type=int,
+            default=DEFAULT_CONFIRMATIONS,
+            help="Only index blocks this far behind head.",
+        )
+        parser.add_argument(
+            "--follow",
+            action="store_true",
+            help="Keep running and index new blocks as they arrive.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=12.0,
+            help="Seconds between polls with --follow.",
+        )
+
+    def handle(self, *args, **options):
+        registry = flight_registry()
+        indexer = FlightLogIndexer(
+            registry.w3, registry.contract, confirmations=options["confirmations"]
+        )
+
+        # Web processes pick the stored events up themselves
+        # (flight_cache.observe_indexed_events)
+        def report(events):
+            self.stdout.write(
+                f"Indexed {len(events)} events up to block {events[-1]['blockNumber']}"
+            )
+
+        if options["follow"]:
+            indexer.follow(
+                start_block=options["from_block"],
+                interval=options["interval"],
+                on_events=report,
+            )
+            return
+
+        stored = indexer.run_once(start_block=options["from_block"], on_events=report)
+        self.stdout.write(self.style.SUCCESS(
+            f"Done: {stored} new events, cursor at block {indexer.cursor()}"
+        ))
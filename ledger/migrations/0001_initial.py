@@ -0,0 +1,45 @@
+# Generated by Django 4.2.25 on 2026-10-17 03:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheckpointBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('merkle_root', models.CharField(max_length=66, unique=True)),
+                ('leaf_count', models.PositiveIntegerField()),
+                ('label', models.CharField(max_length=255)),
+                ('tx_hash', models.CharField(blank=True, max_length=66)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CheckpointProof',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('flight_id', models.CharField(max_length=255)),
+                ('seq_no', models.PositiveIntegerField()),
+                ('tip_hash', models.CharField(max_length=66)),
+                ('s3_bucket', models.CharField(max_length=255)),
+                ('s3_key', models.CharField(max_length=1024)),
+                ('s3_version_id', models.CharField(blank=True, max_length=1024)),
+                ('leaf_index', models.PositiveIntegerField()),
+                ('leaf_hash', models.CharField(max_length=66)),
+                ('proof', models.JSONField(default=list)),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='proofs', to='ledger.checkpointbatch')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['flight_id', 'seq_no'], name='ledger_chec_flight__df2e9c_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.25 on 2026-10-17 03:41
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TransactionJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('mission_id', models.CharField(max_length=255)),
+                ('mission_key', models.CharField(max_length=66)),
+                ('s3_key', models.CharField(max_length=1024)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('sent', 'Sent'), ('mined', 'Mined'), ('failed', 'Failed')], db_index=True, default='queued', max_length=16)),
+                ('tx_hash', models.CharField(blank=True, max_length=66)),
+                ('block_number', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('receipt_status', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('gas_used', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.25 on 2026-10-17 03:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ledger', '0002_transactionjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlightLogEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mission_key', models.CharField(db_index=True, max_length=66)),
+                ('s3_key', models.CharField(db_index=True, max_length=1024)),
+                ('timestamp', models.PositiveBigIntegerField()),
+                ('uploader', models.CharField(db_index=True, max_length=42)),
+                ('tx_hash', models.CharField(max_length=66)),
+                ('log_index', models.PositiveIntegerField()),
+                ('block_number', models.PositiveBigIntegerField(db_index=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='IndexerCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=64, unique=True)),
+                ('last_block', models.PositiveBigIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='flightlogevent',
+            constraint=models.UniqueConstraint(fields=('tx_hash', 'log_index'), name='unique_flight_log_event'),
+        ),
+    ]
@@ -1,3 +1,104 @@
+import uuid
+
 from django.db import models
 
-# Create your models here.
+
+class CheckpointBatch(models.Model):
+    """
+    One Merkle root committed on chain for a batch of flight checkpoints.
+    """
+    merkle_root = models.CharField(max_length=66, unique=True)
+    leaf_count = models.PositiveIntegerField()
+    label = models.CharField(max_length=255)  # s3Key argument sent to logFlight
+    tx_hash = models.CharField(max_length=66, blank=True)  # blank while pending (not yet sent)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.merkle_root} ({self.leaf_count} checkpoints)"
+
+
+class CheckpointProof(models.Model):
+    """
+    A checkpoint and its inclusion proof against its batch's Merkle root.
+    """
+    batch = models.ForeignKey(CheckpointBatch, related_name="proofs", on_delete=models.CASCADE)
+    flight_id = models.CharField(max_length=255)
+    seq_no = models.PositiveIntegerField()
+    tip_hash = models.CharField(max_length=66)
+    s3_bucket = models.CharField(max_length=255)
+    s3_key = models.CharField(max_length=1024)
+    s3_version_id = models.CharField(max_length=1024, blank=True)
+    leaf_index = models.PositiveIntegerField()
+    leaf_hash = models.CharField(max_length=66)
+    proof = models.JSONField(default=list)  # sibling hashes, leaf level first
+
+    class Meta:
+        indexes = [models.Index(fields=["flight_id", "seq_no"])]
+
+    def __str__(self):
+        return f"{self.flight_id} #{self.seq_no}"
+
+
+class TransactionJob(models.Model):
+    """
+    A logFlight transaction handed to the background submission queue.
+    """
+    QUEUED = "queued"
+    SENT = "sent"
+    MINED = "mined"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (SENT, "Sent"),
+        (MINED, "Mined"),
+        (FAILED, "Failed"),
+    ]
+
+    job_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    mission_id = models.CharField(max_length=255)
+    mission_key = models.CharField(max_length=66)
+    s3_key = models.CharField(max_length=1024)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=QUEUED, db_index=True)
+    tx_hash = models.CharField(max_length=66, blank=True)
+    block_number = models.PositiveBigIntegerField(null=True, blank=True)
+    receipt_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    gas_used = models.PositiveBigIntegerField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.mission_id} [{self.status}]"
+
+
+class FlightLogEvent(models.Model):
+    """
+    A FlightLogged event copied from chain by the indexer.
+    """
+    mission_key = models.CharField(max_length=66, db_index=True)
+    s3_key = models.CharField(max_length=1024, db_index=True)
+    timestamp = models.PositiveBigIntegerField()
+    uploader = models.CharField(max_length=42, db_index=True)
+    tx_hash = models.CharField(max_length=66)
+    log_index = models.PositiveIntegerField()
+    block_number = models.PositiveBigIntegerField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["tx_hash", "log_index"], name="unique_flight_log_event"),
+        ]
+
+    def __str__(self):
+        return f"{self.mission_key} @ {self.block_number}"
+
+
+class IndexerCursor(models.Model):
+    """
+    Last block an indexer has fully processed, so restarts resume there.
+    """
+    name = models.CharField(max_length=64, unique=True)
+    last_block = models.PositiveBigIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name}: {self.last_block}"
@@ -1,3 +1,287 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase, TestCase
+from eth_account import Account
+from web3 import Web3
+
+from services.checkpoint_batcher import CheckpointBatcher
+from services import flight_cache
+from services.flight_cache import FlightCache
+from services.flight_registry import registry_abi
+from services.merkle import build_tree, checkpoint_leaf, hash_pair, merkle_proof, merkle_root, verify_proof
+from services.multicall import _via_rpc_batch
+from services.nonce_manager import NonceManager, send_signed
+from .models import CheckpointBatch, CheckpointProof, FlightLogEvent
+
+
+def checkpoint(seq_no: int, flight_id: str = "f1") -> dict:
+    return {
+        "flightId": flight_id,
+        "seqNo": seq_no,
+        "tipHash": "0x" + f"{seq_no:064x}",
+        "s3Bucket": "bucket",
+        "s3Key": f"flights/{flight_id}/flight.log",
+        "s3VersionId": f"v{seq_no}",
+    }
+
+
+class MerkleTests(TestCase):
+    def test_every_leaf_proves_against_the_root(self):
+        for count in (1, 2, 3, 5, 8, 13):
+            leaves = [checkpoint_leaf(checkpoint(i)) for i in range(count)]
+            levels = build_tree(leaves)
+            root = merkle_root(levels)
+            for i, leaf in enumerate(leaves):
+                self.assertTrue(verify_proof(leaf, merkle_proof(levels, i), root), (count, i))
+
+    def test_proof_fails_for_another_leaf_or_root(self):
+        leaves = [checkpoint_leaf(checkpoint(i)) for i in range(4)]
+        levels = build_tree(leaves)
+        proof = merkle_proof(levels, 1)
+        self.assertFalse(verify_proof(leaves[2], proof, merkle_root(levels)))
+        self.assertFalse(verify_proof(leaves[1], proof, Web3.keccak(b"other")))
+
+    def test_pairs_are_sorted(self):
+        a, b = Web3.keccak(b"a"), Web3.keccak(b"b")
+        self.assertEqual(hash_pair(a, b), hash_pair(b, a))
+
+    def test_leaf_covers_every_checkpoint_field(self):
+        leaf = checkpoint_leaf(checkpoint(1))
+        for field, value in (("seqNo", 2), ("s3VersionId", "v2"), ("tipHash", "0x" + "ff" * 32)):
+            self.assertNotEqual(checkpoint_leaf(dict(checkpoint(1), **{field: value})), leaf)
+
+    def test_empty_tree_is_rejected(self):
+        with self.assertRaises(ValueError):
+            build_tree([])
+
+
+class CheckpointBatcherTests(TestCase):
+    def test_flush_stores_a_proof_per_checkpoint(self):
+        sent = []
+        batcher = CheckpointBatcher(submit=lambda root, label: sent.append(root) or "0xabc")
+        for i in range(5):
+            batcher.add(checkpoint(i))
+        batch = batcher.flush()
+
+        self.assertEqual(len(sent), 1)
+        self.assertEqual(batch.tx_hash, "0xabc")
+        self.assertEqual(batch.merkle_root, Web3.to_hex(sent[0]))
+        for proof in CheckpointProof.objects.filter(batch=batch):
+            self.assertTrue(verify_proof(
+                Web3.to_bytes(hexstr=proof.leaf_hash),
+                [Web3.to_bytes(hexstr=p) for p in proof.proof],
+                sent[0],
+            ))
+
+    def test_max_batch_flushes(self):
+        batcher = CheckpointBatcher(max_batch=3, submit=lambda root, label: "0xabc")
+        for i in range(7):
+            batcher.add(checkpoint(i))
+        self.assertEqual(CheckpointBatch.objects.count(), 2)
+        self.assertEqual(CheckpointProof.objects.count(), 6)
+
+    def test_failed_send_keeps_a_pending_batch_and_is_retried_once(self):
+        def fail(root, label):
+            raise RuntimeError("node down")
+
+        batcher = CheckpointBatcher(submit=fail)
+        for i in range(3):
+            batcher.add(checkpoint(i))
+        with self.assertRaises(RuntimeError):
+            batcher.flush()
+        self.assertEqual(CheckpointBatch.objects.get().tx_hash, "")  # pending
+
+        sent = []
+        batcher.submit = lambda root, label: sent.append(root) or "0xabc"
+        batch = batcher.flush()
+        self.assertEqual(CheckpointBatch.objects.get().tx_hash, "0xabc")
+        self.assertEqual(CheckpointProof.objects.count(), 3)
+
+        # The same root again is already sent: no second transaction
+        for i in range(3):
+            batcher.add(checkpoint(i))
+        self.assertEqual(batcher.flush().pk, batch.pk)
+        self.assertEqual(len(sent), 1)
+
+
+class FlightCacheTests(SimpleTestCase):
+    key = "0x" + "01" * 32
+
+    def setUp(self):
+        patcher = mock.patch("services.flight_cache.time.monotonic", return_value=1000.0)
+        self.clock = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_entries_expire_after_ttl(self):
+        cache = FlightCache(ttl=60)
+        cache.put(self.key, ("k", 1, "0xabc"))
+        self.clock.return_value = 1059.0
+        self.assertEqual(cache.get(self.key), ("k", 1, "0xabc"))
+        self.clock.return_value = 1060.0
+        self.assertIsNone(cache.get(self.key))
+
+    def test_ttl_applies_when_blocks_are_known(self):
+        # A process that saw one block and then stopped observing them
+        cache = FlightCache(ttl=60, max_age_blocks=5)
+        cache.observe_block(100)
+        cache.put(self.key, ("k", 1, "0xabc"), block=100)
+        self.clock.return_value = 1061.0
+        self.assertIsNone(cache.get(self.key))
+
+    def test_entries_expire_by_block_distance(self):
+        cache = FlightCache(ttl=60, max_age_blocks=5)
+        cache.put(self.key, ("k", 1, "0xabc"), block=100)
+        cache.observe_block(105)
+        self.assertIsNotNone(cache.get(self.key))
+        cache.observe_block(106)
+        self.assertIsNone(cache.get(self.key))
+
+    def test_events_invalidate(self):
+        cache = FlightCache()
+        cache.put(self.key, ("k", 1, "0xabc"))
+        cache.observe_events([{"args": {"missionId": bytes.fromhex("01" * 32)}}])
+        self.assertIsNone(cache.get(self.key))
+        self.assertEqual(cache.stats()["invalidations"], 1)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = FlightCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.get("a"), cache.get("c")), (1, 3))
+
+
+class IndexedEventsTests(TestCase):
+    key = "0x" + "01" * 32
+
+    def setUp(self):
+        patcher = mock.patch("services.flight_cache.time.monotonic", return_value=1000.0)
+        self.clock = patcher.start()
+        self.addCleanup(patcher.stop)
+        for name, value in (("_cache", FlightCache()), ("_indexed", {"pk": None, "checked_at": 0.0})):
+            patcher = mock.patch.object(flight_cache, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def log_event(self, mission_key, log_index=0):
+        FlightLogEvent.objects.create(
+            mission_key=mission_key, s3_key="flights/a", timestamp=1, uploader="0x" + "33" * 20,
+            tx_hash="0x" + "44" * 32, log_index=log_index, block_number=10,
+        )
+
+    def test_events_indexed_by_another_process_invalidate(self):
+        self.log_event(self.key)  # before this process cached anything
+        cache = flight_cache.flight_cache()
+        flight_cache.observe_indexed_events()
+        cache.put(self.key, ("k", 1, "0xabc"))
+        cache.put("other", ("o", 1, "0xabc"))
+
+        self.log_event(self.key, log_index=1)
+        flight_cache.observe_indexed_events()  # within the interval
+        self.assertIsNotNone(cache.get(self.key))
+
+        self.clock.return_value += flight_cache.INDEXED_EVENTS_INTERVAL_SECONDS
+        flight_cache.observe_indexed_events()
+        self.assertIsNone(cache.get(self.key))
+        self.assertIsNotNone(cache.get("other"))
+
+
+class _FakeEth:
+    def __init__(self, error=None):
+        self.error = error
+        self.sent = []
+
+    def get_transaction_count(self, address, block):
+        return 7
+
+    def send_raw_transaction(self, raw):
+        self.sent.append(raw)
+        if self.error:
+            raise ValueError({"code": -32000, "message": self.error})
+        return Web3.keccak(raw)
+
+
+class _FakeW3:
+    def __init__(self, error=None):
+        self.eth = _FakeEth(error)
+
+
+class NonceManagerTests(SimpleTestCase):
+    def signed(self, nonce=0):
+        account = Account.from_key("0x" + "11" * 32)
+        return account.sign_transaction({
+            "to": account.address, "value": 0, "gas": 21000, "gasPrice": 1, "nonce": nonce, "chainId": 1,
+        })
+
+    def test_already_known_transaction_counts_as_sent(self):
+        w3 = _FakeW3("already known")
+        signed = self.signed()
+        self.assertEqual(send_signed(w3, signed), signed.hash)
+
+        nonces = NonceManager(w3, "0xabc")
+        tx_hash = nonces.send(lambda nonce: send_signed(w3, self.signed(nonce)))
+        self.assertEqual(tx_hash, self.signed(7).hash)
+        self.assertEqual(len(w3.eth.sent), 2)  # one broadcast each, no retry
+        self.assertEqual(nonces.allocate(), 8)  # the known tx keeps its nonce
+
+    def test_already_known_error_is_not_retried_with_a_new_nonce(self):
+        nonces = NonceManager(_FakeW3(), "0xabc")
+        used = []
+
+        def send(nonce):
+            used.append(nonce)
+            raise ValueError("known transaction: 0x12")
+
+        with self.assertRaises(ValueError):
+            nonces.send(send)
+        self.assertEqual(used, [7])
+
+    def test_nonce_errors_resync_and_retry(self):
+        nonces = NonceManager(_FakeW3(), "0xabc")
+        used = []
+
+        def send(nonce):
+            used.append(nonce)
+            if len(used) == 1:
+                raise ValueError("nonce too low")
+            return "0xhash"
+
+        self.assertEqual(nonces.send(send), "0xhash")
+        self.assertEqual(used, [7, 7])
+
+
+class _BatchProvider:
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = None
+
+    def make_batch_request(self, requests):
+        self.requests = requests
+        return self.responses
+
+
+class RpcBatchTests(SimpleTestCase):
+    def setUp(self):
+        self.w3 = Web3()
+        self.contract = self.w3.eth.contract(address="0x" + "22" * 20, abi=registry_abi())
+
+    def test_failed_call_yields_none(self):
+        flight = self.w3.codec.encode(["string", "uint256", "address"], ["flights/a", 5, "0x" + "33" * 20])
+        self.w3.provider = _BatchProvider([
+            {"jsonrpc": "2.0", "id": 0, "result": Web3.to_hex(flight)},
+            {"jsonrpc": "2.0", "id": 1, "error": {"code": 3, "message": "execution reverted"}},
+            {"jsonrpc": "2.0", "id": 2, "result": "0x"},
+        ])
+        keys = [Web3.keccak(text=str(i)) for i in range(3)]
+        results = _via_rpc_batch(self.w3, self.contract, keys, 12)
+
+        self.assertEqual(results[0][:2], ("flights/a", 5))
+        self.assertEqual(results[1:], [None, None])
+        self.assertEqual(self.w3.provider.requests[0][1][1], "0xc")  # pinned block
+
+    def test_rejected_batch_raises(self):
+        self.w3.provider = _BatchProvider({"jsonrpc": "2.0", "error": {"code": -32600, "message": "too big"}})
+        with self.assertRaises(RuntimeError):
+            _via_rpc_batch(self.w3, self.contract, [Web3.keccak(text="a")], "latest")
@@ -1,15 +1,15 @@
-# uavledger/urls.py
+# ledger/urls.py
 
-from django.contrib import admin
 from django.urls import path
 from . import views
 
 urlpatterns = [
-    path("admin/", admin.site.urls),
-
     # Ethereum status endpoint
     path("eth/status/", views.eth_status, name="eth_status"),
 
+    # Read many mission flights from the blockchain at one block
+    path("api/missions", views.get_missions, name="get_missions"),
+
     # Log a mission flight to the blockchain
     path(
         "api/missions/<str:mission_id>/log",
@@ -23,4 +23,18 @@ urlpatterns = [
         views.get_mission,
         name="get_mission",
     ),
+
+    # List / search missions from the local event index
+    path(
+        "api/missions/events",
+        views.list_mission_events,
+        name="list_mission_events",
+    ),
+
+    # Status of a queued log_mission transaction
+    path(
+        "api/missions/jobs/<uuid:job_id>",
+        views.mission_job_status,
+        name="mission_job_status",
+    ),
 ]
@@ -1,30 +1,41 @@
 # uavledger/views.py
 
+from asgiref.sync import sync_to_async
 from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
 import json
 import hashlib
-from services.contract import (
-    w3,
-    get_chain_info,
-    contract,
-    send_txn,
-)
+from web3 import Web3
+from services.flight_cache import flight_cache, indexed_events_due, observe_indexed_events
+from services.flight_registry import flight_registry
+from services.multicall import get_flights
+from services.tx_queue import default_queue
+from .models import FlightLogEvent, TransactionJob
+
+
+def _mission_key(mission_id: str) -> bytes:
+    """Convert missionId → bytes32"""
+    if mission_id.startswith("0x"):
+        return Web3.to_bytes(hexstr=mission_id)
+    return hashlib.sha256(mission_id.encode()).digest()
+
 
 # -----------------------------
 # ETH STATUS ENDPOINT
+# (async; the snapshot is normally ready, only the first call polls)
 # -----------------------------
-def eth_status(request):
-    info = get_chain_info()
+async def eth_status(request):
+    info = await sync_to_async(flight_registry().chain_info, thread_sensitive=False)()
+    info["flight_cache"] = flight_cache().stats()
     return JsonResponse(info)
 
 
 # -----------------------------
 # LOG MISSION → blockchain
 # POST /api/missions/<mission_id>/log
+# Queues the transaction and returns a job id right away;
+# poll the job status endpoint for sent / mined / failed.
 # -----------------------------
-@csrf_exempt
-def log_mission(request, mission_id):
+async def log_mission(request, mission_id):
     if request.method != "POST":
         return JsonResponse({"error": "POST required"}, status=400)
 
@@ -35,37 +46,39 @@ def log_mission(request, mission_id):
         if not s3_key:
             return JsonResponse({"error": "Missing s3_key"}, status=400)
 
-        # Convert missionId → bytes32
-        mission_hash = Web3.to_bytes(hexstr=mission_id) if mission_id.startswith("0x") \
-                       else hashlib.sha256(mission_id.encode()).digest()
-
-        # Build blockchain transaction
-        tx_hash = send_txn(
-            contract.functions.logFlight(mission_hash, s3_key)
+        # Signing, sending and receipt polling happen on the queue worker
+        job = await sync_to_async(default_queue().submit)(
+            mission_id, _mission_key(mission_id), s3_key
         )
 
-        return JsonResponse({
-            "status": "submitted",
-            "tx_hash": tx_hash,
-            "mission_id": mission_id,
-            "s3_key": s3_key,
-        })
+        return JsonResponse(_job_payload(job), status=202)
 
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
 
 
+# Django 4.2's @csrf_exempt wraps views in a sync function, which would
+# hide the coroutine, so mark the async view directly.
+log_mission.csrf_exempt = True
+
+
 # -----------------------------
 # GET MISSION LOG → blockchain
 # GET /api/missions/<mission_id>/log/details
+# (async; cache misses are read with AsyncWeb3)
 # -----------------------------
-def get_mission(request, mission_id):
+async def get_mission(request, mission_id):
     try:
-        # Convert missionId → bytes32
-        mission_hash = Web3.to_bytes(hexstr=mission_id) if mission_id.startswith("0x") \
-                       else hashlib.sha256(mission_id.encode()).digest()
+        mission_hash = _mission_key(mission_id)
 
-        s3_key, ts, uploader = contract.functions.getFlight(mission_hash).call()
+        if indexed_events_due():
+            await sync_to_async(observe_indexed_events)()
+        cache = flight_cache()
+        flight = cache.get(mission_hash)
+        if flight is None:
+            flight = tuple(await flight_registry().async_contract.functions.getFlight(mission_hash).call())
+            cache.put(mission_hash, flight)
+        s3_key, ts, uploader = flight
 
         return JsonResponse({
             "mission_id": mission_id,
@@ -77,3 +90,120 @@ def get_mission(request, mission_id):
 
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=500)
+
+
+# -----------------------------
+# BULK MISSION READ → blockchain
+# GET /api/missions?ids=a,b,c[&block=<n>]
+# Uncached missions are read at one block in one or a few round trips
+# (cached ones may be a few blocks older); passing block=<n> bypasses the
+# cache and reads every mission at that block.
+# -----------------------------
+MAX_BULK_MISSIONS = 1000
+
+
+def get_missions(request):
+    ids = [i for i in request.GET.get("ids", "").split(",") if i]
+    if not ids:
+        return JsonResponse({"error": "Missing ids"}, status=400)
+    if len(ids) > MAX_BULK_MISSIONS:
+        return JsonResponse({"error": f"At most {MAX_BULK_MISSIONS} ids per request"}, status=400)
+
+    try:
+        observe_indexed_events()
+        block = request.GET.get("block")
+        registry = flight_registry()
+        block_number, flights = get_flights(
+            registry.w3, registry.contract, [_mission_key(i) for i in ids],
+            int(block) if block else None,
+            cache=flight_cache(),
+        )
+
+        return JsonResponse({
+            "block_number": block_number,
+            "missions": [
+                {
+                    "mission_id": mission_id,
+                    "s3_key": f["s3_key"],
+                    "timestamp": f["timestamp"],
+                    "uploader": f["uploader"],
+                    "exists": f["exists"],
+                } if f else {"mission_id": mission_id, "error": "call failed"}
+                for mission_id, f in zip(ids, flights)
+            ],
+        })
+
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+# -----------------------------
+# LOG MISSION JOB STATUS
+# GET /api/missions/jobs/<job_id>
+# -----------------------------
+def _job_payload(job):
+    return {
+        "job_id": str(job.job_id),
+        "status": job.status,
+        "mission_id": job.mission_id,
+        "s3_key": job.s3_key,
+        "tx_hash": job.tx_hash or None,
+        "receipt": {
+            "block_number": job.block_number,
+            "status": job.receipt_status,
+            "gas_used": job.gas_used,
+        } if job.block_number is not None else None,
+        "error": job.error or None,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
+
+
+def mission_job_status(request, job_id):
+    try:
+        job = TransactionJob.objects.get(job_id=job_id)
+    except TransactionJob.DoesNotExist:
+        return JsonResponse({"error": "Unknown job"}, status=404)
+
+    return JsonResponse(_job_payload(job))
+
+
+# -----------------------------
+# LIST / SEARCH INDEXED MISSIONS (local DB, no RPC)
+# GET /api/missions/events?mission_id=&uploader=&s3_key=&limit=&offset=
+# Filled by `manage.py index_flight_logs`.
+# -----------------------------
+def list_mission_events(request):
+    events = FlightLogEvent.objects.order_by("-block_number", "-log_index")
+
+    mission_id = request.GET.get("mission_id")
+    if mission_id:
+        events = events.filter(mission_key=Web3.to_hex(_mission_key(mission_id)))
+    uploader = request.GET.get("uploader")
+    if uploader:
+        events = events.filter(uploader__iexact=uploader)
+    s3_key = request.GET.get("s3_key")
+    if s3_key:
+        events = events.filter(s3_key__startswith=s3_key)
+
+    try:
+        limit = min(int(request.GET.get("limit", 100)), 1000)
+        offset = max(int(request.GET.get("offset", 0)), 0)
+    except ValueError:
+        return JsonResponse({"error": "limit and offset must be integers"}, status=400)
+
+    return JsonResponse({
+        "events": [
+            {
+                "mission_key": e.mission_key,
+                "s3_key": e.s3_key,
+                "timestamp": e.timestamp,
+                "uploader": e.uploader,
+                "tx_hash": e.tx_hash,
+                "block_number": e.block_number,
+            }
+            for e in events[offset:offset + limit]
+        ],
+        "limit": limit,
+        "offset": offset,
+    })
@@ -0,0 +1,150 @@
+# services/chain_health.py
+
+import threading
+import time
+from collections import deque
+
+from services.flight_cache import flight_cache
+
+POLL_INTERVAL_SECONDS = 5.0
+LATENCY_SAMPLES = 1024  # most recent samples kept per RPC method
+
+
+class LatencyWindow:
+    """
+    Most recent RPC latencies for one method, with percentile summaries.
+    """
+
+    def __init__(self, size: int = LATENCY_SAMPLES):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+        self.errors = 0
+
+    def record(self, seconds: float, ok: bool = True):
+        self.samples.append(seconds)
+        self.count += 1
+        if not ok:
+            self.errors += 1
+
+    def summary(self) -> dict:
+        ordered = sorted(self.samples)
+
+        def pct(p):
+            if not ordered:
+                return None
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 2)
+
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "p50": pct(0.50),
+            "p90": pct(0.90),
+            "p99": pct(0.99),
+            "max": round(ordered[-1] * 1000, 2) if ordered else None,
+        }
+
+
+class ChainHealthMonitor:
+    """
+    Polls the node once per interval from a background thread and keeps a
+    snapshot for the status endpoints, so serving a health check costs no
+    RPC calls.
+
+    Each poll is a single eth_getBlockByNumber("latest"), which gives
+    connectivity, head number and head timestamp (for head lag); the chain
+    id is fetched once. Latency of every RPC made here is recorded per
+    method. The observed head is also fed to the flight cache.
+    """
+
+    def __init__(self, w3, interval: float = POLL_INTERVAL_SECONDS):
+        self.w3 = w3
+        self.interval = interval
+        self.latency = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._chain_id = None
+        self._snapshot = None
+
+    def _timed(self, method: str, fn):
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = fn()
+            ok = True
+            return result
+        finally:
+            with self._lock:
+                window = self.latency.setdefault(method, LatencyWindow())
+                window.record(time.perf_counter() - start, ok)
+
+    def poll_once(self) -> dict:
+        now = time.time()
+        try:
+            if self._chain_id is None:
+                self._chain_id = self._timed("eth_chainId", lambda: self.w3.eth.chain_id)
+            block = self._timed("eth_getBlockByNumber", lambda: self.w3.eth.get_block("latest"))
+        except Exception as e:
+            snapshot = {
+                "connected": False,
+                "node_chain_id": self._chain_id,
+                "latest_block": self._snapshot["latest_block"] if self._snapshot else None,
+                "head_lag_seconds": None,
+                "error": str(e),
+            }
+        else:
+            flight_cache().observe_block(block["number"])
+            snapshot = {
+                "connected": True,
+                "node_chain_id": self._chain_id,
+                "latest_block": block["number"],
+                "head_lag_seconds": round(now - block["timestamp"], 1),
+                "error": None,
+            }
+        snapshot["checked_at"] = now
+        with self._lock:
+            self._snapshot = snapshot
+        return snapshot
+
+    def snapshot(self) -> dict:
+        """
+        Latest poll result plus latency percentiles (ms). Starts the poller
+        on first use; only that very first call waits for an RPC.
+        """
+        self.start()
+        with self._lock:
+            snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.poll_once()
+        with self._lock:
+            latency = {m: w.summary() for m, w in self.latency.items()}
+        return dict(
+            snapshot,
+            snapshot_age_seconds=round(time.time() - snapshot["checked_at"], 1),
+            rpc_latency_ms=latency,
+        )
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="chain-health", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self.poll_once()
+            time.sleep(self.interval)
+
+
+_monitors = {}
+_monitors_lock = threading.Lock()
+
+
+def get_chain_monitor(w3) -> ChainHealthMonitor:
+    """One monitor per chain endpoint per process."""
+    endpoint = getattr(w3.provider, "endpoint_uri", None) or id(w3)
+    with _monitors_lock:
+        monitor = _monitors.get(endpoint)
+        if monitor is None:
+            monitor = _monitors[endpoint] = ChainHealthMonitor(w3)
+        return monitor
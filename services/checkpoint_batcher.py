@@ -0,0 +1,143 @@
+# services/checkpoint_batcher.py
+
+import logging
+import threading
+import time
+from typing import Optional
+
+from django.db import transaction
+from web3 import Web3
+
+from services.flight_registry import flight_registry
+from services.merkle import build_tree, checkpoint_leaf, merkle_proof, merkle_root
+
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_WAIT = 60.0  # seconds a checkpoint may sit in a partial batch
+
+logger = logging.getLogger(__name__)
+
+
+def submit_root(root: bytes, label: str) -> str:
+    """
+    Commit a batch root through FlightLogRegistry.logFlight(root, label).
+    """
+    # Looked up here so building batches does not need chain settings
+    registry = flight_registry()
+    return registry.send(registry.contract.functions.logFlight(root, label))
+
+
+class CheckpointBatcher:
+    """
+    Collects checkpoints from any number of flights and commits one Merkle
+    root per batch instead of one transaction per checkpoint.
+
+    A batch is flushed when it reaches `max_batch` checkpoints, when a new
+    checkpoint arrives and the oldest pending one is older than `max_wait`
+    seconds, or on an explicit flush(). Each flushed checkpoint is stored
+    with its inclusion proof (ledger.models.CheckpointProof). Safe to share
+    between threads.
+
+    A batch and its proofs are recorded as pending (no tx_hash) before the
+    root is sent, and a root that is already recorded is not built again:
+    a pending one is sent again (its last send failed or never finished),
+    a sent one is returned as is. Once a send succeeds it is never retried
+    because of a later database error.
+    """
+
+    def __init__(
+        self,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_wait: float = DEFAULT_MAX_WAIT,
+        submit=submit_root,
+    ):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.submit = submit
+        self._lock = threading.Lock()
+        self._pending = []
+        self._oldest = None
+
+    def add(self, checkpoint: dict):
+        with self._lock:
+            if not self._pending:
+                self._oldest = time.monotonic()
+            self._pending.append(checkpoint)
+            due = (
+                len(self._pending) >= self.max_batch
+                or time.monotonic() - self._oldest >= self.max_wait
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        """
+        Commit everything pending as one batch. Returns the CheckpointBatch,
+        or None if nothing was pending.
+        """
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return None
+        try:
+            return self._commit(batch)
+        except Exception:
+            # Keep the checkpoints for the next flush rather than dropping them
+            with self._lock:
+                self._pending[:0] = batch
+            raise
+
+    def _commit(self, checkpoints):
+        from ledger.models import CheckpointBatch, CheckpointProof
+
+        leaves = [checkpoint_leaf(c) for c in checkpoints]
+        levels = build_tree(leaves)
+        root = merkle_root(levels)
+        root_hex = Web3.to_hex(root)
+        label = f"checkpoint-batch:{root_hex}:{len(leaves)}"
+
+        with transaction.atomic():
+            batch, created = CheckpointBatch.objects.get_or_create(
+                merkle_root=root_hex,
+                defaults={"leaf_count": len(leaves), "label": label},
+            )
+            if created:
+                CheckpointProof.objects.bulk_create([
+                    CheckpointProof(
+                        batch=batch,
+                        flight_id=c["flightId"],
+                        seq_no=c["seqNo"],
+                        tip_hash=c["tipHash"],
+                        s3_bucket=c["s3Bucket"],
+                        s3_key=c["s3Key"],
+                        s3_version_id=c["s3VersionId"] or "",
+                        leaf_index=i,
+                        leaf_hash=Web3.to_hex(leaf),
+                        proof=[Web3.to_hex(p) for p in merkle_proof(levels, i)],
+                    )
+                    for i, (c, leaf) in enumerate(zip(checkpoints, leaves))
+                ])
+        if batch.tx_hash or not self.submit:
+            return batch
+
+        # A failed send raises and flush() re-queues; the pending row is reused
+        tx_hash = self.submit(root, label)
+        batch.tx_hash = tx_hash or ""
+        try:
+            CheckpointBatch.objects.filter(pk=batch.pk).update(tx_hash=batch.tx_hash)
+        except Exception:
+            # The root is on its way on chain; re-queuing would send it twice
+            logger.exception("Could not record tx %s for batch %s", batch.tx_hash, root_hex)
+        return batch
+
+
+_default_batcher: Optional[CheckpointBatcher] = None
+_default_lock = threading.Lock()
+
+
+def default_batcher() -> CheckpointBatcher:
+    """Process-wide batcher, so checkpoints from all flights share batches."""
+    global _default_batcher
+    with _default_lock:
+        if _default_batcher is None:
+            _default_batcher = CheckpointBatcher()
+        return _default_batcher
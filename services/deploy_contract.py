@@ -1,12 +1,8 @@
-import json
 from web3 import Web3
-import os
 from django.conf import settings
 
-# Load ABI
-ABI_PATH = os.path.join(os.path.dirname(__file__), "contract_abi.json")
-with open(ABI_PATH, "r") as f:
-    ABI = json.load(f)
+from services.fee_oracle import FeeOracle
+from services.flight_registry import registry_abi
 
 # Solidity contract bytecode (from your teammate)
 BYTECODE = "PASTE_YOUR_CONTRACT_BYTECODE_HERE"
@@ -17,20 +13,19 @@ def deploy_contract():
     account = web3.eth.account.from_key(private_key)
     address = account.address
 
-    contract = web3.eth.contract(abi=ABI, bytecode=BYTECODE)
+    contract = web3.eth.contract(abi=registry_abi(), bytecode=BYTECODE)
+    constructor = contract.constructor()
 
-    # Build transaction
-    tx = contract.constructor().build_transaction({
+    # Build transaction (EIP-1559 fees + estimated gas limit)
+    tx = constructor.build_transaction(FeeOracle(web3).tx_params(constructor, {
         "from": address,
         "nonce": web3.eth.get_transaction_count(address),
         "chainId": settings.CHAIN_ID,
-        "gas": 500000,
-        "gasPrice": web3.eth.gas_price
-    })
+    }))
 
     # Sign
     signed_tx = web3.eth.account.sign_transaction(tx, private_key)
-    tx_hash = web3.eth.send_raw_transaction(signed_tx.rawTransaction)
+    tx_hash = web3.eth.send_raw_transaction(signed_tx.raw_transaction)
 
     print("Deploying contract... tx hash:")
     print(web3.to_hex(tx_hash))
@@ -1,157 +1,20 @@
 # services/eth_client.py
 
-import os
-from dotenv import load_dotenv
 from web3 import Web3
 
-# Load variables from .env into environment
-load_dotenv()
+from services.flight_cache import flight_cache
+from services.flight_registry import flight_registry
+from services.multicall import get_flights
 
-# ==== Read values from .env ====
-ETH_RPC_URL = os.getenv("ETH_RPC_URL")
-CHAIN_ID = int(os.getenv("CHAIN_ID", "11155111"))  # default: Sepolia
-ETH_PRIVATE_KEY = os.getenv("ETH_PRIVATE_KEY")
-CONTRACT_ADDRESS_RAW = os.getenv("CONTRACT_ADDRESS")
-
-if not ETH_RPC_URL:
-    raise RuntimeError("ETH_RPC_URL is not set in .env")
-
-if not ETH_PRIVATE_KEY:
-    raise RuntimeError("ETH_PRIVATE_KEY is not set in .env")
-
-if not CONTRACT_ADDRESS_RAW:
-    raise RuntimeError("CONTRACT_ADDRESS is not set in .env")
-
-# Create a Web3 object that talks to Sepolia via your Infura URL
-w3 = Web3(Web3.HTTPProvider(ETH_RPC_URL))
-
-# Normalize contract address to checksum format
-CONTRACT_ADDRESS = Web3.to_checksum_address(CONTRACT_ADDRESS_RAW)
-
-# Derive the public address from the private key (this is your Sepolia wallet)
-ACCOUNT = w3.eth.account.from_key(ETH_PRIVATE_KEY)
-ACCOUNT_ADDRESS = ACCOUNT.address
-
-# ===========================
-# FlightLogRegistry ABI
-# (copied from Remix, simplified to just what we need)
-# ===========================
-FLIGHT_LOG_REGISTRY_ABI = [
-    {
-        "anonymous": False,
-        "inputs": [
-            {
-                "indexed": True,
-                "internalType": "bytes32",
-                "name": "missionId",
-                "type": "bytes32",
-            },
-            {
-                "indexed": False,
-                "internalType": "string",
-                "name": "s3Key",
-                "type": "string",
-            },
-            {
-                "indexed": False,
-                "internalType": "uint256",
-                "name": "timestamp",
-                "type": "uint256",
-            },
-            {
-                "indexed": True,
-                "internalType": "address",
-                "name": "uploader",
-                "type": "address",
-            },
-        ],
-        "name": "FlightLogged",
-        "type": "event",
-    },
-    {
-        "inputs": [
-            {
-                "internalType": "bytes32",
-                "name": "",
-                "type": "bytes32",
-            }
-        ],
-        "name": "flightLogs",
-        "outputs": [
-            {
-                "internalType": "string",
-                "name": "s3Key",
-                "type": "string",
-            },
-            {
-                "internalType": "uint256",
-                "name": "timestamp",
-                "type": "uint256",
-            },
-            {
-                "internalType": "address",
-                "name": "uploader",
-                "type": "address",
-            },
-        ],
-        "stateMutability": "view",
-        "type": "function",
-    },
-    {
-        "inputs": [
-            {
-                "internalType": "bytes32",
-                "name": "missionId",
-                "type": "bytes32",
-            }
-        ],
-        "name": "getFlight",
-        "outputs": [
-            {
-                "internalType": "string",
-                "name": "s3Key",
-                "type": "string",
-            },
-            {
-                "internalType": "uint256",
-                "name": "timestamp",
-                "type": "uint256",
-            },
-            {
-                "internalType": "address",
-                "name": "uploader",
-                "type": "address",
-            },
-        ],
-        "stateMutability": "view",
-        "type": "function",
-    },
-    {
-        "inputs": [
-            {
-                "internalType": "bytes32",
-                "name": "missionId",
-                "type": "bytes32",
-            },
-            {
-                "internalType": "string",
-                "name": "s3Key",
-                "type": "string",
-            },
-        ],
-        "name": "logFlight",
-        "outputs": [],
-        "stateMutability": "nonpayable",
-        "type": "function",
-    },
-]
+# Connection, account and contract (ABI from FlightLogRegistry_abi.json)
+# come from the shared FlightLogRegistry client, built on first use.
 
 
 def get_contract():
     """
-    Build a Web3 contract object for FlightLogRegistry.
+    Web3 contract object for FlightLogRegistry.
     """
-    return w3.eth.contract(address=CONTRACT_ADDRESS, abi=FLIGHT_LOG_REGISTRY_ABI)
+    return flight_registry().contract
 
 
 def mission_id_to_bytes32(mission_id: str) -> bytes:
@@ -169,24 +32,12 @@ def get_chain_info():
     """
     Simple helper function that returns basic info
     about the chain we are connected to and the contract.
-    """
-    connected = w3.is_connected()
-    node_chain_id = None
-    latest_block = None
-
-    if connected:
-        node_chain_id = w3.eth.chain_id
-        latest_block = w3.eth.block_number
 
-    return {
-        "connected": connected,
-        "rpc_url": ETH_RPC_URL,
-        "configured_chain_id": CHAIN_ID,
-        "node_chain_id": node_chain_id,
-        "latest_block": latest_block,
-        "contract_address": CONTRACT_ADDRESS,
-        "account_address": ACCOUNT_ADDRESS,
-    }
+    Connectivity, chain id, head block, head lag and RPC latency
+    percentiles come from the shared ChainHealthMonitor, which polls
+    in the background, so this makes no RPC calls itself.
+    """
+    return flight_registry().chain_info()
 
 
 def log_flight_on_chain(mission_id: str, s3_key: str):
@@ -195,40 +46,29 @@ def log_flight_on_chain(mission_id: str, s3_key: str):
 
     Steps:
       1. Convert mission_id string -> bytes32 key.
-      2. Build transaction.
+      2. Build transaction with a nonce from the shared NonceManager.
       3. Sign transaction with our private key.
       4. Send to Sepolia and wait for receipt.
     """
+    registry = flight_registry()
+    w3 = registry.w3
     if not w3.is_connected():
         raise RuntimeError("Not connected to Ethereum node")
 
-    contract = get_contract()
     mission_key = mission_id_to_bytes32(mission_id)
 
-    # Build the transaction
-    nonce = w3.eth.get_transaction_count(ACCOUNT_ADDRESS)
-
-    tx = contract.functions.logFlight(mission_key, s3_key).build_transaction(
-        {
-            "from": ACCOUNT_ADDRESS,
-            "nonce": nonce,
-            "chainId": CHAIN_ID,
-            "gasPrice": w3.eth.gas_price,
-        }
-    )
-
-    # Sign with our private key
-    signed_tx = w3.eth.account.sign_transaction(tx, private_key=ETH_PRIVATE_KEY)
+    # Fees, gas limit and nonce come from the shared oracle / manager
+    tx_hash = registry.send(registry.contract.functions.logFlight(mission_key, s3_key))
 
-    # Send and wait for receipt
-    tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+    # Wait for receipt
     receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
+    flight_cache().invalidate(mission_key)
 
     return {
         "mission_id": mission_id,
         "mission_key": mission_key.hex(),
         "s3_key": s3_key,
-        "transaction_hash": tx_hash.hex(),
+        "transaction_hash": tx_hash,
         "block_number": receipt.block_number,
         "status": receipt.status,
     }
@@ -248,13 +88,15 @@ def get_flight_from_chain(mission_id: str):
         "exists": True/False
       }
     """
-    if not w3.is_connected():
-        raise RuntimeError("Not connected to Ethereum node")
-
-    contract = get_contract()
     mission_key = mission_id_to_bytes32(mission_id)
 
-    s3_key, timestamp, uploader = contract.functions.getFlight(mission_key).call()
+    def _load():
+        if not flight_registry().w3.is_connected():
+            raise RuntimeError("Not connected to Ethereum node")
+        return tuple(get_contract().functions.getFlight(mission_key).call())
+
+    # Served from the block-aware cache when possible
+    s3_key, timestamp, uploader = flight_cache().get_or_load(mission_key, _load)
 
     # If no log yet, s3_key will be empty string.
     exists = s3_key != ""
@@ -267,3 +109,32 @@ def get_flight_from_chain(mission_id: str):
         "uploader": uploader,
         "exists": exists,
     }
+
+
+def get_flights_from_chain(mission_ids, block_identifier=None):
+    """
+    Bulk version of get_flight_from_chain: one Multicall3 (or JSON-RPC
+    batch) round trip per 200 uncached missions, all read at the same block
+    (cached missions may be a few blocks older; a `block_identifier`
+    bypasses the cache so every mission is read at that block).
+
+    Returns:
+      {
+        "block_number": <int>,
+        "flights": [ same shape as get_flight_from_chain, ... ]
+      }
+    """
+    mission_ids = list(mission_ids)
+    keys = [mission_id_to_bytes32(m) for m in mission_ids]
+    registry = flight_registry()
+    block, flights = get_flights(
+        registry.w3, registry.contract, keys, block_identifier, cache=flight_cache()
+    )
+
+    return {
+        "block_number": block,
+        "flights": [
+            dict(flight, mission_id=mission_id) if flight else None
+            for mission_id, flight in zip(mission_ids, flights)
+        ],
+    }
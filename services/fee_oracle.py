@@ -0,0 +1,108 @@
+# services/fee_oracle.py
+
+import threading
+import time
+
+# How long fee data is trusted before it is refreshed.
+FEE_TTL_SECONDS = 12.0  # ~one Ethereum slot
+# Headroom on top of eth_estimateGas, for state that changes between the
+# estimate and the transaction landing.
+GAS_MULTIPLIER = 1.25
+# maxFeePerGas = BASE_FEE_MULTIPLIER * baseFee + priority fee, which
+# survives several full blocks of base-fee increases.
+BASE_FEE_MULTIPLIER = 2
+
+
+class FeeOracle:
+    """
+    Cached EIP-1559 fee data and gas limits for transaction builders.
+
+    Fees (base fee of the latest block and the node's suggested priority
+    fee) are cached for FEE_TTL_SECONDS and, once start() is called, kept
+    fresh by a background thread, so building a transaction normally costs
+    one RPC call, the gas estimate. Gas is estimated per transaction: what
+    a state-writing call costs depends on the storage it touches (logFlight
+    writing a new mission's slots costs several times an overwrite), not
+    only on its signature and arguments. Chains without a base fee fall
+    back to legacy gasPrice.
+    """
+
+    def __init__(self, w3, fee_ttl: float = FEE_TTL_SECONDS):
+        self.w3 = w3
+        self.fee_ttl = fee_ttl
+        self._lock = threading.Lock()
+        self._fees = None
+        self._fees_at = 0.0
+        self._thread = None
+
+    def _fetch_fees(self) -> dict:
+        base_fee = self.w3.eth.get_block("latest").get("baseFeePerGas")
+        if base_fee is None:
+            return {"gasPrice": self.w3.eth.gas_price}
+        priority_fee = self.w3.eth.max_priority_fee
+        return {
+            "maxFeePerGas": BASE_FEE_MULTIPLIER * base_fee + priority_fee,
+            "maxPriorityFeePerGas": priority_fee,
+        }
+
+    def refresh(self):
+        fees = self._fetch_fees()
+        with self._lock:
+            self._fees = fees
+            self._fees_at = time.monotonic()
+        return fees
+
+    def fees(self) -> dict:
+        """Fee fields for a transaction dict (EIP-1559 or legacy)."""
+        with self._lock:
+            if self._fees is not None and time.monotonic() - self._fees_at < self.fee_ttl:
+                return dict(self._fees)
+        return dict(self.refresh())
+
+    def gas_for(self, fn, tx: dict) -> int:
+        """
+        Gas limit for the bound contract function `fn` (or constructor)
+        against current chain state. Never cached: a limit estimated for
+        an overwrite runs a first write out of gas.
+        """
+        return int(fn.estimate_gas({"from": tx["from"]}) * GAS_MULTIPLIER)
+
+    def tx_params(self, fn, tx: dict) -> dict:
+        """`tx` plus cached fee fields and a gas limit for `fn`."""
+        params = dict(tx)
+        params.update(self.fees())
+        params.setdefault("gas", self.gas_for(fn, tx))
+        return params
+
+    def start(self):
+        """Refresh fees in the background every half TTL."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="fee-oracle", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception:
+                pass  # keep serving the last known fees; fees() refetches when stale
+            time.sleep(self.fee_ttl / 2)
+
+
+_oracles = {}
+_oracles_lock = threading.Lock()
+
+
+def get_fee_oracle(w3) -> FeeOracle:
+    """
+    One background-refreshed oracle per chain endpoint per process.
+    """
+    endpoint = getattr(w3.provider, "endpoint_uri", None) or id(w3)
+    with _oracles_lock:
+        oracle = _oracles.get(endpoint)
+        if oracle is None:
+            oracle = _oracles[endpoint] = FeeOracle(w3)
+            oracle.start()
+        return oracle
@@ -0,0 +1,202 @@
+# services/flight_cache.py
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from web3 import Web3
+
+DEFAULT_MAX_ENTRIES = 50_000
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+# An entry is served for at most this many seconds...
+DEFAULT_TTL_SECONDS = 60.0
+# ...and, once block numbers are observed, only while an entry read at
+# block N is no older than head N + MAX_AGE_BLOCKS.
+DEFAULT_MAX_AGE_BLOCKS = 5
+
+
+def _key(mission_key) -> str:
+    return mission_key if isinstance(mission_key, str) else Web3.to_hex(mission_key)
+
+
+def _sizeof(value) -> int:
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(sys.getsizeof(v) for v in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sys.getsizeof(v) for v in value.values())
+    return sys.getsizeof(value)
+
+
+class FlightCache:
+    """
+    Read-through LRU cache of getFlight results keyed by bytes32 mission key.
+
+    A mission only changes when a FlightLogged event is emitted for it, so
+    entries are dropped when such an event (or our own mined logFlight) is
+    observed, and otherwise age out by wall-clock TTL or, sooner, by block
+    number where the head is observed (observe_block). Bounded by entry count and approximate
+    memory; least recently used entries are evicted first. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        max_age_blocks: int = DEFAULT_MAX_AGE_BLOCKS,
+        ttl: float = DEFAULT_TTL_SECONDS,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age_blocks = max_age_blocks
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (value, block, stored_at, size)
+        self._bytes = 0
+        self._head: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _fresh(self, block, stored_at) -> bool:
+        # The TTL always applies: processes that never observe blocks (or
+        # stop observing them) must not serve an entry forever.
+        if time.monotonic() - stored_at >= self.ttl:
+            return False
+        if self._head is not None and block is not None:
+            return self._head - block <= self.max_age_blocks
+        return True
+
+    def _drop(self, key):
+        _, _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, mission_key):
+        """Cached value, or None on a miss."""
+        key = _key(mission_key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self._fresh(entry[1], entry[2]):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                self._drop(key)
+            self.misses += 1
+            return None
+
+    def put(self, mission_key, value, block: Optional[int] = None):
+        key = _key(mission_key)
+        size = _sizeof(key) + _sizeof(value)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, block if block is not None else self._head, time.monotonic(), size)
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def get_or_load(self, mission_key, loader):
+        """Return the cached value, or call `loader()` and cache its result."""
+        value = self.get(mission_key)
+        if value is None:
+            value = loader()
+            self.put(mission_key, value)
+        return value
+
+    def invalidate(self, mission_key):
+        key = _key(mission_key)
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+                self.invalidations += 1
+
+    @property
+    def head_block(self) -> Optional[int]:
+        return self._head
+
+    def observe_block(self, block_number: int):
+        """Record the current head; entries older than max_age_blocks go stale."""
+        with self._lock:
+            if self._head is None or block_number > self._head:
+                self._head = block_number
+
+    def observe_events(self, events):
+        """Drop every mission touched by these FlightLogged events."""
+        for e in events:
+            self.invalidate(e["args"]["missionId"])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "head_block": self._head,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+# How often a process checks the database for newly indexed events.
+INDEXED_EVENTS_INTERVAL_SECONDS = 2.0
+
+_indexed = {"pk": None, "checked_at": 0.0}
+_indexed_lock = threading.Lock()
+
+
+def flight_cache() -> FlightCache:
+    """Process-wide cache shared by the views and services."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = FlightCache()
+        return _cache
+
+
+def indexed_events_due() -> bool:
+    return time.monotonic() - _indexed["checked_at"] >= INDEXED_EVENTS_INTERVAL_SECONDS
+
+
+def observe_indexed_events():
+    """
+    Drop cached missions with a FlightLogged event that the indexer
+    (index_flight_logs, its own process) stored since the last check, at
+    most every INDEXED_EVENTS_INTERVAL_SECONDS. The first call only notes
+    where the table ends: this process cached nothing before it.
+    """
+    from ledger.models import FlightLogEvent
+
+    with _indexed_lock:
+        if not indexed_events_due():
+            return
+        _indexed["checked_at"] = time.monotonic()
+        last = _indexed["pk"]
+        if last is None:
+            newest = FlightLogEvent.objects.order_by("-pk").values_list("pk", flat=True).first()
+            _indexed["pk"] = newest or 0
+            return
+        rows = list(
+            FlightLogEvent.objects.filter(pk__gt=last).order_by("pk").values_list("pk", "mission_key")
+        )
+        if rows:
+            _indexed["pk"] = rows[-1][0]
+    cache = flight_cache()
+    for _, mission_key in rows:
+        cache.invalidate(mission_key)
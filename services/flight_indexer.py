@@ -0,0 +1,138 @@
+# services/flight_indexer.py
+
+import logging
+import time
+
+from django.db import close_old_connections, transaction
+from web3 import Web3
+
+DEFAULT_CURSOR = "FlightLogged"
+DEFAULT_CONFIRMATIONS = 6  # stay this far behind head to avoid reorged logs
+INITIAL_SPAN = 2_000
+MAX_SPAN = 100_000
+
+# Node errors meaning the eth_getLogs range was too large
+RANGE_ERRORS = (
+    "query returned more than",
+    "limit exceeded",
+    "block range",
+    "range is too large",
+    "too many",
+    "response size",
+    "timeout",
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _is_range_error(exc: Exception) -> bool:
+    msg = str(exc).lower()
+    return any(e in msg for e in RANGE_ERRORS)
+
+
+class FlightLogIndexer:
+    """
+    Backfills and follows FlightLogged events into ledger.models.FlightLogEvent.
+
+    Logs are fetched with eth_getLogs over block ranges that adapt to the
+    node: the span doubles after each successful query and halves when the
+    node rejects a range as too large. Each range is stored together with
+    the resume cursor in one DB transaction, so a restart continues exactly
+    after the last stored range.
+    """
+
+    def __init__(
+        self,
+        w3,
+        contract,
+        cursor_name: str = DEFAULT_CURSOR,
+        confirmations: int = DEFAULT_CONFIRMATIONS,
+        initial_span: int = INITIAL_SPAN,
+        max_span: int = MAX_SPAN,
+    ):
+        self.w3 = w3
+        self.contract = contract
+        self.cursor_name = cursor_name
+        self.confirmations = confirmations
+        self.span = initial_span
+        self.max_span = max_span
+        self.event = contract.events.FlightLogged()
+        self.topic = Web3.to_hex(Web3.keccak(text="FlightLogged(bytes32,string,uint256,address)"))
+
+    def cursor(self):
+        from ledger.models import IndexerCursor
+        c = IndexerCursor.objects.filter(name=self.cursor_name).first()
+        return c.last_block if c else None
+
+    def _fetch(self, from_block: int, to_block: int):
+        logs = self.w3.eth.get_logs({
+            "address": self.contract.address,
+            "topics": [self.topic],
+            "fromBlock": from_block,
+            "toBlock": to_block,
+        })
+        return [self.event.process_log(log) for log in logs]
+
+    @transaction.atomic
+    def _store(self, events, to_block: int):
+        from ledger.models import FlightLogEvent, IndexerCursor
+
+        FlightLogEvent.objects.bulk_create(
+            [
+                FlightLogEvent(
+                    mission_key=Web3.to_hex(e["args"]["missionId"]),
+                    s3_key=e["args"]["s3Key"],
+                    timestamp=e["args"]["timestamp"],
+                    uploader=e["args"]["uploader"],
+                    tx_hash=Web3.to_hex(e["transactionHash"]),
+                    log_index=e["logIndex"],
+                    block_number=e["blockNumber"],
+                )
+                for e in events
+            ],
+            ignore_conflicts=True,
+        )
+        IndexerCursor.objects.update_or_create(
+            name=self.cursor_name, defaults={"last_block": to_block}
+        )
+
+    def run_once(self, start_block: int = 0, on_events=None) -> int:
+        """
+        Index everything from the cursor (or `start_block` on first run) up
+        to head minus confirmations. Returns the number of events stored.
+        `on_events` is called with each stored batch of events.
+        """
+        last = self.cursor()
+        from_block = start_block if last is None else last + 1
+        head = self.w3.eth.block_number - self.confirmations
+        stored = 0
+
+        while from_block <= head:
+            to_block = min(from_block + self.span - 1, head)
+            try:
+                events = self._fetch(from_block, to_block)
+            except Exception as e:
+                if not _is_range_error(e) or self.span == 1:
+                    raise
+                self.span = max(1, self.span // 2)
+                continue
+
+            self._store(events, to_block)
+            if events and on_events is not None:
+                on_events(events)
+            stored += len(events)
+            from_block = to_block + 1
+            self.span = min(self.max_span, self.span * 2)
+
+        return stored
+
+    def follow(self, start_block: int = 0, interval: float = 12.0, on_events=None):
+        """Keep indexing new blocks forever; errors are logged and retried."""
+        while True:
+            try:
+                self.run_once(start_block=start_block, on_events=on_events)
+            except Exception:
+                logger.exception("FlightLogged indexing failed; retrying")
+            finally:
+                close_old_connections()
+            time.sleep(interval)
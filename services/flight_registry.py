@@ -0,0 +1,168 @@
+# services/flight_registry.py
+
+import json
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from dotenv import load_dotenv
+from eth_account import Account
+from web3 import AsyncHTTPProvider, AsyncWeb3, Web3
+
+from services.chain_health import get_chain_monitor
+from services.fee_oracle import get_fee_oracle
+from services.metrics import instrument_web3
+from services.nonce_manager import get_nonce_manager, send_signed
+
+ABI_PATH = Path(__file__).resolve().parent / "FlightLogRegistry_abi.json"
+DEFAULT_CHAIN_ID = 11155111  # Sepolia
+
+
+@lru_cache(maxsize=None)
+def registry_abi() -> list:
+    """FlightLogRegistry ABI, parsed once per process."""
+    if not ABI_PATH.exists():
+        raise RuntimeError(f"ABI file missing: {ABI_PATH}")
+    with open(ABI_PATH, "r") as f:
+        return json.load(f)
+
+
+class FlightRegistry:
+    """
+    Client for the FlightLogRegistry contract: Web3 connection, signing
+    account and contract binding, plus AsyncWeb3 equivalents for async
+    views.
+
+    Nothing is built until it is first used, so constructing the client
+    (and importing anything that uses it) does no provider setup or
+    network I/O. Thread-safe.
+    """
+
+    def __init__(self, rpc_url: str, private_key: str, contract_address: str, chain_id: int = DEFAULT_CHAIN_ID):
+        self.rpc_url = rpc_url
+        self.chain_id = chain_id
+        self.contract_address = Web3.to_checksum_address(contract_address)
+        self._private_key = private_key
+        self._lock = threading.RLock()
+        self._w3 = None
+        self._contract = None
+        self._account = None
+        self._async_w3 = None
+        self._async_contract = None
+
+    @classmethod
+    def from_env(cls) -> "FlightRegistry":
+        """Build from ETH_RPC_URL, ETH_PRIVATE_KEY, CONTRACT_ADDRESS and CHAIN_ID (.env)."""
+        load_dotenv()
+        values = {name: os.getenv(name) for name in ("ETH_RPC_URL", "ETH_PRIVATE_KEY", "CONTRACT_ADDRESS")}
+        missing = [name for name, value in values.items() if not value]
+        if missing:
+            raise RuntimeError(f"{', '.join(missing)} must be set in .env")
+        return cls(
+            values["ETH_RPC_URL"],
+            values["ETH_PRIVATE_KEY"],
+            values["CONTRACT_ADDRESS"],
+            int(os.getenv("CHAIN_ID", str(DEFAULT_CHAIN_ID))),
+        )
+
+    # -----------------------------
+    # Lazily built handles
+    # -----------------------------
+    @property
+    def w3(self) -> Web3:
+        with self._lock:
+            if self._w3 is None:
+                self._w3 = instrument_web3(Web3(Web3.HTTPProvider(self.rpc_url)))
+            return self._w3
+
+    @property
+    def contract(self):
+        with self._lock:
+            if self._contract is None:
+                self._contract = self.w3.eth.contract(address=self.contract_address, abi=registry_abi())
+            return self._contract
+
+    @property
+    def account(self):
+        with self._lock:
+            if self._account is None:
+                self._account = Account.from_key(self._private_key)
+            return self._account
+
+    @property
+    def account_address(self) -> str:
+        return self.account.address
+
+    @property
+    def async_w3(self) -> AsyncWeb3:
+        """Shared AsyncWeb3 over aiohttp; waiting on the node holds no thread."""
+        with self._lock:
+            if self._async_w3 is None:
+                self._async_w3 = instrument_web3(AsyncWeb3(AsyncHTTPProvider(self.rpc_url)))
+            return self._async_w3
+
+    @property
+    def async_contract(self):
+        with self._lock:
+            if self._async_contract is None:
+                self._async_contract = self.async_w3.eth.contract(
+                    address=self.contract_address, abi=registry_abi()
+                )
+            return self._async_contract
+
+    # -----------------------------
+    # Operations
+    # -----------------------------
+    def send(self, fn) -> str:
+        """
+        Sign and send the contract call `fn` (already built with its
+        arguments) and return the 0x-prefixed tx hash. Nonces come from the shared
+        NonceManager, so concurrent callers never collide and no nonce
+        round trip is needed per send; fees and the gas limit come from
+        the cached FeeOracle.
+        """
+        w3 = self.w3
+
+        def _send(nonce):
+            txn = fn.build_transaction(get_fee_oracle(w3).tx_params(fn, {
+                "from": self.account_address,
+                "nonce": nonce,
+                "chainId": self.chain_id,
+            }))
+            return send_signed(w3, self.account.sign_transaction(txn))
+
+        tx_hash = get_nonce_manager(w3, self.account_address).send(_send)
+
+        return Web3.to_hex(tx_hash)
+
+    def chain_info(self) -> dict:
+        """
+        Web3 & contract health, served from the background
+        ChainHealthMonitor snapshot (no RPC per call).
+        """
+        health = get_chain_monitor(self.w3).snapshot()
+        return {
+            **health,
+            "rpc_url": self.rpc_url,
+            "configured_chain_id": self.chain_id,
+            "contract_address": self.contract_address,
+            "account_address": self.account_address,
+        }
+
+
+_registry: Optional[FlightRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def flight_registry() -> FlightRegistry:
+    """
+    Process-wide client configured from the environment. Missing settings
+    raise here, on first chain use, rather than at import time.
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = FlightRegistry.from_env()
+        return _registry
@@ -0,0 +1,130 @@
+# services/hash_chain.py
+
+import hashlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+# H_0 for every flight
+SEED = b"\x00" * 32
+
+
+def chain_update(h_prev: bytes, segment) -> bytes:
+    """
+    H_n = sha256(H_{n-1} || segment), without building the concatenation.
+
+    `segment` can be bytes or any buffer (e.g. a memoryview of a mapped log).
+    """
+    h = hashlib.sha256()
+    h.update(h_prev)
+    h.update(segment)
+    return h.digest()
+
+
+def to_hex(h: bytes) -> str:
+    return "0x" + h.hex()
+
+
+class HashChain:
+    """
+    Rolling hash over the appended segments of one flight log.
+    """
+
+    def __init__(self, tip: bytes = SEED):
+        self.tip = tip
+
+    def update(self, segment) -> bytes:
+        self.tip = chain_update(self.tip, segment)
+        return self.tip
+
+    @property
+    def tip_hex(self) -> str:
+        return to_hex(self.tip)
+
+
+def fetch_range(s3, bucket: str, key: str, version_id: str, start: int, end: int) -> bytes:
+    """
+    Fetch bytes [start, end) of one object version with a Range GET.
+    """
+    if end <= start:
+        return b""
+    resp = s3.get_object(
+        Bucket=bucket,
+        Key=key,
+        VersionId=version_id,
+        Range=f"bytes={start}-{end - 1}",
+    )
+    return resp["Body"].read()
+
+
+def _prefetch(pool, fn, jobs, window: int):
+    """
+    Run `fn(*job)` on the pool, yielding results in order while keeping at
+    most `window` fetches in flight (so memory stays bounded).
+    """
+    jobs = iter(jobs)
+    pending = deque()
+    for job in jobs:
+        pending.append(pool.submit(fn, *job))
+        if len(pending) >= window:
+            break
+    while pending:
+        result = pending.popleft().result()
+        job = next(jobs, None)
+        if job is not None:
+            pending.append(pool.submit(fn, *job))
+        yield result
+
+
+def verify_chain(
+    versions,
+    expected: dict,
+    bucket: str,
+    key: str,
+    s3=None,
+    max_workers: int = 8,
+    fetch=fetch_range,
+):
+    """
+    Recompute the hash chain of `key` from its S3 versions and compare each
+    tip against `expected` (VersionId -> tipHash hex, e.g. from checkpoints).
+
+    `versions` must be ordered oldest first and carry "version_id" and
+    "size" (the shape returned by storage.utils.list_versions, reversed).
+    Each version only contributes the bytes it appended, so only those
+    ranges are fetched, `max_workers` at a time; hashing stays serial.
+    `fetch` reads one range and defaults to a Range GET of the object
+    version (storage.segments.range_fetcher gives the right one for the
+    configured layout).
+
+    Returns one dict per version with the computed tip and an `ok` flag
+    (None when no expected tipHash was given for that version).
+    """
+    if s3 is None:
+        from storage.s3_client import s3_client
+        s3 = s3_client()
+
+    versions = list(versions)
+    jobs = []
+    prev_size = 0
+    for v in versions:
+        jobs.append((s3, bucket, key, v["version_id"], prev_size, v["size"]))
+        prev_size = v["size"]
+
+    chain = HashChain()
+    results = []
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        segments = _prefetch(pool, fetch, jobs, window=max_workers * 2)
+        for seq_no, (v, segment) in enumerate(zip(versions, segments), start=1):
+            chain.update(segment)
+            want: Optional[str] = expected.get(v["version_id"])
+            results.append({
+                "seq_no": seq_no,
+                "version_id": v["version_id"],
+                "size": v["size"],
+                "tip_hash": chain.tip_hex,
+                "expected": want,
+                "ok": None if want is None else want.lower() == chain.tip_hex,
+            })
+
+    return results
@@ -0,0 +1,351 @@
+import os
+import sys
+import argparse
+import heapq
+import json
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+# --- Bootstrap Django settings (same as services/logUploadSim.py) ---
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "uavledger.settings")
+
+import django
+django.setup()
+
+from django.conf import settings
+from django.db import close_old_connections
+from services.chain_health import LatencyWindow
+from services.checkpoint_batcher import CheckpointBatcher, DEFAULT_MAX_WAIT
+from services.log_reader import MappedLog
+from services.logUploadSim import chunk_plan, upload_steps
+from storage.s3_client import s3_client, is_segmented, set_s3_client
+from typing import Optional
+
+LOCAL_BUCKET = "uav-ledger-load"
+# Latency samples kept per operation (percentiles are over these).
+MAX_SAMPLES = 100_000
+
+
+class OpStats:
+    """
+    Latencies, errors and bytes for one operation across all workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.window = LatencyWindow(size=MAX_SAMPLES)
+        self.nbytes = 0
+
+    def record(self, seconds: float, ok: bool = True, nbytes: int = 0):
+        with self._lock:
+            self.window.record(seconds, ok)
+            self.nbytes += nbytes
+
+    def summary(self, elapsed: float) -> dict:
+        with self._lock:
+            out = {"latency_ms": self.window.summary(), "per_s": round(self.window.count / elapsed, 2)}
+            if self.nbytes:
+                out["bytes"] = self.nbytes
+                out["mb_per_s"] = round(self.nbytes / elapsed / 2**20, 2)
+            return out
+
+
+class _Flight:
+    __slots__ = ("flight_id", "steps", "remaining", "due")
+
+    def __init__(self, flight_id: str, steps, remaining: int, due: float):
+        self.flight_id = flight_id
+        self.steps = steps
+        self.remaining = remaining
+        self.due = due
+
+
+def run_fleet(
+    source_file: Path,
+    flights: int = 200,
+    workers: int = 32,
+    chunks: int = 10,
+    interval: float = 5.0,
+    jitter: float = 0.2,
+    bucket: Optional[str] = None,
+    mode: str = "full",
+    batcher: Optional[CheckpointBatcher] = None,
+    run_id: Optional[str] = None,
+    seed: Optional[int] = None,
+    columns: bool = False,
+    resume: bool = False,
+) -> dict:
+    """
+    Simulate `flights` drones uploading `source_file` at the same time,
+    each in `chunks` cumulative versions (see logUploadSim.upload_steps).
+
+    Every flight checkpoints once per `interval` seconds, +/- `jitter`
+    (a fraction of the interval), starting at a random point in the first
+    interval. A scheduler hands due steps to a pool of `workers` threads,
+    so the fleet can be much larger than the pool; when the pool cannot
+    keep up, steps start late and the report's schedule lag grows.
+
+    With a `batcher`, every checkpoint is queued for a Merkle-batched
+    commit on chain and the remainder is flushed at the end. With
+    `columns`, uploads include writing the telemetry sidecars. With
+    `resume`, steps go through the upload index (see upload_steps); off by
+    default, since the fleet's flights are new and the index's database
+    writes would be timed as part of every upload.
+
+    Returns the report: per-operation latency percentiles and throughput.
+    """
+    if mode not in ("full", "append"):
+        raise ValueError(f"Unknown upload mode: {mode}")
+
+    bucket = bucket or settings.AWS_S3_BUCKET
+    if not bucket:
+        raise RuntimeError("AWS_S3_BUCKET is not set (check your .env and settings).")
+
+    run_id = run_id or f"load-{datetime.now(timezone.utc):%Y%m%dT%H%M%S}"
+    rng = random.Random(seed)
+    s3 = s3_client()
+    stats = {"upload": OpStats(), "checkpoint": OpStats(), "flush": OpStats()}
+    lag = OpStats()
+    failed = []
+
+    def next_due(due: float) -> float:
+        return due + interval * (1 + rng.uniform(-jitter, jitter))
+
+    def step(flight: _Flight) -> bool:
+        lag.record(max(0.0, time.monotonic() - flight.due))
+        start = time.perf_counter()
+        try:
+            _, _, sent, checkpoint, _ = next(flight.steps)
+        except Exception as e:
+            stats["upload"].record(time.perf_counter() - start, ok=False)
+            print(f"[{flight.flight_id}] upload failed, flight stopped: {e!r}")
+            return False
+        finally:
+            if resume:
+                close_old_connections()
+        stats["upload"].record(time.perf_counter() - start, nbytes=sent)
+
+        if batcher is not None:
+            start = time.perf_counter()
+            try:
+                batcher.add(checkpoint)
+                stats["checkpoint"].record(time.perf_counter() - start)
+            except Exception as e:
+                # The batcher keeps the checkpoints for the next flush
+                stats["checkpoint"].record(time.perf_counter() - start, ok=False)
+                print(f"[{flight.flight_id}] checkpoint commit failed: {e!r}")
+            finally:
+                close_old_connections()
+        return True
+
+    with MappedLog(source_file) as log:
+        total = log.count_lines()
+        if total == 0:
+            print("Source file appears empty—nothing to upload.")
+            return {}
+
+        # One mapping and one plan shared by every flight
+        steps = chunk_plan(total_lines=total, chunks=chunks)
+        plan = list(zip(steps, log.line_offsets(steps)))
+
+        print(f"Source:   {source_file}  ({total} lines, {log.size} bytes)")
+        print(f"Bucket:   {bucket}")
+        print(f"Fleet:    {flights} flights x {chunks} chunks on {workers} workers ({run_id}-*)")
+        print(f"Schedule: every {interval}s +/- {jitter:.0%}  "
+              f"(target {flights / interval:.1f} checkpoints/s)")
+        print(f"Mode:     {'segmented' if is_segmented() else mode}")
+        print(f"Emit:     {'yes' if batcher is not None else 'no'}")
+        print("-" * 60)
+
+        started = time.monotonic()
+        fleet, pending = [], []
+        for i in range(flights):
+            flight_id = f"{run_id}-{i:04d}"
+            flight = _Flight(
+                flight_id,
+                upload_steps(log, plan, flight_id, s3, bucket, mode, columns, resume),
+                len(plan),
+                started + rng.uniform(0, interval),
+            )
+            fleet.append(flight)
+            heapq.heappush(pending, (flight.due, i))
+
+        done = queue.Queue()
+        running = 0
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fleet") as pool:
+            while pending or running:
+                now = time.monotonic()
+                if pending and running < workers and pending[0][0] <= now:
+                    _, i = heapq.heappop(pending)
+                    future = pool.submit(step, fleet[i])
+                    future.add_done_callback(
+                        lambda f, i=i: done.put((i, f.exception() is None and f.result()))
+                    )
+                    running += 1
+                    continue
+
+                # Wait for a worker to finish or the next step to fall due
+                timeout = None
+                if pending and running < workers:
+                    timeout = pending[0][0] - now
+                try:
+                    i, ok = done.get(timeout=timeout)
+                except queue.Empty:
+                    continue
+                running -= 1
+                flight = fleet[i]
+                flight.remaining -= 1
+                if not ok:
+                    failed.append(flight.flight_id)
+                elif flight.remaining:
+                    flight.due = next_due(flight.due)
+                    heapq.heappush(pending, (flight.due, i))
+                else:
+                    flight.steps.close()
+
+        if batcher is not None:
+            start = time.perf_counter()
+            try:
+                batch = batcher.flush()
+                stats["flush"].record(time.perf_counter() - start)
+                if batch is not None:
+                    print(f"Committed Merkle root {batch.merkle_root} "
+                          f"({batch.leaf_count} checkpoints) tx={batch.tx_hash}")
+            except Exception as e:
+                stats["flush"].record(time.perf_counter() - start, ok=False)
+                print(f"Final checkpoint flush failed: {e!r}")
+
+        elapsed = time.monotonic() - started
+
+    uploads = stats["upload"].window
+    report = {
+        "run_id": run_id,
+        "flights": flights,
+        "workers": workers,
+        "chunks": chunks,
+        "interval_s": interval,
+        "jitter": jitter,
+        "layout": "segmented" if is_segmented() else mode,
+        "emit": batcher is not None,
+        "elapsed_s": round(elapsed, 3),
+        "checkpoints": uploads.count - uploads.errors,
+        "failed_flights": failed,
+        "target_checkpoints_per_s": round(flights / interval, 2),
+        "schedule_lag_ms": lag.window.summary(),
+        "operations": {
+            name: s.summary(elapsed) for name, s in stats.items() if s.window.count
+        },
+    }
+    print("-" * 60)
+    print(json.dumps(report, indent=2))
+    return report
+
+
+def local_chain_submit(rpc_url: Optional[str] = None, bytecode: Optional[str] = None):
+    """
+    CheckpointBatcher submit function committing to a FlightLogRegistry
+    freshly deployed on a local EVM (see benchmarks.local_chain).
+    """
+    from benchmarks.local_chain import start_local_chain
+
+    chain = start_local_chain(rpc_url, bytecode)
+    print(f"Local chain: {chain.backend}  registry={chain.contract.address}")
+
+    def submit(root: bytes, label: str) -> str:
+        return chain.send(chain.contract.functions.logFlight(root, label))
+
+    return submit
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run many simulated flights at once and report upload/checkpoint latency and throughput."
+    )
+    parser.add_argument("--flights", type=int, default=200, help="Simulated flights (drones).")
+    parser.add_argument("--workers", type=int, default=32, help="Upload worker threads.")
+    parser.add_argument("--source", default="logs/flt_data_LINE-61m.txt", help="Path to source log file.")
+    parser.add_argument("--chunks", type=int, default=10, help="Cumulative uploads (versions) per flight.")
+    parser.add_argument("--interval", type=float, default=5.0, help="Seconds between a flight's checkpoints.")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Random +/- fraction of the interval.")
+    parser.add_argument("--bucket", default=None, help="Override S3 bucket (defaults to settings.AWS_S3_BUCKET).")
+    parser.add_argument(
+        "--mode",
+        choices=["full", "append"],
+        default="full",
+        help="full: re-upload the whole prefix each step; append: send only the new segment."
+    )
+    parser.add_argument("--emit", action="store_true", help="Commit checkpoints on chain as Merkle-batched roots.")
+    parser.add_argument("--batch-size", type=int, default=256, help="Checkpoints per on-chain Merkle root (with --emit).")
+    parser.add_argument(
+        "--batch-wait", type=float, default=DEFAULT_MAX_WAIT,
+        help="Seconds a checkpoint may wait in a partial batch (with --emit)."
+    )
+    parser.add_argument("--columns", action="store_true", help="Also write columnar telemetry sidecars.")
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Record uploads in the upload index and skip stored checkpoints (needs a migrated database)."
+    )
+    parser.add_argument("--local-s3", action="store_true", help="Upload to an in-memory S3 bucket instead of AWS.")
+    parser.add_argument(
+        "--local-chain", action="store_true",
+        help="With --emit, commit to a registry deployed on a local EVM instead of CONTRACT_ADDRESS."
+    )
+    parser.add_argument("--rpc-url", default=None, help="Local dev node for --local-chain; default is in-process eth-tester.")
+    parser.add_argument("--bytecode", default=None, help="FlightLogRegistry creation bytecode for --local-chain.")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for start offsets and jitter.")
+    parser.add_argument("--out", default=None, help="Also write the report to this JSON file.")
+
+    args = parser.parse_args()
+    source_file = Path(args.source).resolve()
+    if not source_file.exists():
+        print(f"Source file not found: {source_file}")
+        sys.exit(1)
+
+    bucket = args.bucket
+    if args.local_s3:
+        from benchmarks.s3_stub import InMemoryS3
+        set_s3_client(InMemoryS3())
+        bucket = bucket or LOCAL_BUCKET
+
+    batcher = None
+    if args.emit:
+        submit_kwargs = {}
+        if args.local_chain:
+            try:
+                submit_kwargs["submit"] = local_chain_submit(args.rpc_url, args.bytecode)
+            except RuntimeError as e:
+                print(f"Local chain unavailable: {e}")
+                sys.exit(1)
+        batcher = CheckpointBatcher(max_batch=args.batch_size, max_wait=args.batch_wait, **submit_kwargs)
+
+    report = run_fleet(
+        source_file=source_file,
+        flights=args.flights,
+        workers=args.workers,
+        chunks=args.chunks,
+        interval=args.interval,
+        jitter=args.jitter,
+        bucket=bucket,
+        mode=args.mode,
+        batcher=batcher,
+        seed=args.seed,
+        columns=args.columns,
+        resume=args.resume,
+    )
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2))
+        print(f"Report written to {args.out}")
+    if report.get("failed_flights"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import os
 import sys
+import copy
 import argparse
 from pathlib import Path
 
@@ -12,18 +13,16 @@ import django
 django.setup()
 
 from django.conf import settings 
-from storage.s3_client import s3_client, flight_key
+from storage.s3_client import s3_client, flight_key, is_segmented
+from storage.columns import put_sidecar
+from storage.segments import add_segment, new_manifest, range_fetcher, read_manifest, upload_segment
+from storage.upload_index import find_stored, record_stored, segment_entry, still_stored
+from storage.utils import list_versions
+from storage.uploads import put_full_version, put_appended_version, can_append
+from services.log_reader import MappedLog
+from services.hash_chain import HashChain, verify_chain
+from services.checkpoint_batcher import CheckpointBatcher
 from typing import Optional
-import hashlib
-
-def read_log_bytes_by_lines(path: Path):
-    """
-    Read the file as raw bytes and split into lines while preserving line endings.
-    This ensures we do not alter the bytes that will be uploaded (important later for hashing).
-    """
-    data = path.read_bytes()
-    lines = data.splitlines(keepends=True)  # preserves \n / \r\n exactly as-is
-    return lines
 
 def chunk_plan(total_lines: int, chunks: int):
     """
@@ -42,12 +41,127 @@ def chunk_plan(total_lines: int, chunks: int):
         out.append(acc)
     return out
 
-# Hash Helpers
-def rolling_seed() -> bytes:
-    return b"\x00" * 32 
 
-def rolling_update(H_prev: bytes, new_bytes: bytes) -> bytes:
-    return hashlib.sha256(H_prev + new_bytes).digest()
+def upload_steps(
+    log: MappedLog,
+    plan,
+    flight_id: str,
+    s3,
+    bucket: str,
+    mode: str = "full",
+    columns: bool = False,
+    resume: bool = True,
+):
+    """
+    Upload one flight's cumulative versions, one per (lines, size) entry
+    of `plan` (cumulative line counts and their byte offsets in `log`).
+    With `columns`, each version's new lines are also parsed and stored
+    as its columnar telemetry sidecar (see storage.columns).
+
+    With `resume`, every confirmed step is recorded in the upload index
+    (storage.upload_index) under its chain hash, and steps already there
+    are not uploaded again: their stored version is reused (once a HEAD
+    shows it still exists). Re-running a flight then creates no duplicate
+    versions, and a retry after a failure continues after the last
+    confirmed checkpoint instead of byte zero. A resumed run's new
+    versions come after the earlier run's in S3 even though they extend
+    them, so every checkpoint names its predecessor ("prevVersionId", the
+    version of the step before it).
+
+    A generator: each step uploads when it is advanced and yields
+    (lines, size, bytes_sent, checkpoint, resumed), so callers decide the
+    pacing and can time every upload (see services.load_generator).
+    """
+    key = flight_key(flight_id)
+    manifest = new_manifest(flight_id) if is_segmented() else None
+    manifest_behind = False  # resumed steps were not added to `manifest`
+
+    chain = HashChain()
+    prev_size = 0
+    version_id = None
+
+    for seq_no, (upto, size) in enumerate(plan, start=1):
+        # Rolling update w/ only new bytes since last upload
+        with log.segment(prev_size, size) as new_segment:  # just the delta
+            chain.update(new_segment)
+        tip_hash_hex = chain.tip_hex
+
+        prev_version_id = version_id
+        stored = find_stored(bucket, key, tip_hash_hex) if resume else None
+        if stored is not None and (stored.size != size or not still_stored(s3, stored)):
+            stored = None  # stale: upload it again (the new row replaces this one)
+        resumed = stored is not None and bool(stored.version_id)
+
+        if resumed:
+            version_id = stored.version_id
+            sent = 0
+            manifest_behind = manifest is not None
+        elif manifest is not None:
+            if manifest_behind:
+                # Continue from the manifest of the last stored version
+                manifest = copy.deepcopy(read_manifest(s3, bucket, key, version_id))
+                manifest_behind = False
+            if stored is not None and stored.segment_key:
+                # Segment object already uploaded; only its manifest is missing
+                entry = segment_entry(stored)
+                sent = 0
+            else:
+                with log.segment(prev_size, size) as new_segment:
+                    entry = upload_segment(s3, bucket, flight_id, manifest, new_segment, tip_hash_hex)
+                sent = entry["storedSize"]
+                if resume:
+                    record_stored(
+                        bucket, flight_id, key, tip_hash_hex, seq_no, prev_size, size,
+                        segment=entry, prev_version_id=prev_version_id,
+                    )
+            version_id = add_segment(s3, bucket, flight_id, manifest, entry)
+        elif mode == "append" and can_append(version_id, prev_size):
+            with log.reader(prev_size, size) as delta:
+                version_id = put_appended_version(
+                    s3, bucket, key, version_id, prev_size, delta
+                )
+            sent = size - prev_size
+        else:
+            with log.reader(0, size) as body:
+                version_id = put_full_version(s3, bucket, key, body)
+            sent = size
+
+        if not resumed and version_id:
+            if resume:
+                record_stored(
+                    bucket, flight_id, key, tip_hash_hex, seq_no, prev_size, size, version_id,
+                    segment=entry if manifest is not None else None,
+                    prev_version_id=prev_version_id,
+                )
+            if columns:
+                with log.segment(prev_size, size) as new_segment:
+                    put_sidecar(
+                        s3, bucket, flight_id, version_id, prev_size, size, new_segment, prev_version_id
+                    )
+
+        prev_size = size
+
+        # What will be emitted to Ethereum
+        yield upto, size, sent, {
+            "flightId": flight_id,
+            "seqNo": seq_no,
+            "tipHash": tip_hash_hex,
+            "s3Bucket": bucket,
+            "s3Key": key,
+            "s3VersionId": version_id,
+            "prevVersionId": prev_version_id,
+        }, resumed
+
+
+def _committed(checkpoint: dict) -> bool:
+    """Whether a checkpoint is already in a Merkle batch sent on chain."""
+    from ledger.models import CheckpointProof
+
+    return CheckpointProof.objects.filter(
+        flight_id=checkpoint["flightId"],
+        tip_hash=checkpoint["tipHash"],
+        s3_version_id=checkpoint["s3VersionId"],
+    ).exclude(batch__tx_hash="").exists()
 
 
 def simulate_uploads(
@@ -55,7 +169,41 @@ def simulate_uploads(
     flight_id: str,
     chunks: int = 10,
     bucket: Optional[str] = None,
+    mode: str = "full",
+    batcher: Optional[CheckpointBatcher] = None,
+    columns: bool = False,
+    resume: bool = True,
 ):
+    """
+    Upload `source_file` to S3 in `chunks` cumulative versions.
+
+    mode="full" re-uploads the whole prefix on every step.
+    mode="append" sends only the new segment once the previous version is
+    large enough for a multipart copy (see storage.uploads); earlier steps
+    fall back to a full upload. Both modes produce identical object versions.
+
+    With AWS_S3_FLIGHT_LAYOUT=segmented, `mode` does not apply: every step
+    uploads its new bytes gzip-compressed as one segment plus a new
+    manifest version (see storage.segments), and a run starts a fresh
+    manifest.
+
+    If a `batcher` is given, every checkpoint is queued on it for a
+    Merkle-batched commit on chain; flushing is left to the caller so
+    several flights can share a batch.
+
+    With `columns`, every version also gets its columnar telemetry
+    sidecar (storage.columns), so its stats are served without parsing
+    the log later.
+
+    With `resume` (the default), checkpoints already stored by an earlier
+    or interrupted run are reused instead of uploaded again (see
+    upload_steps), and not re-queued on the batcher once committed.
+
+    Returns the list of checkpoints, one per uploaded version.
+    """
+    if mode not in ("full", "append"):
+        raise ValueError(f"Unknown upload mode: {mode}")
+
     bucket = bucket or settings.AWS_S3_BUCKET
     if not bucket:
         raise RuntimeError("AWS_S3_BUCKET is not set (check your .env and settings).")
@@ -63,62 +211,85 @@ def simulate_uploads(
     s3 = s3_client()
     key = flight_key(flight_id)
 
-    lines = read_log_bytes_by_lines(source_file)
-    total = len(lines)
-    if total == 0:
-        print("Source file appears empty—nothing to upload.")
-        return
-
-    print(f"Source: {source_file}  ({total} lines)")
-    print(f"Bucket: {bucket}")
-    print(f"Key:    {key}")
-    print(f"Chunks: {chunks}")
-    print("-" * 60)
-
-    steps = chunk_plan(total_lines=total, chunks=chunks)
+    with MappedLog(source_file) as log:
+        total = log.count_lines()
+        if total == 0:
+            print("Source file appears empty—nothing to upload.")
+            return []
 
-    H = rolling_seed()
-    prev_upto = 0
+        print(f"Source: {source_file}  ({total} lines, {log.size} bytes)")
+        print(f"Bucket: {bucket}")
+        print(f"Key:    {key}")
+        print(f"Chunks: {chunks}")
+        print(f"Mode:   {'segmented' if is_segmented() else mode}")
+        print("-" * 60)
 
-    for seq_no, upto in enumerate(steps, start=1):
-        # Rolling update w/ only new bytes since last upload
-        new_segment = b"".join(lines[prev_upto:upto])  # just the delta
-        H = rolling_update(H, new_segment)
-        tip_hash_hex = "0x" + H.hex()
-
-        body = b"".join(lines[:upto])
-        s3.put_object(
-            Bucket=bucket,
-            Key=key,
-            Body=body,
-            ContentType="text/plain; charset=utf-8",
-        )
-        head = s3.head_object(Bucket=bucket, Key=key)
-        version_id = head.get("VersionId")
-
-        print(
-            f"[{seq_no:02d}/{chunks}] lines={upto:>6}  "
-            f"bytes={len(body):>8}  VersionId={version_id} tipHash={tip_hash_hex}"
-        )
-
-        prev_upto = upto
+        steps = chunk_plan(total_lines=total, chunks=chunks)
+        plan = list(zip(steps, log.line_offsets(steps)))
+        checkpoints = []
 
-        # What will be emitted to Ethereum
-        checkpoint = {
-            "flightId": flight_id,
-            "seqNo": seq_no,
-            "tipHash": tip_hash_hex,
-            "s3Bucket": bucket,
-            "s3Key": key,
-            "s3VersionId": version_id,
-        }
-        # STUB for a call to emit checkpoint to Ethereum
-        #emit_checkpoint()
+        for upto, size, sent, checkpoint, resumed in upload_steps(
+            log, plan, flight_id, s3, bucket, mode, columns, resume
+        ):
+            print(
+                f"[{checkpoint['seqNo']:02d}/{chunks}] lines={upto:>6}  "
+                f"bytes={size:>8}  sent={sent:>8}  VersionId={checkpoint['s3VersionId']} "
+                f"tipHash={checkpoint['tipHash']}{'  (already stored)' if resumed else ''}"
+            )
+            checkpoints.append(checkpoint)
+            if batcher is not None and not (resumed and _committed(checkpoint)):
+                batcher.add(checkpoint)
 
     print("-" * 60)
     print("Done. You should now see multiple versions via:")
-    print(f"  GET /api/storage/versions/{flight_id}")
+    print(f"  GET /flights/{flight_id}/versions/")
     print("or AWS Console → S3 → your bucket → object → Versions tab.")
+    return checkpoints
+
+
+def verify_uploads(checkpoints, max_workers: int = 8) -> bool:
+    """
+    Re-derive every uploaded version's tipHash from S3 (range reads only)
+    and compare it with the checkpoints emitted by simulate_uploads.
+
+    The chain is the checkpoints' versions, each following the one it
+    names as its predecessor, not the flight's S3 version order: after a
+    resumed run, that interleaves versions of several runs.
+    """
+    if not checkpoints:
+        return True
+
+    first = checkpoints[0]
+    bucket, key = first["s3Bucket"], first["s3Key"]
+    expected = {c["s3VersionId"]: c["tipHash"] for c in checkpoints}
+
+    broken = [
+        c for prev, c in zip([None] + checkpoints, checkpoints)
+        if c.get("prevVersionId") != (prev["s3VersionId"] if prev else None)
+    ]
+    for c in broken:
+        print(f"BROKEN LINK seq={c['seqNo']} VersionId={c['s3VersionId']} "
+              f"follows {c.get('prevVersionId')}, not the previous checkpoint")
+
+    _, versions = list_versions(first["flightId"])
+    sizes = {v["version_id"]: v["size"] for v in versions}
+    missing = [c for c in checkpoints if c["s3VersionId"] not in sizes]
+    for c in missing:
+        print(f"MISSING seq={c['seqNo']} VersionId={c['s3VersionId']} is not a version of {key}")
+    if missing:
+        print(f"Verified 0 versions: {len(missing)} missing")
+        return False
+    chain = [{"version_id": c["s3VersionId"], "size": sizes[c["s3VersionId"]]} for c in checkpoints]
+    results = verify_chain(chain, expected, bucket, key, max_workers=max_workers, fetch=range_fetcher())
+
+    bad = [r for r in results if r["ok"] is False]
+    for r in bad:
+        print(f"MISMATCH seq={r['seq_no']} VersionId={r['version_id']} "
+              f"got={r['tip_hash']} expected={r['expected']}")
+    failures = len(bad) + len(broken)
+    print(f"Verified {len(results)} versions: {'OK' if not failures else f'{failures} mismatches'}")
+    return not failures
+
 
 def main():
     parser = argparse.ArgumentParser(description="Simulate cumulative S3 uploads to create versions.")
@@ -143,6 +314,39 @@ def main():
         default=None,
         help="Override S3 bucket (defaults to settings.AWS_S3_BUCKET)."
     )
+    parser.add_argument(
+        "--mode",
+        choices=["full", "append"],
+        default="full",
+        help="full: re-upload the whole prefix each step; append: send only the new segment."
+    )
+    parser.add_argument(
+        "--emit",
+        action="store_true",
+        help="Commit checkpoints on chain as Merkle-batched roots via FlightLogRegistry."
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=256,
+        help="Checkpoints per on-chain Merkle root (with --emit)."
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="After uploading, re-check every tipHash against S3 using range reads."
+    )
+
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Upload every checkpoint even if the upload index says it is already stored."
+    )
+    parser.add_argument(
+        "--columns",
+        action="store_true",
+        help="Also store each version's telemetry as a columnar (npz) sidecar for the stats endpoint."
+    )
 
     args = parser.parse_args()
     source_file = Path(args.source).resolve()
@@ -150,13 +354,28 @@ def main():
         print(f"Source file not found: {source_file}")
         sys.exit(1)
 
-    simulate_uploads(
+    batcher = CheckpointBatcher(max_batch=args.batch_size) if args.emit else None
+
+    checkpoints = simulate_uploads(
         source_file=source_file,
         flight_id=args.flight_id,
         chunks=args.chunks,
         bucket=args.bucket,
+        mode=args.mode,
+        batcher=batcher,
+        columns=args.columns,
+        resume=not args.no_resume,
     )
 
+    if batcher is not None:
+        batch = batcher.flush()
+        if batch is not None:
+            print(f"Committed Merkle root {batch.merkle_root} "
+                  f"({batch.leaf_count} checkpoints) tx={batch.tx_hash}")
+
+    if args.verify and not verify_uploads(checkpoints):
+        sys.exit(1)
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
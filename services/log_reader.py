@@ -0,0 +1,160 @@
+# services/log_reader.py
+
+import io
+import mmap
+import os
+from pathlib import Path
+
+# Size of the window used when scanning the map for line endings.
+SCAN_BLOCK_SIZE = 1024 * 1024
+
+
+class SegmentReader(io.RawIOBase):
+    """
+    Seekable, read-only file object over a memoryview.
+
+    boto3 does not accept a memoryview as `Body`, but it accepts any
+    seekable file-like object, so this lets a mapped segment be uploaded
+    without first copying it into a bytes object.
+    """
+
+    def __init__(self, view: memoryview):
+        super().__init__()
+        self._view = view
+        self._pos = 0
+
+    def __len__(self):
+        return len(self._view)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buf):
+        n = min(len(buf), len(self._view) - self._pos)
+        if n <= 0:
+            return 0
+        buf[:n] = self._view[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = len(self._view) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if pos < 0:
+            raise ValueError(f"Negative seek position {pos}")
+        self._pos = pos
+        return pos
+
+    def tell(self):
+        return self._pos
+
+    def close(self):
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+
+class MappedLog:
+    """
+    Read-only memory map of a flight log.
+
+    Line boundaries are found by scanning the map in fixed-size windows, so
+    memory use does not depend on the file size. Segments are handed out as
+    memoryview slices of the map (no copy); release them (or use them as
+    context managers) before closing the log.
+
+    A line ends at b"\\n" (so "\\r\\n" endings are preserved as-is); a
+    trailing line without a newline still counts as a line.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self.size = os.fstat(self._file.fileno()).st_size
+        if self.size:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._mmap)
+        else:
+            # mmap refuses zero-length files
+            self._mmap = None
+            self._view = memoryview(b"")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+    def _blocks(self):
+        for start in range(0, self.size, SCAN_BLOCK_SIZE):
+            end = min(start + SCAN_BLOCK_SIZE, self.size)
+            yield start, end, self._mmap[start:end].count(b"\n")
+
+    def count_lines(self) -> int:
+        total = sum(n for _, _, n in self._blocks())
+        if self.size and self._mmap[self.size - 1] != ord("\n"):
+            total += 1
+        return total
+
+    def line_offsets(self, line_counts) -> list:
+        """
+        Map cumulative line counts to byte offsets in a single scan.
+
+        `line_counts` must be ascending (e.g. the output of chunk_plan);
+        the offset returned for a count of N is the end of line N.
+        """
+        targets = list(line_counts)
+        offsets = []
+        i = 0
+        seen = 0
+
+        # Counts of 0 sit at offset 0
+        while i < len(targets) and targets[i] <= 0:
+            offsets.append(0)
+            i += 1
+
+        for start, end, n in self._blocks():
+            if i == len(targets):
+                break
+            if seen + n < targets[i]:
+                seen += n
+                continue
+            # At least one target ends inside this block; walk its newlines.
+            pos = start
+            while i < len(targets) and seen < targets[i]:
+                nl = self._mmap.find(b"\n", pos, end)
+                if nl == -1:
+                    break
+                seen += 1
+                pos = nl + 1
+                while i < len(targets) and targets[i] == seen:
+                    offsets.append(pos)
+                    i += 1
+            seen += self._mmap[pos:end].count(b"\n")
+
+        # Anything left is the unterminated final line (or past EOF)
+        offsets.extend(self.size for _ in targets[i:])
+        return offsets
+
+    def segment(self, start: int, end: int) -> memoryview:
+        """Zero-copy view of bytes [start, end)."""
+        return self._view[start:end]
+
+    def reader(self, start: int, end: int) -> SegmentReader:
+        """Zero-copy, upload-ready file object for bytes [start, end)."""
+        return SegmentReader(self.segment(start, end))
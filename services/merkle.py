@@ -0,0 +1,74 @@
+# services/merkle.py
+
+from eth_abi import encode
+from web3 import Web3
+
+
+def checkpoint_leaf(checkpoint: dict) -> bytes:
+    """
+    Leaf hash for one checkpoint dict (as built in simulate_uploads):
+
+      keccak256(abi.encode(flightId, seqNo, tipHash, s3Bucket, s3Key, s3VersionId))
+
+    abi.encode (not encodePacked) keeps the string fields unambiguous, so
+    the same leaf can be recomputed by a Solidity verifier.
+    """
+    return Web3.keccak(encode(
+        ["string", "uint256", "bytes32", "string", "string", "string"],
+        [
+            checkpoint["flightId"],
+            int(checkpoint["seqNo"]),
+            Web3.to_bytes(hexstr=checkpoint["tipHash"]),
+            checkpoint["s3Bucket"],
+            checkpoint["s3Key"],
+            checkpoint["s3VersionId"] or "",
+        ],
+    ))
+
+
+def hash_pair(a: bytes, b: bytes) -> bytes:
+    # Sorted pairs, so proofs need no left/right flags (OpenZeppelin style)
+    return Web3.keccak(a + b if a < b else b + a)
+
+
+def build_tree(leaves):
+    """
+    Build every level of the tree, leaves first and root last.
+
+    An odd node at the end of a level is carried up unchanged.
+    """
+    if not leaves:
+        raise ValueError("Cannot build a Merkle tree with no leaves")
+
+    levels = [list(leaves)]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        parents = [hash_pair(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            parents.append(level[-1])
+        levels.append(parents)
+    return levels
+
+
+def merkle_root(levels) -> bytes:
+    return levels[-1][0]
+
+
+def merkle_proof(levels, index: int):
+    """
+    Sibling hashes from leaf `index` up to (not including) the root.
+    """
+    proof = []
+    for level in levels[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(level[sibling])
+        index //= 2
+    return proof
+
+
+def verify_proof(leaf: bytes, proof, root: bytes) -> bool:
+    node = leaf
+    for sibling in proof:
+        node = hash_pair(node, sibling)
+    return node == root
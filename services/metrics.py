@@ -0,0 +1,200 @@
+# services/metrics.py
+
+import bisect
+import contextlib
+import contextvars
+import threading
+import time
+from typing import Optional
+
+from web3.middleware import Web3Middleware
+
+# Upper bounds (seconds) shared by every histogram: RPC and S3 calls
+# mostly land between 5 ms and 1 s, whole requests up to a few seconds.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# view label for work done outside a request (background workers, scripts)
+NO_VIEW = "-"
+
+
+class Histogram:
+    """
+    Prometheus-style cumulative histogram with one series per label set.
+    Thread-safe.
+    """
+
+    def __init__(self, name: str, help: str, labels, buckets=BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, seconds: float, *label_values):
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[i] += 1
+            series[-1] += seconds
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {k: list(v) for k, v in self._series.items()}
+        for values, counts in sorted(series.items()):
+            labels = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, values))
+            sep = "," if labels else ""
+            total = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                total += count
+                lines.append(f'{self.name}_bucket{{{labels}{sep}le="{bound}"}} {total}')
+            lines.append(f"{self.name}_sum{{{labels}}} {counts[-1]}")
+            lines.append(f"{self.name}_count{{{labels}}} {total}")
+        return lines
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_SECONDS = Histogram(
+    "uavledger_request_duration_seconds", "Django request time by view.", ("view", "method", "status")
+)
+CATEGORY_SECONDS = {
+    "rpc": Histogram("uavledger_rpc_duration_seconds", "Ethereum JSON-RPC call time by view and method.", ("view", "method")),
+    "s3": Histogram("uavledger_s3_duration_seconds", "S3 operation time by view and operation.", ("view", "operation")),
+    "template": Histogram("uavledger_template_duration_seconds", "Template rendering time by view and template.", ("view", "template")),
+}
+
+
+def render_metrics() -> str:
+    """All histograms in the Prometheus text exposition format."""
+    lines = REQUEST_SECONDS.render()
+    for histogram in CATEGORY_SECONDS.values():
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
+
+
+# -----------------------------
+# Per-request breakdown
+# -----------------------------
+class RequestTimings:
+    """Count and total time per (category, name) within one request."""
+
+    def __init__(self):
+        self.view = NO_VIEW
+        self._lock = threading.Lock()
+        self.totals = {}  # (category, name) -> [count, seconds]
+
+    def add(self, category: str, name: str, seconds: float):
+        with self._lock:
+            entry = self.totals.setdefault((category, name), [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def by_category(self) -> dict:
+        out = {}
+        with self._lock:
+            for (category, _), (count, seconds) in self.totals.items():
+                entry = out.setdefault(category, [0, 0.0])
+                entry[0] += count
+                entry[1] += seconds
+        return out
+
+
+# Copied into sync_to_async workers by asgiref, so it follows the request
+_current = contextvars.ContextVar("uavledger_request_timings", default=None)
+
+
+def begin_request() -> tuple:
+    timings = RequestTimings()
+    return _current.set(timings), timings
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def record(category: str, name: str, seconds: float):
+    """Add one timed call to the histograms and to the current request."""
+    timings: Optional[RequestTimings] = _current.get()
+    CATEGORY_SECONDS[category].observe(seconds, timings.view if timings else NO_VIEW, name)
+    if timings is not None:
+        timings.add(category, name, seconds)
+
+
+@contextlib.contextmanager
+def track(category: str, name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(category, name, time.perf_counter() - start)
+
+
+# -----------------------------
+# web3 hook
+# -----------------------------
+class RPCTimingMiddleware(Web3Middleware):
+    """Times every JSON-RPC request (a batch counts as one "batch" call)."""
+
+    def wrap_make_request(self, make_request):
+        def middleware(method, params):
+            with track("rpc", method):
+                return make_request(method, params)
+
+        return middleware
+
+    def wrap_make_batch_request(self, make_batch_request):
+        def middleware(requests_info):
+            with track("rpc", "batch"):
+                return make_batch_request(requests_info)
+
+        return middleware
+
+    async def async_wrap_make_request(self, make_request):
+        async def middleware(method, params):
+            with track("rpc", method):
+                return await make_request(method, params)
+
+        return middleware
+
+    async def async_wrap_make_batch_request(self, make_batch_request):
+        async def middleware(requests_info):
+            with track("rpc", "batch"):
+                return await make_batch_request(requests_info)
+
+        return middleware
+
+
+def instrument_web3(w3):
+    """Install RPC timing on a Web3 / AsyncWeb3 instance (idempotent)."""
+    if "rpc_metrics" not in w3.middleware_onion:
+        w3.middleware_onion.add(RPCTimingMiddleware, name="rpc_metrics")
+    return w3
+
+
+# -----------------------------
+# boto3 hook
+# -----------------------------
+def _before_call(context, **kwargs):
+    context["metrics_start"] = time.perf_counter()
+
+
+def _after_call(event_name, context, **kwargs):
+    # after-call.s3.<Operation> / after-call-error.s3.<Operation>
+    start = context.pop("metrics_start", None)
+    if start is not None:
+        record("s3", event_name.rsplit(".", 1)[-1], time.perf_counter() - start)
+
+
+def instrument_s3(client):
+    """Time every operation made through a boto3 S3 client."""
+    events = client.meta.events
+    events.register("before-call.s3", _before_call, unique_id="metrics-before-call")
+    events.register("after-call.s3", _after_call, unique_id="metrics-after-call")
+    events.register("after-call-error.s3", _after_call, unique_id="metrics-after-call-error")
+    return client
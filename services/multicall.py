@@ -0,0 +1,155 @@
+# services/multicall.py
+
+import os
+import threading
+
+from web3 import Web3
+
+# Multicall3 has the same address on mainnet, Sepolia and most EVM chains.
+MULTICALL3_ADDRESS = Web3.to_checksum_address(
+    os.getenv("MULTICALL3_ADDRESS", "0xcA11bde05977b3631167028862bE2a173976CA11")
+)
+
+MULTICALL3_ABI = [
+    {
+        "inputs": [
+            {
+                "components": [
+                    {"internalType": "address", "name": "target", "type": "address"},
+                    {"internalType": "bool", "name": "allowFailure", "type": "bool"},
+                    {"internalType": "bytes", "name": "callData", "type": "bytes"},
+                ],
+                "internalType": "struct Multicall3.Call3[]",
+                "name": "calls",
+                "type": "tuple[]",
+            }
+        ],
+        "name": "aggregate3",
+        "outputs": [
+            {
+                "components": [
+                    {"internalType": "bool", "name": "success", "type": "bool"},
+                    {"internalType": "bytes", "name": "returnData", "type": "bytes"},
+                ],
+                "internalType": "struct Multicall3.Result[]",
+                "name": "returnData",
+                "type": "tuple[]",
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function",
+    },
+]
+
+# getFlight calls per aggregate3 / JSON-RPC batch request
+BATCH_SIZE = 200
+
+GET_FLIGHT_OUTPUTS = ["string", "uint256", "address"]
+
+_has_multicall = {}
+_has_multicall_lock = threading.Lock()
+
+
+def _multicall_available(w3) -> bool:
+    endpoint = getattr(w3.provider, "endpoint_uri", None) or id(w3)
+    with _has_multicall_lock:
+        if endpoint not in _has_multicall:
+            _has_multicall[endpoint] = len(w3.eth.get_code(MULTICALL3_ADDRESS)) > 0
+        return _has_multicall[endpoint]
+
+
+def _decode(w3, data):
+    s3_key, timestamp, uploader = w3.codec.decode(GET_FLIGHT_OUTPUTS, bytes(data))
+    return s3_key, int(timestamp), uploader
+
+
+def _flight(mission_key: bytes, value) -> dict:
+    s3_key, timestamp, uploader = value
+    return {
+        "mission_key": Web3.to_hex(mission_key),
+        "s3_key": s3_key,
+        "timestamp": timestamp,
+        "uploader": uploader,
+        "exists": s3_key != "",
+    }
+
+
+def _via_multicall(w3, contract, keys, block):
+    multicall = w3.eth.contract(address=MULTICALL3_ADDRESS, abi=MULTICALL3_ABI)
+    calls = [
+        (contract.address, True, contract.encode_abi("getFlight", args=[k]))
+        for k in keys
+    ]
+    results = multicall.functions.aggregate3(calls).call(block_identifier=block)
+    return [_decode(w3, data) if ok else None for ok, data in results]
+
+
+def _decode_call(w3, response):
+    # One raw JSON-RPC eth_call response: a revert or error yields None
+    result = response.get("result")
+    if response.get("error") or not result or result == "0x":
+        return None
+    try:
+        return _decode(w3, Web3.to_bytes(hexstr=result))
+    except Exception:
+        return None
+
+
+def _via_rpc_batch(w3, contract, keys, block):
+    # Sent through the provider directly: w3.batch_requests() raises for
+    # the whole batch as soon as one call reverts
+    block_param = Web3.to_hex(block) if isinstance(block, int) else block
+    responses = w3.provider.make_batch_request([
+        ("eth_call", [
+            {"to": contract.address, "data": contract.encode_abi("getFlight", args=[k])},
+            block_param,
+        ])
+        for k in keys
+    ])
+    if not isinstance(responses, list):
+        # The node rejected the batch itself
+        raise RuntimeError(f"JSON-RPC batch failed: {responses.get('error', responses)}")
+    return [_decode_call(w3, r) for r in responses]
+
+
+def get_flights(w3, contract, mission_keys, block_identifier=None, cache=None):
+    """
+    Read getFlight for many bytes32 mission keys, all at one block.
+
+    Calls are packed BATCH_SIZE at a time into a Multicall3 aggregate3
+    eth_call (or, where Multicall3 is not deployed, a JSON-RPC batch of
+    eth_calls), every one pinned to the same block, so the results are
+    mutually consistent. A failed individual call yields None.
+
+    With a FlightCache and no pinned block, cached missions are served
+    locally and only the misses are read (and then cached). Hits may have
+    been read at an earlier block than the misses (up to the cache's
+    max_age_blocks / ttl ago), so such a result is not one snapshot; pass
+    `block_identifier` to bypass the cache and read every mission at that
+    block. If every mission was a hit, the returned block is the cache's
+    last seen head.
+
+    Returns (block_number, [flight dict | None, ...]) in input order.
+    """
+    keys = list(mission_keys)
+    use_cache = cache is not None and block_identifier is None
+    values = [cache.get(k) for k in keys] if use_cache else [None] * len(keys)
+    missing = [i for i, v in enumerate(values) if v is None]
+
+    block = block_identifier
+    if missing:
+        if block is None:
+            block = w3.eth.block_number
+            if cache is not None:
+                cache.observe_block(block)
+        read = _via_multicall if _multicall_available(w3) else _via_rpc_batch
+        for start in range(0, len(missing), BATCH_SIZE):
+            batch = missing[start:start + BATCH_SIZE]
+            for i, value in zip(batch, read(w3, contract, [keys[i] for i in batch], block)):
+                values[i] = value
+                if use_cache and value is not None:
+                    cache.put(keys[i], value, block)
+    elif use_cache:
+        block = cache.head_block
+
+    return block, [_flight(k, v) if v else None for k, v in zip(keys, values)]
@@ -0,0 +1,134 @@
+# services/nonce_manager.py
+
+import threading
+import time
+
+# Node error messages meaning our local nonce no longer matches the chain
+NONCE_ERRORS = (
+    "nonce too low",
+    "nonce too high",
+    "replacement transaction underpriced",
+    "invalid nonce",
+)
+# Node error messages meaning it already has this exact signed transaction
+# (a resend of one that got through): it was sent, and sending again with
+# a new nonce would broadcast a second one.
+ALREADY_KNOWN_ERRORS = (
+    "already known",
+    "known transaction",
+)
+
+# Re-read the chain nonce after this long without sending anything, to
+# pick up transactions sent by other processes or dropped from the pool.
+IDLE_RESYNC_SECONDS = 30.0
+
+
+def is_nonce_error(exc: Exception) -> bool:
+    msg = str(exc).lower()
+    return any(e in msg for e in NONCE_ERRORS) and not is_already_known(exc)
+
+
+def is_already_known(exc: Exception) -> bool:
+    msg = str(exc).lower()
+    return any(e in msg for e in ALREADY_KNOWN_ERRORS)
+
+
+def send_signed(w3, signed):
+    """
+    Broadcast a signed transaction and return its hash, also when the node
+    already has it (ALREADY_KNOWN_ERRORS): that is the same transaction,
+    already submitted.
+    """
+    try:
+        return w3.eth.send_raw_transaction(signed.raw_transaction)
+    except Exception as e:
+        if is_already_known(e):
+            return signed.hash
+        raise
+
+
+class NonceManager:
+    """
+    Hands out consecutive nonces for one account without asking the node
+    before every transaction, so many transactions can be signed and sent
+    back to back. Thread-safe.
+
+    The counter is (re)synced from the node's pending transaction count on
+    first use, after IDLE_RESYNC_SECONDS of inactivity, and whenever a send
+    fails with a nonce error (gap, replaced or dropped transaction).
+    """
+
+    def __init__(self, w3, address: str):
+        self.w3 = w3
+        self.address = address
+        self._lock = threading.Lock()
+        self._next = None
+        self._last_used = 0.0
+
+    def _chain_nonce(self) -> int:
+        return self.w3.eth.get_transaction_count(self.address, "pending")
+
+    def allocate(self) -> int:
+        with self._lock:
+            now = time.monotonic()
+            if self._next is None or now - self._last_used > IDLE_RESYNC_SECONDS:
+                self._next = self._chain_nonce()
+            nonce = self._next
+            self._next += 1
+            self._last_used = now
+            return nonce
+
+    def resync(self):
+        """Forget the local counter; the next allocate() re-reads the chain."""
+        with self._lock:
+            self._next = None
+
+    def release(self, nonce: int, exc: Exception):
+        """
+        Report that sending with `nonce` failed.
+
+        If it was the most recent allocation the nonce is simply reused;
+        otherwise later nonces are already in flight behind a gap, so the
+        counter is resynced from the node. A transaction the node already
+        knows has taken its nonce, so the nonce is not reused.
+        """
+        if is_already_known(exc):
+            return
+        with self._lock:
+            if self._next is not None and nonce == self._next - 1 and not is_nonce_error(exc):
+                self._next = nonce
+            else:
+                self._next = None
+
+    def send(self, send_fn, retries: int = 2):
+        """
+        Call `send_fn(nonce)` (build, sign and send; returns the tx hash)
+        with a fresh nonce, resyncing and retrying on nonce errors.
+        `send_fn` should send with send_signed, so a transaction the node
+        already has counts as sent; an "already known" error that does
+        reach here is raised, never retried with a new nonce.
+        """
+        for attempt in range(retries + 1):
+            nonce = self.allocate()
+            try:
+                return send_fn(nonce)
+            except Exception as e:
+                self.release(nonce, e)
+                if attempt == retries or not is_nonce_error(e):
+                    raise
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_nonce_manager(w3, address: str) -> NonceManager:
+    """
+    One manager per account per process, shared by every module that
+    sends from that account.
+    """
+    with _managers_lock:
+        manager = _managers.get(address)
+        if manager is None:
+            manager = _managers[address] = NonceManager(w3, address)
+        return manager
@@ -0,0 +1,122 @@
+# services/telemetry.py
+
+import io
+import warnings
+from typing import Optional, Sequence
+
+import numpy as np
+
+# Column order of headerless logs: time, position, altitude, speed, battery
+DEFAULT_COLUMNS = ("t", "lat", "lon", "alt", "speed", "battery")
+# Summary percentiles reported per column
+PERCENTILES = (5, 50, 95)
+
+
+def _is_number(field: str) -> bool:
+    try:
+        float(field)
+    except ValueError:
+        return False
+    return True
+
+
+def parse_table(data, header: bool = True):
+    """
+    Parse comma-separated telemetry lines (bytes or a buffer) into a
+    float64 (rows, fields) array in one pass of NumPy's C reader, not line
+    by line.
+
+    With `header` (data starting a log), a first line that is not numeric
+    is a header; it is returned as a list of names (else None) and not
+    parsed. Parts appended later never have one, so pass header=False
+    there or a line whose first field is not a number (e.g. an ISO
+    timestamp) would be taken for one. Lines starting with "#" are
+    skipped; if some lines are malformed, their unparsable fields become
+    NaN and rows with the wrong field count are dropped.
+    """
+    text = bytes(data).decode("utf-8", errors="replace")
+    names = None
+
+    first, _, rest = text.partition("\n")
+    if header and first.strip() and not first.lstrip().startswith("#") and not _is_number(first.split(",")[0]):
+        names = [h.strip() for h in first.split(",")]
+        text = rest
+
+    if not text.strip():
+        return names, np.empty((0, len(names or ())))
+
+    try:
+        table = np.loadtxt(io.StringIO(text), delimiter=",", comments="#", ndmin=2, dtype=np.float64)
+    except ValueError:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")  # one warning per dropped row
+            table = np.genfromtxt(
+                io.StringIO(text), delimiter=",", comments="#", dtype=np.float64,
+                invalid_raise=False, ndmin=2,
+            )
+    return names, table
+
+
+def to_columns(tables, names: Optional[Sequence[str]] = None) -> dict:
+    """
+    Stack parsed tables (consecutive parts of one log) and split them into
+    named column arrays. Fields beyond `names` (default DEFAULT_COLUMNS)
+    are called col<N>; a part with fewer fields is NaN-padded.
+    """
+    tables = [t for t in tables if t.size]
+    names = list(names or DEFAULT_COLUMNS)
+    width = max([t.shape[1] for t in tables], default=len(names))
+    names += [f"col{i}" for i in range(len(names), width)]
+    if not tables:
+        return {name: np.empty(0) for name in names[:width]}
+
+    padded = [
+        t if t.shape[1] == width
+        else np.hstack([t, np.full((t.shape[0], width - t.shape[1]), np.nan)])
+        for t in tables
+    ]
+    table = np.vstack(padded) if len(padded) > 1 else padded[0]
+    return {names[i]: np.ascontiguousarray(table[:, i]) for i in range(width)}
+
+
+def column_stats(values: np.ndarray) -> Optional[dict]:
+    """min / max / mean / std / percentiles of the finite values, or None."""
+    values = values[np.isfinite(values)]
+    if not values.size:
+        return None
+    pcts = np.percentile(values, PERCENTILES)
+    return {
+        "count": int(values.size),
+        "min": float(values.min()),
+        "max": float(values.max()),
+        "mean": float(values.mean()),
+        "std": float(values.std()),
+        **{f"p{p}": float(v) for p, v in zip(PERCENTILES, pcts)},
+    }
+
+
+def summarize(columns: dict, time_column: str = "t", time_scale: float = 1.0) -> dict:
+    """
+    Vectorized flight summary: sample count, duration and rate from the
+    time column (`time_scale` seconds per unit; the first column when
+    there is no `time_column`), and stats for every other column
+    (altitude, speed, ...).
+    """
+    rows = len(next(iter(columns.values()))) if columns else 0
+    if time_column not in columns and columns:
+        time_column = next(iter(columns))
+    out = {"rows": rows, "duration_s": None, "sample_rate_hz": None, "columns": {}}
+
+    t = columns.get(time_column)
+    if t is not None:
+        t = t[np.isfinite(t)]
+        if t.size >= 2:
+            duration = float(t.max() - t.min()) * time_scale
+            out["duration_s"] = round(duration, 6)
+            if duration > 0:
+                out["sample_rate_hz"] = round((t.size - 1) / duration, 3)
+
+    for name, values in columns.items():
+        if name != time_column:
+            out["columns"][name] = column_stats(values)
+    return out
@@ -0,0 +1,171 @@
+# services/tx_queue.py
+
+import logging
+import queue
+import threading
+import time
+
+from django.db import close_old_connections
+from django.utils import timezone
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+
+from services.flight_cache import flight_cache
+from services.flight_registry import flight_registry
+
+RECEIPT_POLL_SECONDS = 2.0
+RECEIPT_TIMEOUT_SECONDS = 600.0
+
+logger = logging.getLogger(__name__)
+
+
+class TransactionQueue:
+    """
+    Background worker that owns signing, sending and receipt polling for
+    logFlight transactions, so request threads only enqueue a job.
+
+    Jobs live in ledger.models.TransactionJob, which is the status source
+    for the API: queued -> sent -> mined | failed. Queued jobs are sent
+    back to back (nonces come from the shared NonceManager); receipts for
+    everything in flight are polled together between sends. When the
+    worker starts it picks up jobs a previous process left behind: queued
+    ones are sent, sent ones are polled (and time out as usual).
+    """
+
+    def __init__(self, poll_interval: float = RECEIPT_POLL_SECONDS):
+        self.poll_interval = poll_interval
+        self._queue = queue.Queue()
+        self._in_flight = {}  # job pk -> (tx_hash, sent_at)
+        self._thread = None
+        self._recovered = False
+        self._lock = threading.Lock()
+
+    def submit(self, mission_id: str, mission_key: bytes, s3_key: str):
+        from ledger.models import TransactionJob
+
+        job = TransactionJob.objects.create(
+            mission_id=mission_id,
+            mission_key=Web3.to_hex(mission_key),
+            s3_key=s3_key,
+        )
+        self._ensure_started()
+        self._queue.put(job.pk)
+        return job
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="tx-queue", daemon=True
+                )
+                self._thread.start()
+
+    def _recover(self):
+        """Re-enqueue queued jobs and resume polling sent ones from the DB."""
+        from ledger.models import TransactionJob
+
+        jobs = TransactionJob.objects.filter(
+            status__in=[TransactionJob.QUEUED, TransactionJob.SENT]
+        ).order_by("pk")
+        now, wall_now = time.monotonic(), timezone.now()
+        for job in jobs:
+            if job.status == TransactionJob.QUEUED:
+                self._queue.put(job.pk)
+            elif job.tx_hash:
+                # Keep the original send time so the receipt timeout still holds
+                age = (wall_now - job.updated_at).total_seconds()
+                self._in_flight[job.pk] = (job.tx_hash, now - max(age, 0.0))
+        self._recovered = True
+
+    def _run(self):
+        if not self._recovered:
+            try:
+                self._recover()
+            except Exception:
+                logger.exception("Transaction queue recovery failed")
+            finally:
+                close_old_connections()
+        while True:
+            timeout = self.poll_interval if self._in_flight else None
+            try:
+                self._send(self._queue.get(timeout=timeout))
+                # Send everything else that is waiting before polling
+                while True:
+                    self._send(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            except Exception:
+                logger.exception("Transaction queue send failed")
+
+            try:
+                self._poll_receipts()
+            except Exception:
+                logger.exception("Transaction queue receipt polling failed")
+            finally:
+                close_old_connections()
+
+    def _send(self, pk):
+        from ledger.models import TransactionJob
+
+        job = TransactionJob.objects.get(pk=pk)
+        if job.status != TransactionJob.QUEUED:
+            return  # enqueued twice (by submit and by recovery) and already sent
+        try:
+            registry = flight_registry()
+            tx_hash = registry.send(
+                registry.contract.functions.logFlight(Web3.to_bytes(hexstr=job.mission_key), job.s3_key)
+            )
+        except Exception as e:
+            job.status = TransactionJob.FAILED
+            job.error = str(e)
+        else:
+            job.status = TransactionJob.SENT
+            job.tx_hash = tx_hash
+            self._in_flight[pk] = (tx_hash, time.monotonic())
+        job.save(update_fields=["status", "tx_hash", "error", "updated_at"])
+
+    def _poll_receipts(self):
+        from ledger.models import TransactionJob
+
+        w3 = flight_registry().w3
+        for pk, (tx_hash, sent_at) in list(self._in_flight.items()):
+            try:
+                receipt = w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                if time.monotonic() - sent_at > RECEIPT_TIMEOUT_SECONDS:
+                    del self._in_flight[pk]
+                    TransactionJob.objects.filter(pk=pk).update(
+                        status=TransactionJob.FAILED,
+                        error="Timed out waiting for receipt",
+                        updated_at=timezone.now(),
+                    )
+                continue
+            except Exception:
+                # Node hiccup: keep the job and try again next round
+                continue
+
+            del self._in_flight[pk]
+            job = TransactionJob.objects.get(pk=pk)
+            flight_cache().invalidate(job.mission_key)
+            flight_cache().observe_block(receipt.blockNumber)
+            TransactionJob.objects.filter(pk=pk).update(
+                status=TransactionJob.MINED if receipt.status == 1 else TransactionJob.FAILED,
+                block_number=receipt.blockNumber,
+                receipt_status=receipt.status,
+                gas_used=receipt.gasUsed,
+                error="" if receipt.status == 1 else "Transaction reverted",
+                updated_at=timezone.now(),
+            )
+
+
+_default_queue = None
+_default_lock = threading.Lock()
+
+
+def default_queue() -> TransactionQueue:
+    """Process-wide queue used by the ledger views."""
+    global _default_queue
+    with _default_lock:
+        if _default_queue is None:
+            _default_queue = TransactionQueue()
+        return _default_queue
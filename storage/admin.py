@@ -1,3 +1,7 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import FlightVersion, FlightVersionSync, StoredSegment
+
+admin.site.register(FlightVersion)
+admin.site.register(FlightVersionSync)
+admin.site.register(StoredSegment)
@@ -0,0 +1,198 @@
+import io
+import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import numpy as np
+from botocore.exceptions import ClientError
+from django.conf import settings
+
+from services.telemetry import parse_table, summarize, to_columns
+from .models import FlightVersion, StoredSegment
+from .s3_client import columns_key
+from .segments import range_fetcher
+
+# Columnar telemetry sidecars:
+#
+#   <prefix>/<flight_id>/columns/<version_id>.npz
+#
+# One per log version, holding the telemetry lines that version appended
+# (bytes [offset, size)) parsed into a float64 (rows, fields) table, plus
+# a JSON "meta" entry (offset, size, rows, header, prevVersionId: the
+# version holding bytes [0, offset)). A version's columns are the tables
+# of its chain of predecessors back to one written from offset 0, so
+# stats never re-read or re-parse the raw log. Sidecars are written by
+# the uploader (logUploadSim --columns) or built from the log the first
+# time a version's stats are asked for.
+
+SIDECAR_CONTENT_TYPE = "application/octet-stream"
+
+
+def put_sidecar(
+    s3,
+    bucket: str,
+    flight_id: str,
+    version_id: str,
+    offset: int,
+    size: int,
+    data,
+    prev_version_id: Optional[str] = None,
+):
+    """
+    Parse `data` (bytes [offset, size) of version `version_id`, following
+    version `prev_version_id` when offset > 0) and upload it as that
+    version's sidecar. Only a part starting the log can have a header
+    line. Returns (meta, table).
+    """
+    header, table = parse_table(data, header=offset == 0)
+    meta = {
+        "flightId": flight_id,
+        "versionId": version_id,
+        "prevVersionId": prev_version_id if offset else None,
+        "offset": offset,
+        "size": size,
+        "rows": int(table.shape[0]),
+        "header": header,
+    }
+    buf = io.BytesIO()
+    np.savez_compressed(buf, table=table, meta=np.array(json.dumps(meta)))
+    s3.put_object(
+        Bucket=bucket,
+        Key=columns_key(flight_id, version_id),
+        Body=buf.getvalue(),
+        ContentType=SIDECAR_CONTENT_TYPE,
+    )
+    return meta, table
+
+
+def read_sidecar(s3, bucket: str, flight_id: str, version_id: str):
+    """(meta, table) of a version's sidecar, or None if it has none yet."""
+    try:
+        resp = s3.get_object(Bucket=bucket, Key=columns_key(flight_id, version_id))
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+            return None
+        raise
+    with np.load(io.BytesIO(resp["Body"].read()), allow_pickle=False) as npz:
+        return json.loads(str(npz["meta"])), npz["table"]
+
+
+def version_parts(flight_id: str, version: FlightVersion) -> list:
+    """
+    What the indexes know of `version`'s chain, newest first: one
+    (version_id, offset, size, prev_version_id) per version, following the
+    upload index's predecessor links (storage.upload_index). The chain
+    ends at a version written from offset 0 or, where the links run out,
+    at a version read whole from offset 0. Used to fetch sidecars ahead
+    and to build missing ones; the sidecars' own meta has the last word.
+    """
+    sizes = dict(
+        FlightVersion.objects.filter(flight_id=flight_id).values_list("version_id", "size")
+    )
+    rows = {
+        r.version_id: r
+        for r in StoredSegment.objects.filter(bucket=settings.AWS_S3_BUCKET, key=version.key)
+        .exclude(version_id="").only("version_id", "prev_version_id", "offset", "size")
+    }
+    parts, current = [], version.version_id
+    for _ in range(len(sizes)):
+        size, row = sizes[current], rows.get(current)
+        prev = row.prev_version_id if row is not None and row.size == size else None
+        if not row or not row.offset or sizes.get(prev) != row.offset:
+            break
+        parts.append((current, row.offset, size, prev))
+        current = prev
+    parts.append((current, 0, sizes[current], None))
+    return parts
+
+
+def _build_part(s3, bucket: str, flight_id: str, key: str, version_id: str, offset: int, size: int, prev):
+    data = range_fetcher()(s3, bucket, key, version_id, offset, size)
+    return put_sidecar(s3, bucket, flight_id, version_id, offset, size, data, prev)
+
+
+def _usable(part, size: int) -> bool:
+    if part is None:
+        return False
+    meta = part[0]
+    return meta["size"] == size and (meta["offset"] == 0 or bool(meta.get("prevVersionId")))
+
+
+def version_columns(s3, bucket: str, flight_id: str, key: str, parts, max_workers: int = 8) -> dict:
+    """
+    Column arrays of a whole log version (the first of `parts`, see
+    version_parts) from its chain of sidecars, following each sidecar's
+    prevVersionId back to offset 0. The sidecars `parts` predicts are
+    fetched `max_workers` at a time; missing ones are built from the log.
+    A version whose predecessor is gone is rebuilt whole, so the columns
+    always cover the entire log or an error is raised.
+    """
+    known = {version_id: (offset, size, prev) for version_id, offset, size, prev in parts}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        fetched = dict(zip(known, pool.map(lambda v: read_sidecar(s3, bucket, flight_id, v), known)))
+
+    def load(version_id: str, size: int):
+        part = fetched[version_id] if version_id in fetched else read_sidecar(s3, bucket, flight_id, version_id)
+        if not _usable(part, size):
+            offset, known_size, prev = known.get(version_id, (0, size, None))
+            if known_size != size:
+                offset, prev = 0, None
+            part = _build_part(s3, bucket, flight_id, key, version_id, offset, size, prev)
+        return part
+
+    version_id, size = parts[0][0], parts[0][2]
+    loaded = [load(version_id, size)]
+    while loaded[-1][0]["offset"]:
+        meta = loaded[-1][0]
+        try:
+            if any(m["versionId"] == meta["prevVersionId"] for m, _ in loaded):
+                raise ValueError(f"Sidecar chain of {version_id} loops")
+            loaded.append(load(meta["prevVersionId"], meta["offset"]))
+        except (ClientError, ValueError):
+            # The predecessor is gone: read this version from the start
+            loaded[-1] = _build_part(
+                s3, bucket, flight_id, key, meta["versionId"], 0, meta["size"], None
+            )
+    loaded.reverse()
+
+    names = loaded[0][0]["header"]
+    return to_columns([table for _, table in loaded], names or settings.TELEMETRY_COLUMNS)
+
+
+# Stats per log version; versions never change, so entries never go stale.
+STATS_CACHE_SIZE = 256
+
+_stats = OrderedDict()
+_stats_lock = threading.Lock()
+
+
+def cached_stats(bucket: str, version_id: str) -> Optional[dict]:
+    with _stats_lock:
+        stats = _stats.get((bucket, version_id))
+        if stats is not None:
+            _stats.move_to_end((bucket, version_id))
+        return stats
+
+
+def version_stats(s3, bucket: str, flight_id: str, version: FlightVersion, parts) -> dict:
+    """
+    Vectorized summary (duration, sample rate, per-column stats such as
+    altitude and speed) of `version`, whose version_parts are `parts`.
+    """
+    stats = cached_stats(bucket, version.version_id)
+    if stats is None:
+        columns = version_columns(s3, bucket, flight_id, version.key, parts)
+        stats = {
+            "flight_id": flight_id,
+            "version_id": version.version_id,
+            "seq": version.seq,
+            "size": version.size,
+            **summarize(columns, settings.TELEMETRY_TIME_COLUMN, settings.TELEMETRY_TIME_SCALE),
+        }
+        with _stats_lock:
+            _stats[(bucket, version.version_id)] = stats
+            while len(_stats) > STATS_CACHE_SIZE:
+                _stats.popitem(last=False)
+    return stats
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.25 on 2026-10-17 03:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FlightVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('flight_id', models.CharField(max_length=255)),
+                ('key', models.CharField(max_length=1024)),
+                ('version_id', models.CharField(max_length=1024)),
+                ('seq', models.PositiveIntegerField()),
+                ('size', models.PositiveBigIntegerField()),
+                ('etag', models.CharField(blank=True, max_length=255)),
+                ('last_modified', models.DateTimeField()),
+                ('is_latest', models.BooleanField(default=False)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='FlightVersionSync',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('flight_id', models.CharField(max_length=255, unique=True)),
+                ('key', models.CharField(max_length=1024)),
+                ('synced_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='flightversion',
+            constraint=models.UniqueConstraint(fields=('flight_id', 'version_id'), name='unique_flight_version'),
+        ),
+        migrations.AddConstraint(
+            model_name='flightversion',
+            constraint=models.UniqueConstraint(fields=('flight_id', 'seq'), name='unique_flight_version_seq'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.25 on 2026-10-17 04:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('storage', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.CharField(max_length=255)),
+                ('key', models.CharField(max_length=1024)),
+                ('tip_hash', models.CharField(max_length=66)),
+                ('flight_id', models.CharField(max_length=255)),
+                ('seq_no', models.PositiveIntegerField()),
+                ('offset', models.PositiveBigIntegerField()),
+                ('size', models.PositiveBigIntegerField()),
+                ('version_id', models.CharField(blank=True, max_length=1024)),
+                ('segment_key', models.CharField(blank=True, max_length=1024)),
+                ('segment_version_id', models.CharField(blank=True, max_length=1024)),
+                ('stored_size', models.PositiveBigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='storedsegment',
+            constraint=models.UniqueConstraint(fields=('bucket', 'key', 'tip_hash'), name='unique_stored_segment'),
+        ),
+    ]
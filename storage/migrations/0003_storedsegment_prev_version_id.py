@@ -0,0 +1,18 @@
+# Generated by Django 4.2.25 on 2026-10-17 04:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('storage', '0002_storedsegment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storedsegment',
+            name='prev_version_id',
+            field=models.CharField(blank=True, max_length=1024),
+        ),
+    ]
@@ -1,3 +1,69 @@
 from django.db import models
 
-# Create your models here.
+
+class FlightVersion(models.Model):
+    """
+    One S3 object version of a flight log, as indexed by storage.utils.sync_versions.
+    """
+    flight_id = models.CharField(max_length=255)
+    key = models.CharField(max_length=1024)
+    version_id = models.CharField(max_length=1024)
+    seq = models.PositiveIntegerField()  # upload order within the flight, oldest = 1
+    size = models.PositiveBigIntegerField()
+    etag = models.CharField(max_length=255, blank=True)
+    last_modified = models.DateTimeField()
+    is_latest = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["flight_id", "version_id"], name="unique_flight_version"),
+            models.UniqueConstraint(fields=["flight_id", "seq"], name="unique_flight_version_seq"),
+        ]
+
+    def __str__(self):
+        return f"{self.flight_id} #{self.seq} {self.version_id}"
+
+
+class FlightVersionSync(models.Model):
+    """
+    When a flight's version index was last refreshed from S3.
+    """
+    flight_id = models.CharField(max_length=255, unique=True)
+    key = models.CharField(max_length=1024)
+    synced_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.flight_id} @ {self.synced_at}"
+
+
+class StoredSegment(models.Model):
+    """
+    A checkpoint segment already persisted to S3, keyed by its chain hash
+    (H_n = sha256(H_{n-1} || segment), which addresses the segment together
+    with everything before it, i.e. the exact log prefix of one version).
+
+    Maps it to the log version holding that prefix and, in the segmented
+    layout, to the segment object, so uploads can skip what is stored and
+    resume after the last confirmed checkpoint (see storage.upload_index).
+    """
+    bucket = models.CharField(max_length=255)
+    key = models.CharField(max_length=1024)  # flight_key: flight.log or manifest.json
+    tip_hash = models.CharField(max_length=66)
+    flight_id = models.CharField(max_length=255)
+    seq_no = models.PositiveIntegerField()
+    offset = models.PositiveBigIntegerField()
+    size = models.PositiveBigIntegerField()
+    version_id = models.CharField(max_length=1024, blank=True)  # "" until the version is confirmed
+    prev_version_id = models.CharField(max_length=1024, blank=True)  # version holding [0, offset)
+    segment_key = models.CharField(max_length=1024, blank=True)
+    segment_version_id = models.CharField(max_length=1024, blank=True)
+    stored_size = models.PositiveBigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["bucket", "key", "tip_hash"], name="unique_stored_segment"),
+        ]
+
+    def __str__(self):
+        return f"{self.flight_id} #{self.seq_no} {self.tip_hash[:12]} -> {self.version_id or 'unconfirmed'}"
@@ -1,16 +1,77 @@
+import threading
+
 import boto3
+from botocore.config import Config
 from django.conf import settings
 
-def s3_client():
+from services.metrics import instrument_s3
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _build_client():
     kwargs = {"region_name": settings.AWS_REGION}
     if getattr(settings, "AWS_ACCESS_KEY_ID", None) and getattr(settings, "AWS_SECRET_ACCESS_KEY", None):
         kwargs.update({
             "aws_access_key_id": settings.AWS_ACCESS_KEY_ID,
             "aws_secret_access_key": settings.AWS_SECRET_ACCESS_KEY,
         })
-    return boto3.client("s3", **kwargs)
+    kwargs["config"] = Config(
+        max_pool_connections=settings.AWS_S3_MAX_POOL_CONNECTIONS,
+        retries={
+            "mode": settings.AWS_S3_RETRY_MODE,
+            "total_max_attempts": settings.AWS_S3_MAX_ATTEMPTS,
+        },
+        connect_timeout=settings.AWS_S3_CONNECT_TIMEOUT,
+        read_timeout=settings.AWS_S3_READ_TIMEOUT,
+        tcp_keepalive=True,
+    )
+    # Own session: the boto3 default session is not safe to create clients
+    # from concurrently.
+    return instrument_s3(boto3.session.Session().client("s3", **kwargs))
+
+
+def s3_client():
+    """
+    Process-wide S3 client. boto3 clients are thread-safe, so every request
+    and worker thread shares this one and its pool of keep-alive
+    connections; credentials and endpoints are resolved only once.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _build_client()
+    return _client
+
+
+def set_s3_client(client):
+    """
+    Replace the process-wide client, e.g. with the in-memory stub used by
+    the benchmarks. Returns the previous one.
+    """
+    global _client
+    with _client_lock:
+        previous, _client = _client, client
+    return previous
+
+def is_segmented() -> bool:
+    return settings.AWS_S3_FLIGHT_LAYOUT == "segmented"
 
 def flight_key(flight_id: str) -> str:
-    # e.g., flights/flight-001/flight.log
+    # e.g., flights/flight-001/flight.log (flights/flight-001/manifest.json
+    # in the segmented layout); its S3 versions are the flight's versions.
+    prefix = settings.AWS_S3_FLIGHT_PREFIX.strip("/")
+    name = "manifest.json" if is_segmented() else "flight.log"
+    return f"{prefix}/{flight_id}/{name}"
+
+def columns_key(flight_id: str, version_id: str) -> str:
+    # e.g., flights/flight-001/columns/<version_id>.npz
+    prefix = settings.AWS_S3_FLIGHT_PREFIX.strip("/")
+    return f"{prefix}/{flight_id}/columns/{version_id}.npz"
+
+def segment_key(flight_id: str, seq: int) -> str:
+    # e.g., flights/flight-001/segments/00000001.log.gz
     prefix = settings.AWS_S3_FLIGHT_PREFIX.strip("/")
-    return f"{prefix}/{flight_id}/flight.log"
\ No newline at end of file
+    return f"{prefix}/{flight_id}/segments/{seq:08d}.log.gz"
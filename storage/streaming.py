@@ -0,0 +1,48 @@
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+# Bytes read from S3 per chunk written to the client.
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+
+def _iter_body(body, chunk_size: int):
+    try:
+        yield from body.iter_chunks(chunk_size)
+    finally:
+        body.close()
+
+
+async def _aiter_chunks(chunks):
+    # Each blocking read runs on a worker thread, off the event loop
+    read = sync_to_async(next, thread_sensitive=False)
+    try:
+        while True:
+            chunk = await read(chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+    finally:
+        chunks.close()
+
+
+def stream_body(request, body, chunk_size: int = STREAM_CHUNK_SIZE):
+    """
+    Iterator over an S3 StreamingBody for StreamingHttpResponse, holding
+    at most one chunk in memory.
+
+    Django only streams iterators that match the server: under ASGI the
+    response needs an async iterator, under WSGI a sync one (a mismatch
+    makes Django read the whole body into a list first). So the kind is
+    picked from the request.
+    """
+    return stream_chunks(request, _iter_body(body, chunk_size))
+
+
+def stream_chunks(request, chunks):
+    """
+    stream_body for any generator of byte chunks that does blocking reads
+    (e.g. storage.segments.iter_range); same server matching.
+    """
+    if isinstance(request, ASGIRequest):
+        return _aiter_chunks(chunks)
+    return chunks
@@ -0,0 +1,378 @@
+import asyncio
+import json
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import close_old_connections
+
+from services.hash_chain import SEED, HashChain, to_hex, verify_chain
+from .models import FlightVersion, StoredSegment
+from .s3_client import s3_client, flight_key
+from .segments import range_fetcher
+from .utils import sync_versions, _version_dict
+
+POLL_INTERVAL_SECONDS = 2.0
+# A poller with no subscribers for this long stops and is discarded.
+IDLE_STOP_SECONDS = 30.0
+# Recent version events kept per flight for Last-Event-ID replay.
+HISTORY_SIZE = 64
+# Events buffered per subscriber; a client that falls this far behind is
+# disconnected (and can resume with Last-Event-ID).
+SUBSCRIBER_QUEUE_SIZE = 256
+# Appended text sent inline per event; larger deltas are flagged as
+# truncated and can be fetched from the delta endpoint.
+MAX_EVENT_DATA_BYTES = 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+class Subscriber:
+    """
+    One SSE client. Events are pushed from the poller thread into a
+    queue.Queue (WSGI) or, thread-safely, an asyncio.Queue on the client's
+    event loop (ASGI), so waiting clients hold no threads under ASGI.
+    """
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE) if loop else queue.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def put(self, event):
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._put, event)
+        else:
+            self._put(event)
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except (queue.Full, asyncio.QueueFull):
+            self.overflowed = True
+
+
+class FlightTail:
+    """
+    Shared poller for one flight: a single background thread refreshes the
+    version index (one small ListObjectVersions per interval), Range-GETs
+    only the bytes each new version appended, advances the hash chain and
+    pushes (kind, event) pairs to every subscriber. Any number of viewers
+    cost the same S3 traffic as one.
+
+    Versions are chained to their predecessor, which is not always the
+    one uploaded before them: a resumed run extends an earlier version
+    (the upload index's prev_version_id) and a re-upload from byte zero
+    starts a new chain (a version smaller than the one before it). Such a
+    version's delta is read from its real predecessor, or from offset 0.
+
+    On start it catches up to the current head: the tip of the latest
+    version is taken from a stored checkpoint when there is one, otherwise
+    recomputed once along its predecessors.
+    """
+
+    def __init__(self, flight_id: str, interval: float = POLL_INTERVAL_SECONDS):
+        self.flight_id = flight_id
+        self.key = flight_key(flight_id)
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._history = deque(maxlen=HISTORY_SIZE)
+        self._head = None  # latest version event, once caught up
+        self._versions = None  # version_id -> FlightVersion, once caught up
+        self._last = None  # latest indexed version
+        self._links = {}  # version_id -> predecessor FlightVersion, None from offset 0
+        self._tips = {}  # version_id -> tipHash hex
+        self._thread = None
+        self._idle_since = time.monotonic()
+
+    # -----------------------------
+    # Subscribers
+    # -----------------------------
+    def subscribe(self, loop=None, last_seq: Optional[int] = None):
+        """
+        Register a subscriber and return (subscriber, backlog). Callers go
+        through the module-level subscribe(), which picks the live poller.
+
+        The backlog is the missed version events after `last_seq` or, for
+        a fresh client, the current head; taking it under the publish lock
+        means nothing is lost or sent twice.
+        """
+        sub = Subscriber(loop)
+        with self._lock:
+            self._subscribers.add(sub)
+            if last_seq is not None:
+                backlog = [("version", e) for e in self._history if e["seq"] > last_seq]
+            else:
+                backlog = [("head", self._head)] if self._head else []
+        self.start()
+        return sub, backlog
+
+    def unsubscribe(self, sub: Subscriber):
+        with self._lock:
+            self._subscribers.discard(sub)
+            if not self._subscribers:
+                self._idle_since = time.monotonic()
+
+    def _publish(self, kind: str, event: dict):
+        with self._lock:
+            if kind == "version":
+                self._history.append(event)
+            self._head = event
+            for sub in self._subscribers:
+                sub.put((kind, event))
+
+    # -----------------------------
+    # Polling
+    # -----------------------------
+    def _versions_after(self, seq: int):
+        return list(
+            FlightVersion.objects.filter(flight_id=self.flight_id, seq__gt=seq).order_by("seq")
+        )
+
+    def _add_versions(self, versions):
+        """Index newly synced `versions` (oldest first) and link each to its predecessor."""
+        rows = {
+            r.version_id: r
+            for r in StoredSegment.objects.filter(
+                bucket=settings.AWS_S3_BUCKET, key=self.key,
+                version_id__in=[v.version_id for v in versions],
+            ).only("version_id", "prev_version_id", "offset", "size")
+        }
+        for v in versions:
+            self._versions[v.version_id] = v
+            self._links[v.version_id] = self._predecessor(v, rows.get(v.version_id))
+            self._last = v
+
+    def _predecessor(self, v, row):
+        if row is not None and row.size == v.size:
+            if not row.offset:
+                return None
+            prev = self._versions.get(row.prev_version_id)
+            if prev is not None and prev.size == row.offset:
+                return prev
+        # Not in the upload index: a version extends the one uploaded before
+        # it unless it is smaller, i.e. the log was uploaded again from byte 0
+        if self._last is not None and self._last.size <= v.size:
+            return self._last
+        return None
+
+    def _tip(self, v) -> str:
+        """
+        The tip of version `v`: known, from a stored checkpoint of it or of
+        a predecessor, or else computed along its predecessors.
+        """
+        from ledger.models import CheckpointProof
+
+        lineage = []  # newest first, back to `base`
+        base = v
+        while base is not None and base.version_id not in self._tips:
+            lineage.append(base)
+            base = self._links[base.version_id]
+        if not lineage:
+            return self._tips[v.version_id]
+
+        proofs = dict(
+            CheckpointProof.objects.filter(
+                flight_id=self.flight_id, s3_version_id__in=[p.version_id for p in lineage]
+            ).values_list("s3_version_id", "tip_hash")
+        )
+        for i, part in enumerate(lineage):
+            if part.version_id in proofs:
+                self._tips[part.version_id] = proofs[part.version_id]
+                lineage, base = lineage[:i], part
+                break
+
+        parts = lineage[::-1]
+        if base is None:
+            results = verify_chain(
+                [_version_dict(p) for p in parts], {}, settings.AWS_S3_BUCKET, self.key,
+                fetch=range_fetcher(),
+            )
+            tips = [r["tip_hash"] for r in results]
+        else:
+            s3, fetch = s3_client(), range_fetcher()
+            chain, offset, tips = HashChain(bytes.fromhex(self._tips[base.version_id][2:])), base.size, []
+            for p in parts:
+                chain.update(fetch(s3, settings.AWS_S3_BUCKET, self.key, p.version_id, offset, p.size))
+                tips.append(chain.tip_hex)
+                offset = p.size
+        self._tips.update(zip([p.version_id for p in parts], tips))
+        return self._tips[v.version_id]
+
+    def _catch_up(self):
+        sync_versions(self.flight_id)
+        versions = self._versions_after(0)
+        self._versions = {}
+        if not versions:
+            return
+
+        self._add_versions(versions)
+        latest = versions[-1]
+        self._publish("head", self._event(latest, latest.size, b"", self._tip(latest)))
+
+    def _event(self, v, offset: int, delta: bytes, tip_hash: str) -> dict:
+        truncated = len(delta) > MAX_EVENT_DATA_BYTES
+        return {
+            "flight_id": self.flight_id,
+            "version_id": v.version_id,
+            "seq": v.seq,
+            "offset": offset,
+            "size": v.size,
+            "tipHash": tip_hash,
+            "data": "" if truncated else delta.decode("utf-8", errors="replace"),
+            "truncated": truncated,
+        }
+
+    def poll_once(self):
+        if self._versions is None:
+            self._catch_up()
+            return
+
+        # Other requests may have indexed the new versions already, so go
+        # by the index rather than by what this sync found.
+        sync_versions(self.flight_id)
+        versions = self._versions_after(self._last.seq if self._last else 0)
+        if not versions:
+            return
+        self._add_versions(versions)
+        s3, fetch = s3_client(), range_fetcher()
+        for v in versions:
+            # offset 0 (no predecessor) restarts the log: clients reset it
+            prev = self._links[v.version_id]
+            offset, tip = (prev.size, self._tip(prev)) if prev else (0, to_hex(SEED))
+            delta = fetch(s3, settings.AWS_S3_BUCKET, self.key, v.version_id, offset, v.size)
+            chain = HashChain(bytes.fromhex(tip[2:]))
+            chain.update(delta)
+            self._tips[v.version_id] = chain.tip_hex
+            self._publish("version", self._event(v, offset, delta, chain.tip_hex))
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name=f"flight-tail-{self.flight_id}", daemon=True
+            )
+            self._thread.start()
+
+    def _idle(self) -> bool:
+        with self._lock:
+            return not self._subscribers and time.monotonic() - self._idle_since > IDLE_STOP_SECONDS
+
+    def _run(self):
+        try:
+            while not _release_if_idle(self):
+                try:
+                    self.poll_once()
+                except Exception:
+                    logger.exception("Tail poll failed for flight %s", self.flight_id)
+                finally:
+                    close_old_connections()
+                time.sleep(self.interval)
+        finally:
+            close_old_connections()
+
+
+_tails = {}
+_tails_lock = threading.Lock()
+
+
+def subscribe(flight_id: str, loop=None, last_seq: Optional[int] = None):
+    """
+    Join the process-wide poller for `flight_id` (started on first use).
+    Returns (tail, subscriber, backlog).
+    """
+    with _tails_lock:
+        tail = _tails.get(flight_id)
+        if tail is None:
+            tail = _tails[flight_id] = FlightTail(flight_id)
+        sub, backlog = tail.subscribe(loop, last_seq)
+        return tail, sub, backlog
+
+
+def _release_if_idle(tail: FlightTail) -> bool:
+    # Checked under the registry lock, like subscribe(), so a new client
+    # either finds this tail still polling or gets a fresh one.
+    with _tails_lock:
+        if not tail._idle():
+            return False
+        if _tails.get(tail.flight_id) is tail:
+            del _tails[tail.flight_id]
+        return True
+
+
+# -----------------------------
+# Server-Sent Events framing
+# -----------------------------
+KEEPALIVE_SECONDS = 15.0
+# Streams end after this long and EventSource reconnects with
+# Last-Event-ID. Django's ASGI handler does not end a streaming response
+# when its client goes away, so this is what bounds a closed tab's
+# subscription (and the poller it keeps alive).
+MAX_STREAM_SECONDS = 300.0
+
+
+def sse_event(kind: str, event: dict) -> bytes:
+    return f"id: {event['seq']}\nevent: {kind}\ndata: {json.dumps(event)}\n\n".encode()
+
+
+def iter_events(tail: FlightTail, sub: Subscriber, backlog):
+    """Sync SSE stream for WSGI."""
+    deadline = time.monotonic() + MAX_STREAM_SECONDS
+    try:
+        for kind, event in backlog:
+            yield sse_event(kind, event)
+        while not sub.overflowed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                kind, event = sub.queue.get(timeout=min(KEEPALIVE_SECONDS, remaining))
+            except queue.Empty:
+                yield b": keepalive\n\n"
+                continue
+            yield sse_event(kind, event)
+    finally:
+        tail.unsubscribe(sub)
+
+
+async def aiter_events(tail: FlightTail, sub: Subscriber, backlog):
+    """Async SSE stream for ASGI."""
+    deadline = time.monotonic() + MAX_STREAM_SECONDS
+    try:
+        for kind, event in backlog:
+            yield sse_event(kind, event)
+        while not sub.overflowed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                kind, event = await asyncio.wait_for(sub.queue.get(), min(KEEPALIVE_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                yield b": keepalive\n\n"
+                continue
+            yield sse_event(kind, event)
+    finally:
+        tail.unsubscribe(sub)
+
+
+def event_stream(request, flight_id: str):
+    """
+    SSE iterator for StreamingHttpResponse: async under ASGI (subscribers
+    wait on the event loop), sync under WSGI; see storage.streaming.
+    A Last-Event-ID header resumes after that version seq. Streams end
+    after MAX_STREAM_SECONDS.
+    """
+    last_id = request.headers.get("Last-Event-ID", "")
+    last_seq = int(last_id) if last_id.isdigit() else None
+    if isinstance(request, ASGIRequest):
+        tail, sub, backlog = subscribe(flight_id, asyncio.get_running_loop(), last_seq)
+        return aiter_events(tail, sub, backlog)
+    tail, sub, backlog = subscribe(flight_id, None, last_seq)
+    return iter_events(tail, sub, backlog)
@@ -0,0 +1,337 @@
+import asyncio
+import contextlib
+import hashlib
+import io
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from botocore.exceptions import ClientError
+from django.test import TestCase, override_settings
+
+from benchmarks.s3_stub import InMemoryS3
+from services.hash_chain import SEED, HashChain, chain_update, verify_chain
+from services.log_reader import MappedLog
+from services.logUploadSim import chunk_plan, upload_steps, verify_uploads
+from services.telemetry import parse_table
+from .columns import put_sidecar, version_parts, version_stats
+from .models import FlightVersion, StoredSegment
+from .s3_client import flight_key, set_s3_client
+from .tail import FlightTail, aiter_events, iter_events
+from .uploads import _copy_ranges, can_append, put_appended_version, put_full_version
+from .utils import sync_versions
+
+BUCKET = "test-bucket"
+
+
+def write_log(path: Path, lines: int):
+    """Headerless telemetry (t, lat, lon, alt, speed, battery), 10 ms apart."""
+    with open(path, "w") as f:
+        for i in range(lines):
+            f.write(f"{i * 10},{i % 90}.5,{i % 180}.25,{100 + i % 50}.0,{i % 40}.5,{100 - i % 100}\n")
+
+
+@override_settings(AWS_S3_BUCKET=BUCKET, AWS_S3_FLIGHT_PREFIX="flights/")
+class S3TestCase(TestCase):
+    """A fresh in-memory bucket as the process-wide S3 client, and a log file."""
+
+    lines = 400
+
+    def setUp(self):
+        self.s3 = InMemoryS3()
+        self.addCleanup(set_s3_client, set_s3_client(self.s3))
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.source = Path(tmp.name) / "flight.log"
+        write_log(self.source, self.lines)
+
+    def upload(self, flight_id, chunks=4, mode="full", steps=None, **kwargs):
+        """Run upload_steps, stopping after `steps` steps; returns the checkpoints."""
+        with MappedLog(self.source) as log:
+            counts = chunk_plan(log.count_lines(), chunks)
+            plan = list(zip(counts, log.line_offsets(counts)))
+            uploads = upload_steps(log, plan, flight_id, self.s3, BUCKET, mode, **kwargs)
+            checkpoints = []
+            for _, _, _, checkpoint, _ in uploads:
+                checkpoints.append(checkpoint)
+                if len(checkpoints) == steps:
+                    uploads.close()  # interrupted
+                    break
+        return checkpoints
+
+    def verify(self, checkpoints) -> bool:
+        with contextlib.redirect_stdout(io.StringIO()):
+            return verify_uploads(checkpoints)
+
+    def stats(self, flight_id) -> dict:
+        """Stats of the flight's latest version, from its sidecars."""
+        sync_versions(flight_id)
+        version = FlightVersion.objects.filter(flight_id=flight_id).latest("seq")
+        return version_stats(self.s3, BUCKET, flight_id, version, version_parts(flight_id, version))
+
+    def versions(self, flight_id) -> int:
+        resp = self.s3.list_object_versions(Bucket=BUCKET, Prefix=flight_key(flight_id))
+        return len(resp["Versions"])
+
+
+class AppendUploadTests(S3TestCase):
+    def get(self, key, version_id) -> bytes:
+        return self.s3.get_object(Bucket=BUCKET, Key=key, VersionId=version_id)["Body"].read()
+
+    def test_appended_version_equals_previous_plus_delta(self):
+        key = flight_key("f1")
+        first = put_full_version(self.s3, BUCKET, key, b"a" * 100)
+        second = put_appended_version(self.s3, BUCKET, key, first, 100, b"b" * 20)
+
+        self.assertEqual(self.get(key, second), b"a" * 100 + b"b" * 20)
+        self.assertEqual(self.get(key, first), b"a" * 100)
+        self.assertEqual(self.s3.calls["UploadPartCopy"], 1)
+        self.assertEqual(self.s3.bytes_in, 120)  # the previous bytes were not re-sent
+
+    def test_empty_delta_copies_previous_version(self):
+        key = flight_key("f1")
+        first = put_full_version(self.s3, BUCKET, key, b"abc")
+        second = put_appended_version(self.s3, BUCKET, key, first, 3, b"")
+        self.assertEqual(self.get(key, second), b"abc")
+        self.assertEqual(self.s3.calls["UploadPart"], 0)
+
+    def test_failed_append_aborts_the_upload(self):
+        key = flight_key("f1")
+        put_full_version(self.s3, BUCKET, key, b"abc")
+        with self.assertRaises(ClientError):
+            put_appended_version(self.s3, BUCKET, key, "no-such-version", 3, b"d")
+        self.assertEqual(self.s3.calls["AbortMultipartUpload"], 1)
+
+    def test_can_append_needs_a_full_size_part(self):
+        self.assertFalse(can_append(None, 10 * 2**20))
+        self.assertFalse(can_append("v1", 2**20))
+        self.assertTrue(can_append("v1", 5 * 2**20))
+
+    @mock.patch("storage.uploads.MAX_COPY_PART_SIZE", 10)
+    def test_copy_ranges_cover_the_previous_version(self):
+        ranges = _copy_ranges(25)
+        self.assertEqual(ranges, [(0, 9), (9, 18), (18, 25)])
+
+    @mock.patch("storage.uploads.MIN_PART_SIZE", 64)
+    def test_append_mode_matches_full_mode(self):
+        appended = self.upload("f1", mode="append", resume=False)
+        full = self.upload("f2", resume=False)
+
+        self.assertGreater(self.s3.calls["UploadPartCopy"], 0)
+        for a, f in zip(appended, full):
+            self.assertEqual(a["tipHash"], f["tipHash"])
+            self.assertEqual(
+                self.get(flight_key("f1"), a["s3VersionId"]), self.get(flight_key("f2"), f["s3VersionId"])
+            )
+
+
+class HashChainTests(S3TestCase):
+    def test_chain_update_hashes_previous_tip_and_segment(self):
+        self.assertEqual(chain_update(SEED, b"abc"), hashlib.sha256(SEED + b"abc").digest())
+        chain = HashChain()
+        chain.update(b"ab")
+        chain.update(memoryview(b"c"))
+        self.assertEqual(chain.tip, chain_update(chain_update(SEED, b"ab"), b"c"))
+
+    def test_verify_chain_matches_checkpoints(self):
+        checkpoints = self.upload("f1", resume=False)
+        sync_versions("f1")
+        versions = list(FlightVersion.objects.filter(flight_id="f1").order_by("seq").values("version_id", "size"))
+        expected = {c["s3VersionId"]: c["tipHash"] for c in checkpoints}
+
+        results = verify_chain(versions, expected, BUCKET, flight_key("f1"), s3=self.s3, max_workers=2)
+        self.assertEqual([r["ok"] for r in results], [True] * 4)
+        self.assertEqual([r["tip_hash"] for r in results], [c["tipHash"] for c in checkpoints])
+
+    def test_verify_chain_reports_tampered_versions(self):
+        checkpoints = self.upload("f1", resume=False)
+        expected = {c["s3VersionId"]: c["tipHash"] for c in checkpoints}
+        # A rewritten version 3: same size, different bytes
+        data = self.source.read_bytes()
+        sync_versions("f1")
+        versions = list(FlightVersion.objects.filter(flight_id="f1").order_by("seq").values("version_id", "size"))
+        forged = put_full_version(self.s3, BUCKET, flight_key("f1"), data[:versions[2]["size"] - 1] + b"#")
+        expected[forged] = expected[versions[2]["version_id"]]
+        versions[2]["version_id"] = forged
+
+        results = verify_chain(versions, expected, BUCKET, flight_key("f1"), s3=self.s3)
+        self.assertEqual([r["ok"] for r in results], [True, True, False, False])
+
+    def test_verify_uploads_rejects_a_wrong_tip(self):
+        checkpoints = self.upload("f1", resume=False)
+        checkpoints[1] = dict(checkpoints[1], tipHash="0x" + "00" * 32)
+        self.assertFalse(self.verify(checkpoints))
+
+
+class ResumeTests(S3TestCase):
+    def test_rerun_after_interrupted_upload_reuses_stored_steps(self):
+        first = self.upload("f1", steps=2)
+        checkpoints = self.upload("f1")
+
+        self.assertEqual([c["s3VersionId"] for c in checkpoints[:2]], [c["s3VersionId"] for c in first])
+        self.assertEqual(self.versions("f1"), 4)
+        self.assertTrue(self.verify(checkpoints))
+
+    def test_rerun_with_lost_index_rows_verifies(self):
+        # Versions 5 and 6 extend version 2, after version 4 in S3 order
+        self.upload("f1")
+        StoredSegment.objects.filter(key=flight_key("f1"), seq_no__gt=2).delete()
+        checkpoints = self.upload("f1")
+
+        self.assertEqual(self.versions("f1"), 6)
+        self.assertEqual(checkpoints[2]["prevVersionId"], checkpoints[1]["s3VersionId"])
+        self.assertTrue(self.verify(checkpoints))
+
+    @mock.patch("storage.uploads.MIN_PART_SIZE", 64)
+    def test_append_mode_resume_verifies(self):
+        self.upload("f1", mode="append", steps=2)
+        StoredSegment.objects.filter(key=flight_key("f1"), seq_no=2).delete()
+        checkpoints = self.upload("f1", mode="append")
+
+        self.assertGreater(self.s3.calls["UploadPartCopy"], 0)
+        self.assertTrue(self.verify(checkpoints))
+
+    @mock.patch("storage.uploads.MIN_PART_SIZE", 64)
+    def test_stale_index_is_not_trusted(self):
+        self.upload("f1", mode="append", steps=2)
+        # The bucket is emptied; the index still lists both steps
+        self.s3 = InMemoryS3()
+        set_s3_client(self.s3)
+        checkpoints = self.upload("f1", mode="append")
+
+        self.assertEqual(self.versions("f1"), 4)
+        self.assertTrue(self.verify(checkpoints))
+
+    def test_no_resume_uploads_everything(self):
+        self.upload("f1")
+        self.upload("f1", resume=False)
+        self.assertEqual(self.versions("f1"), 8)
+
+
+@override_settings(AWS_S3_FLIGHT_LAYOUT="segmented")
+class SegmentedResumeTests(ResumeTests):
+    def test_append_mode_resume_verifies(self):
+        self.skipTest("mode does not apply to the segmented layout")
+
+    def test_stored_segment_without_manifest_is_reused(self):
+        self.upload("f1", steps=2)
+        StoredSegment.objects.filter(key=flight_key("f1"), seq_no=2).update(version_id="")
+        checkpoints = self.upload("f1")
+
+        segments = self.s3.list_object_versions(Bucket=BUCKET, Prefix="flights/f1/segments/")
+        self.assertEqual(len(segments["Versions"]), 4)
+        self.assertTrue(self.verify(checkpoints))
+
+
+class ColumnsTests(S3TestCase):
+    def assertWholeLog(self, stats):
+        self.assertEqual(stats["rows"], self.lines)
+        self.assertAlmostEqual(stats["duration_s"], (self.lines - 1) * 10 * 0.001)
+        self.assertEqual(stats["columns"]["alt"]["min"], 100.0)
+        self.assertEqual(stats["columns"]["alt"]["max"], 149.0)
+
+    @override_settings(TELEMETRY_TIME_SCALE=0.001)
+    def test_uploaded_sidecars_cover_the_whole_log(self):
+        self.upload("f1", columns=True)
+        puts = self.s3.calls["PutObject"]
+        self.assertWholeLog(self.stats("f1"))
+        self.assertEqual(self.s3.calls["PutObject"], puts)  # nothing rebuilt
+
+    @override_settings(TELEMETRY_TIME_SCALE=0.001)
+    def test_missing_sidecars_are_built(self):
+        self.upload("f1")
+        self.assertWholeLog(self.stats("f1"))
+
+    @override_settings(TELEMETRY_TIME_SCALE=0.001)
+    def test_resumed_run_follows_predecessors(self):
+        # The latest version is appended to version 2, not to version 4
+        self.upload("f1", columns=True)
+        StoredSegment.objects.filter(key=flight_key("f1"), seq_no__gt=2).delete()
+        self.upload("f1", columns=True)
+        self.assertWholeLog(self.stats("f1"))
+
+    @override_settings(TELEMETRY_TIME_SCALE=0.001)
+    def test_lost_predecessor_rebuilds_whole_version(self):
+        checkpoints = self.upload("f1", resume=False)
+        data = self.source.read_bytes()
+        offset = data.index(b"\n", len(data) // 2) + 1
+        put_sidecar(
+            self.s3, BUCKET, "f1", checkpoints[-1]["s3VersionId"], offset, len(data), data[offset:], "gone"
+        )
+        self.assertWholeLog(self.stats("f1"))
+
+    def test_header_only_detected_at_log_start(self):
+        data = b"2026-01-01T00:00:00Z,1.5\n2026-01-01T00:00:01Z,2.5\n"
+        names, table = parse_table(data, header=False)
+        self.assertIsNone(names)
+        self.assertEqual(table.shape, (2, 2))
+        names, table = parse_table(b"t,alt\n" + b"1,2\n", header=True)
+        self.assertEqual(names, ["t", "alt"])
+        self.assertEqual(table.shape, (1, 2))
+
+
+@override_settings(AWS_S3_FLIGHT_LAYOUT="segmented")
+class SegmentedColumnsTests(ColumnsTests):
+    pass
+
+
+class TailTests(S3TestCase):
+    def tail(self, flight_id) -> FlightTail:
+        tail = FlightTail(flight_id)
+        tail.poll_once()  # catch up
+        return tail
+
+    def assertTailsAt(self, tail, checkpoint):
+        tail.poll_once()
+        self.assertEqual(tail._head["tipHash"], checkpoint["tipHash"])
+        self.assertEqual(self.tail("f1")._head["tipHash"], checkpoint["tipHash"])
+
+    def test_new_versions_extend_the_head(self):
+        self.upload("f1", steps=2)
+        tail = self.tail("f1")
+        checkpoints = self.upload("f1")
+        self.assertTailsAt(tail, checkpoints[-1])
+        self.assertEqual(tail._head["offset"], tail._versions[checkpoints[2]["s3VersionId"]].size)
+
+    def test_reupload_from_byte_zero_restarts_the_chain(self):
+        self.upload("f1")
+        tail = self.tail("f1")
+        with mock.patch.object(FlightTail, "start"):  # polled by hand
+            sub, _ = tail.subscribe()
+        checkpoints = self.upload("f1", resume=False)
+        self.assertTailsAt(tail, checkpoints[-1])
+
+        events = [sub.queue.get_nowait()[1] for _ in range(4)]
+        self.assertEqual([e["tipHash"] for e in events], [c["tipHash"] for c in checkpoints])
+        self.assertEqual(events[0]["offset"], 0)
+
+    def test_resumed_run_extends_its_predecessor(self):
+        # Versions 5 and 6 extend version 2, after version 4 in S3 order
+        self.upload("f1")
+        tail = self.tail("f1")
+        StoredSegment.objects.filter(key=flight_key("f1"), seq_no__gt=2).delete()
+        checkpoints = self.upload("f1")
+        self.assertTailsAt(tail, checkpoints[-1])
+
+    @mock.patch("storage.tail.MAX_STREAM_SECONDS", 0.05)
+    @mock.patch.object(FlightTail, "start")
+    def test_streams_end_and_release_their_subscriber(self, start):
+        self.upload("f1")
+        tail = self.tail("f1")
+
+        sub, backlog = tail.subscribe()
+        chunks = list(iter_events(tail, sub, backlog))  # ends on its own
+        self.assertTrue(chunks[0].startswith(b"id: 4\nevent: head"))
+        self.assertFalse(tail._subscribers)
+
+        async def stream():
+            sub, backlog = tail.subscribe(asyncio.get_running_loop())
+            return [chunk async for chunk in aiter_events(tail, sub, backlog)]
+
+        self.assertTrue(asyncio.run(stream())[0].startswith(b"id: 4\nevent: head"))
+        self.assertFalse(tail._subscribers)
+
+
+@override_settings(AWS_S3_FLIGHT_LAYOUT="segmented")
+class SegmentedTailTests(TailTests):
+    pass
@@ -0,0 +1,106 @@
+from typing import Optional
+
+from botocore.exceptions import ClientError
+
+from .models import StoredSegment
+
+# What S3 answers a HEAD of a deleted key or an expired/unknown version with
+_MISSING_CODES = ("404", "400", "NoSuchKey", "NoSuchVersion", "NotFound")
+
+
+def find_stored(bucket: str, key: str, tip_hash: str) -> Optional[StoredSegment]:
+    """The indexed segment ending the log prefix with chain hash `tip_hash`, if any."""
+    return StoredSegment.objects.filter(bucket=bucket, key=key, tip_hash=tip_hash).first()
+
+
+def _exists(s3, bucket: str, key: str, version_id: Optional[str]) -> bool:
+    kwargs = {"Bucket": bucket, "Key": key}
+    if version_id:
+        kwargs["VersionId"] = version_id
+    try:
+        s3.head_object(**kwargs)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in _MISSING_CODES:
+            return False
+        raise
+    return True
+
+
+def still_stored(s3, row: StoredSegment) -> bool:
+    """
+    Whether what an index row points at is still in S3: its log version
+    or, for a row with only a segment, the segment object. The index
+    outlives objects (an emptied bucket, expired versions, rows left by an
+    in-memory test bucket), so a row is checked before an upload builds
+    on it.
+    """
+    if row.version_id:
+        return _exists(s3, row.bucket, row.key, row.version_id)
+    if row.segment_key:
+        return _exists(s3, row.bucket, row.segment_key, row.segment_version_id)
+    return False
+
+
+def record_stored(
+    bucket: str,
+    flight_id: str,
+    key: str,
+    tip_hash: str,
+    seq_no: int,
+    offset: int,
+    size: int,
+    version_id: Optional[str] = None,
+    segment: Optional[dict] = None,
+    prev_version_id: Optional[str] = None,
+) -> StoredSegment:
+    """
+    Record that bytes [offset, size) of a flight log, ending the prefix
+    with chain hash `tip_hash`, are persisted: as log version `version_id`
+    once that upload is confirmed, and/or as the segment object described
+    by the manifest entry `segment` (segmented layout), which is recorded
+    before its manifest so a retry does not upload it twice.
+    `prev_version_id` is the version holding bytes [0, offset), the one
+    this version follows in its chain (S3 version order does not say so
+    once a resumed run re-uploads part of a flight).
+
+    One INSERT ... ON CONFLICT DO UPDATE rather than update_or_create's
+    read-then-write transaction, which SQLite rejects ("database is
+    locked") when many upload threads record at once.
+    """
+    row = StoredSegment(
+        bucket=bucket,
+        key=key,
+        tip_hash=tip_hash,
+        flight_id=flight_id,
+        seq_no=seq_no,
+        offset=offset,
+        size=size,
+        version_id=version_id or "",
+        prev_version_id=prev_version_id or "",
+    )
+    update_fields = ["flight_id", "seq_no", "offset", "size", "version_id", "prev_version_id"]
+    if segment is not None:
+        row.segment_key = segment["key"]
+        row.segment_version_id = segment.get("versionId") or ""
+        row.stored_size = segment["storedSize"]
+        update_fields += ["segment_key", "segment_version_id", "stored_size"]
+    StoredSegment.objects.bulk_create(
+        [row],
+        update_conflicts=True,
+        unique_fields=["bucket", "key", "tip_hash"],
+        update_fields=update_fields,
+    )
+    return row
+
+
+def segment_entry(row: StoredSegment) -> dict:
+    """The manifest entry (storage.segments) of an indexed segment object."""
+    return {
+        "seq": row.seq_no,
+        "key": row.segment_key,
+        "versionId": row.segment_version_id or None,
+        "offset": row.offset,
+        "size": row.size - row.offset,
+        "storedSize": row.stored_size,
+        "tipHash": row.tip_hash,
+    }
@@ -0,0 +1,98 @@
+from typing import Optional
+
+# S3 multipart limits: every part except the last must be at least 5 MiB,
+# and a single UploadPartCopy can copy at most 5 GiB.
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_COPY_PART_SIZE = 5 * 1024 * 1024 * 1024
+
+LOG_CONTENT_TYPE = "text/plain; charset=utf-8"
+
+
+def put_full_version(s3, bucket: str, key: str, body) -> Optional[str]:
+    """
+    Upload `body` as a new version of `key` and return its VersionId.
+    """
+    resp = s3.put_object(
+        Bucket=bucket,
+        Key=key,
+        Body=body,
+        ContentType=LOG_CONTENT_TYPE,
+    )
+    return resp.get("VersionId")
+
+
+def can_append(prev_version_id: Optional[str], prev_size: int) -> bool:
+    """
+    An append needs a previous version big enough to be a multipart part.
+    """
+    return bool(prev_version_id) and prev_size >= MIN_PART_SIZE
+
+
+def _copy_ranges(size: int):
+    """
+    Split [0, size) into the fewest equal ranges that fit in one copy part.
+    """
+    count = -(-size // MAX_COPY_PART_SIZE)
+    step = -(-size // count)
+    return [(start, min(start + step, size)) for start in range(0, size, step)]
+
+
+def put_appended_version(
+    s3,
+    bucket: str,
+    key: str,
+    prev_version_id: str,
+    prev_size: int,
+    delta,
+) -> Optional[str]:
+    """
+    Create a new version of `key` equal to (previous version + delta)
+    without re-sending the previous bytes.
+
+    The previous version is copied server-side with UploadPartCopy and
+    only `delta` goes over the wire as the final part. The result is a
+    normal object version, so version history and VersionIds look exactly
+    like a full put_object. Callers must check `can_append` first.
+    """
+    mpu = s3.create_multipart_upload(
+        Bucket=bucket,
+        Key=key,
+        ContentType=LOG_CONTENT_TYPE,
+    )
+    upload_id = mpu["UploadId"]
+
+    try:
+        parts = []
+        for part_no, (start, end) in enumerate(_copy_ranges(prev_size), start=1):
+            resp = s3.upload_part_copy(
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=part_no,
+                CopySource={"Bucket": bucket, "Key": key, "VersionId": prev_version_id},
+                CopySourceRange=f"bytes={start}-{end - 1}",
+            )
+            parts.append({"PartNumber": part_no, "ETag": resp["CopyPartResult"]["ETag"]})
+
+        if len(delta):
+            part_no = len(parts) + 1
+            resp = s3.upload_part(
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=part_no,
+                Body=delta,
+            )
+            parts.append({"PartNumber": part_no, "ETag": resp["ETag"]})
+
+        done = s3.complete_multipart_upload(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={"Parts": parts},
+        )
+    except Exception:
+        s3.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise
+
+    return done.get("VersionId")
@@ -0,0 +1,44 @@
+# storage/urls.py
+
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("", views.home, name="home"),
+
+    # Flight log pages
+    path("flights/", views.flights_page, name="flights_page"),
+    path(
+        "flights/<str:flight_id>/versions/",
+        views.flight_versions_page,
+        name="flight_versions_page",
+    ),
+
+    # Download one version (streamed, Range-aware)
+    path(
+        "api/storage/flights/<str:flight_id>/versions/<str:version_id>/content",
+        views.flight_version_content,
+        name="flight_version_content",
+    ),
+
+    # Live tail of new versions (Server-Sent Events)
+    path(
+        "api/storage/flights/<str:flight_id>/tail",
+        views.flight_tail_events,
+        name="flight_tail_events",
+    ),
+
+    # Bytes appended between two versions of a flight log
+    path(
+        "api/storage/flights/<str:flight_id>/delta",
+        views.flight_delta,
+        name="flight_delta",
+    ),
+
+    # Telemetry summary from the columnar sidecars
+    path(
+        "api/storage/flights/<str:flight_id>/stats",
+        views.flight_stats,
+        name="flight_stats",
+    ),
+]
@@ -1,7 +1,24 @@
+from typing import Optional
+
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from .s3_client import s3_client, flight_key
+from django.db import transaction
+from django.db.models import Max
+
+from .models import FlightVersion, FlightVersionSync
+from .s3_client import s3_client, flight_key, is_segmented
+from .segments import annotate_log_sizes
 
 def list_flight_ids():
+    """
+    Flight ids: the <prefix>/<flight_id>/ directories of the bucket.
+
+    One list_objects_v2 call per 1000 flights with Delimiter="/", so each
+    flight's objects roll up into one common prefix however many versions,
+    segments (segmented layout) and column sidecars it has, and no
+    head_object per flight. A flight whose first upload never completed
+    is listed with no versions.
+    """
     s3 = s3_client()
     bucket = settings.AWS_S3_BUCKET
     prefix = settings.AWS_S3_FLIGHT_PREFIX.strip("/") + "/"
@@ -14,13 +31,9 @@ def list_flight_ids():
         resp = s3.list_objects_v2(**kwargs)
 
         for cp in resp.get("CommonPrefixes", []):
-            subprefix = cp.get("Prefix")
-            flight_id = subprefix[len(prefix):].strip("/")
-            try:
-                s3.head_object(Bucket=bucket, Key=flight_key(flight_id))
+            flight_id = cp["Prefix"][len(prefix):].strip("/")
+            if flight_id:
                 flights.append(flight_id)
-            except s3.exceptions.ClientError:
-                pass
 
         if resp.get("IsTruncated"):
             token = resp["NextContinuationToken"]
@@ -29,22 +42,164 @@ def list_flight_ids():
 
     return sorted(flights)
 
-def list_versions(flight_id: str):
-    s3 = s3_client()
-    bucket = settings.AWS_S3_BUCKET
+# First page size when the index already has versions: usually only a
+# handful are new, so there is no need to pull a full 1000-entry page.
+INCREMENTAL_PAGE_SIZE = 50
+
+
+def _iter_new_versions(s3, bucket: str, key: str, known: set, page_size: int):
+    """
+    Yield S3 versions of `key` newest first, paging through
+    list_object_versions, and stop at the first already-indexed version.
+    """
+    kwargs = {"Bucket": bucket, "Prefix": key, "MaxKeys": page_size}
+    while True:
+        resp = s3.list_object_versions(**kwargs)
+        for v in resp.get("Versions", []):
+            if v.get("Key") != key:
+                # Versions are grouped by key and our key sorts first
+                return
+            if v.get("VersionId") in known:
+                return
+            yield v
+
+        if not resp.get("IsTruncated"):
+            return
+        kwargs.update({
+            "KeyMarker": resp["NextKeyMarker"],
+            "VersionIdMarker": resp["NextVersionIdMarker"],
+            "MaxKeys": 1000,
+        })
+
+
+def _known_version_ids(flight_id: str) -> set:
+    return set(
+        FlightVersion.objects.filter(flight_id=flight_id).values_list("version_id", flat=True)
+    )
+
+
+def _fetch_new_versions(flight_id: str, known: set) -> list:
+    s3, bucket, key = s3_client(), settings.AWS_S3_BUCKET, flight_key(flight_id)
+    page_size = INCREMENTAL_PAGE_SIZE if known else 1000
+    new = list(_iter_new_versions(s3, bucket, key, known, page_size))
+    if is_segmented():
+        # Index the log size of each version, not the manifest's
+        annotate_log_sizes(s3, bucket, key, new)
+    return new
+
+
+def _store_new_versions(flight_id: str, new: list) -> int:
     key = flight_key(flight_id)
+    with transaction.atomic():
+        if new:
+            last_seq = (
+                FlightVersion.objects.filter(flight_id=flight_id)
+                .aggregate(m=Max("seq"))["m"] or 0
+            )
+            FlightVersion.objects.filter(flight_id=flight_id, is_latest=True).update(is_latest=False)
+            FlightVersion.objects.bulk_create(
+                [
+                    FlightVersion(
+                        flight_id=flight_id,
+                        key=key,
+                        version_id=v.get("VersionId"),
+                        seq=last_seq + i,
+                        size=v.get("Size") or 0,
+                        etag=v.get("ETag") or "",
+                        last_modified=v.get("LastModified"),
+                        is_latest=bool(v.get("IsLatest")),
+                    )
+                    # oldest first, so seq follows upload order
+                    for i, v in enumerate(reversed(new), start=1)
+                ],
+                ignore_conflicts=True,
+            )
+        FlightVersionSync.objects.update_or_create(flight_id=flight_id, defaults={"key": key})
+
+    return len(new)
+
 
-    resp = s3.list_object_versions(Bucket=bucket, Prefix=key)
-    versions = [
-        {
-            "version_id": v.get("VersionId"),
-            "is_latest": v.get("IsLatest"),
-            "size": v.get("Size"),
-            "last_modified": v.get("LastModified"),
-            "etag": v.get("ETag"),
+def sync_versions(flight_id: str):
+    """
+    Bring the local version index for `flight_id` up to date.
+
+    Only versions newer than the newest indexed one are fetched (S3 lists
+    versions newest first), so a refresh is usually a single small list
+    call. Returns the number of new versions stored.
+    """
+    known = _known_version_ids(flight_id)
+    return _store_new_versions(flight_id, _fetch_new_versions(flight_id, known))
+
+
+async def async_sync_versions(flight_id: str):
+    """
+    sync_versions for async views: the ORM steps run on Django's
+    thread-sensitive executor, the S3 listing on a free worker thread so
+    concurrent requests do not queue behind each other's S3 round trips.
+    """
+    known = await sync_to_async(_known_version_ids)(flight_id)
+    new = await sync_to_async(_fetch_new_versions, thread_sensitive=False)(flight_id, known)
+    return await sync_to_async(_store_new_versions)(flight_id, new)
+
+
+def version_page(flight_id: str, before: Optional[int] = None, limit: int = 50, sync: bool = True):
+    """
+    One page of the version index, newest first, using the `seq` of the
+    last version shown as the cursor. Returns (key, versions, next_cursor);
+    next_cursor is None on the last page.
+    """
+    if sync:
+        sync_versions(flight_id)
+
+    qs = FlightVersion.objects.filter(flight_id=flight_id).order_by("-seq")
+    if before is not None:
+        qs = qs.filter(seq__lt=before)
+    rows = list(qs[:limit + 1])
+    next_cursor = rows[limit - 1].seq if len(rows) > limit else None
+
+    return flight_key(flight_id), [_version_dict(v) for v in rows[:limit]], next_cursor
+
+
+async def async_version_page(flight_id: str, before: Optional[int] = None, limit: int = 50):
+    """version_page for async views (see async_sync_versions)."""
+    await async_sync_versions(flight_id)
+    return await sync_to_async(version_page)(flight_id, before=before, limit=limit, sync=False)
+
+
+async def async_find_versions(flight_id: str, version_ids) -> dict:
+    """
+    Indexed FlightVersion rows for `version_ids` of one flight, keyed by
+    VersionId. The index is refreshed once if any id is not in it yet;
+    ids that still do not exist are left out.
+    """
+    def lookup():
+        return {
+            v.version_id: v
+            for v in FlightVersion.objects.filter(flight_id=flight_id, version_id__in=version_ids)
         }
-        for v in resp.get("Versions", []) if v.get("Key") == key
-    ]
-    # newest first
-    versions.sort(key=lambda x: x["last_modified"], reverse=True)
+
+    found = await sync_to_async(lookup)()
+    if len(found) < len(set(version_ids)):
+        await async_sync_versions(flight_id)
+        found = await sync_to_async(lookup)()
+    return found
+
+
+def list_versions(flight_id: str):
+    """
+    All versions of a flight, newest first, served from the local index
+    after an incremental refresh.
+    """
+    key, versions, _ = version_page(flight_id, limit=2**31)
     return key, versions
+
+
+def _version_dict(v) -> dict:
+    return {
+        "version_id": v.version_id,
+        "seq": v.seq,
+        "is_latest": v.is_latest,
+        "size": v.size,
+        "last_modified": v.last_modified,
+        "etag": v.etag,
+    }
@@ -1,18 +1,242 @@
+from asgiref.sync import sync_to_async
+from botocore.exceptions import ClientError
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import render, get_object_or_404
-from .utils import list_flight_ids, list_versions
+from django.utils.http import http_date
+from services.metrics import track
+from .columns import cached_stats, version_parts, version_stats
+from .models import FlightVersion
+from .s3_client import s3_client, flight_key, is_segmented
+from .segments import iter_range, range_fetcher, read_manifest
+from .streaming import stream_body, stream_chunks
+from .tail import event_stream
+from .uploads import LOG_CONTENT_TYPE
+from .utils import list_flight_ids, async_find_versions, async_sync_versions, async_version_page
 
-def flights_page(request):
-    flights = list_flight_ids()
-    return render(request, "flights.html", {"flights": flights})
+VERSIONS_PER_PAGE = 50
 
-def flight_versions_page(request, flight_id: str):
-    key, versions = list_versions(flight_id)
+
+async def flights_page(request):
+    # S3 only, no ORM: run it off the thread-sensitive executor
+    flights = await sync_to_async(list_flight_ids, thread_sensitive=False)()
+    return _render(request, "flights.html", {"flights": flights})
+
+async def flight_versions_page(request, flight_id: str):
+    # Cursor pagination over the local version index: ?before=<seq>
+    before = request.GET.get("before")
+    before = int(before) if before and before.isdigit() else None
+
+    key, versions, next_cursor = await async_version_page(
+        flight_id, before=before, limit=VERSIONS_PER_PAGE
+    )
     context = {
         "flight_id": flight_id,
         "key": key,
         "versions": versions,  # last_modified is a datetime; template can format it
+        "next_cursor": next_cursor,
+        "is_first_page": before is None,
     }
-    return render(request, "versions.html", context)
+    return _render(request, "versions.html", context)
+
+# -----------------------------
+# DELTA BETWEEN TWO VERSIONS
+# GET /api/storage/flights/<flight_id>/delta?from=<version_id>&to=<version_id>
+# Each version is a byte prefix of the next, so the change from `from`
+# to `to` is bytes [size(from), size(to)) of `to`: one Range GET (or,
+# segmented, just the segments covering it).
+# -----------------------------
+async def flight_delta(request, flight_id: str):
+    from_id = request.GET.get("from")
+    to_id = request.GET.get("to")
+    if not from_id or not to_id:
+        return JsonResponse({"error": "from and to version ids are required"}, status=400)
+
+    versions = await async_find_versions(flight_id, [from_id, to_id])
+    unknown = [v for v in (from_id, to_id) if v not in versions]
+    if unknown:
+        return JsonResponse({"error": f"Unknown version(s): {', '.join(unknown)}"}, status=404)
+
+    old, new = versions[from_id], versions[to_id]
+    if old.seq > new.seq or old.size > new.size:
+        return JsonResponse({"error": "from must not be newer than to"}, status=400)
+
+    data = await sync_to_async(range_fetcher(), thread_sensitive=False)(
+        s3_client(), settings.AWS_S3_BUCKET, new.key, new.version_id, old.size, new.size
+    )
+
+    response = HttpResponse(data, content_type=LOG_CONTENT_TYPE)
+    response["X-Delta-From-Version"] = old.version_id
+    response["X-Delta-To-Version"] = new.version_id
+    response["X-Delta-Offset"] = str(old.size)
+    response["X-Delta-Total-Size"] = str(new.size)
+    return response
+
+# -----------------------------
+# DOWNLOAD ONE VERSION
+# GET /api/storage/flights/<flight_id>/versions/<version_id>/content
+# Streams the S3 body chunk by chunk; a client Range header is passed
+# through to S3 (206 / 416), so downloads can be resumed or split.
+# -----------------------------
+async def flight_version_content(request, flight_id: str, version_id: str):
+    if is_segmented():
+        return await _segmented_version_content(request, flight_id, version_id)
+
+    s3 = s3_client()
+    params = {
+        "Bucket": settings.AWS_S3_BUCKET,
+        "Key": flight_key(flight_id),
+        "VersionId": version_id,
+    }
+    range_header = request.headers.get("Range")
+
+    try:
+        obj = await sync_to_async(s3.get_object, thread_sensitive=False)(
+            **params, **({"Range": range_header} if range_header else {})
+        )
+    except ClientError as e:
+        code = e.response.get("Error", {}).get("Code")
+        error = _version_error(code)
+        if error is not None:
+            return error
+        if code == "InvalidRange":
+            head = await sync_to_async(s3.head_object, thread_sensitive=False)(**params)
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{head['ContentLength']}"
+            return response
+        raise
+
+    response = StreamingHttpResponse(
+        stream_body(request, obj["Body"]),
+        status=206 if obj.get("ContentRange") else 200,
+        content_type=obj.get("ContentType") or LOG_CONTENT_TYPE,
+    )
+    response["Content-Length"] = str(obj["ContentLength"])
+    if obj.get("ContentRange"):
+        response["Content-Range"] = obj["ContentRange"]
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = obj["ETag"]
+    response["Last-Modified"] = http_date(obj["LastModified"].timestamp())
+    response["Content-Disposition"] = f'attachment; filename="{flight_id}-{version_id}.log"'
+    return response
+
+
+async def _segmented_version_content(request, flight_id: str, version_id: str):
+    # The log is rebuilt from the version's manifest, decompressing only
+    # the segments the (single) requested range covers.
+    s3, bucket = s3_client(), settings.AWS_S3_BUCKET
+    try:
+        manifest = await sync_to_async(read_manifest, thread_sensitive=False)(
+            s3, bucket, flight_key(flight_id), version_id
+        )
+    except ClientError as e:
+        error = _version_error(e.response.get("Error", {}).get("Code"))
+        if error is not None:
+            return error
+        raise
+
+    size = manifest["size"]
+    try:
+        byte_range = _parse_range(request.headers.get("Range"), size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+    start, end = byte_range or (0, size)
+
+    response = StreamingHttpResponse(
+        stream_chunks(request, iter_range(s3, bucket, manifest, start, end)),
+        status=206 if byte_range else 200,
+        content_type=LOG_CONTENT_TYPE,
+    )
+    response["Content-Length"] = str(end - start)
+    if byte_range:
+        response["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = f'"{version_id}"'  # manifest versions never change
+    response["Content-Disposition"] = f'attachment; filename="{flight_id}-{version_id}.log"'
+    return response
+
+
+def _version_error(code):
+    if code in ("NoSuchKey", "NoSuchVersion", "404"):
+        return JsonResponse({"error": "Unknown flight or version"}, status=404)
+    if code == "InvalidArgument":
+        return JsonResponse({"error": "Invalid version id"}, status=400)
+    return None
+
+
+def _parse_range(header, size: int):
+    """
+    [start, end) of a single "bytes=" Range header, or None to send the
+    whole log (no header, several ranges, or one we do not understand,
+    as RFC 9110 allows). Raises ValueError when the range cannot be
+    satisfied.
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, sep, last = header[len("bytes="):].strip().partition("-")
+    if not sep or not (first.isdigit() or last.isdigit()):
+        return None
+    if not first:
+        # suffix range: the last N bytes
+        if int(last) == 0 or size == 0:
+            raise ValueError(header)
+        return max(size - int(last), 0), size
+    if not first.isdigit() or (last and not last.isdigit()):
+        return None
+    start = int(first)
+    end = min(int(last) + 1, size) if last else size
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError(header)
+    return start, end
+
+# -----------------------------
+# LIVE TAIL (Server-Sent Events)
+# GET /api/storage/flights/<flight_id>/tail
+# Pushes each new version's appended bytes, VersionId and tipHash; all
+# viewers of a flight share one S3 poller (see storage.tail).
+# -----------------------------
+async def flight_tail_events(request, flight_id: str):
+    response = StreamingHttpResponse(event_stream(request, flight_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # let nginx pass events through
+    return response
+
+# -----------------------------
+# TELEMETRY STATS
+# GET /api/storage/flights/<flight_id>/stats[?version=<version_id>]
+# Duration, sample rate and per-column stats (altitude, speed, ...) of a
+# version (default: latest), computed with NumPy from the columnar
+# sidecars rather than the raw log (see storage.columns).
+# -----------------------------
+async def flight_stats(request, flight_id: str):
+    version_id = request.GET.get("version")
+    if version_id:
+        found = await async_find_versions(flight_id, [version_id])
+        version = found.get(version_id)
+    else:
+        await async_sync_versions(flight_id)
+        version = await FlightVersion.objects.filter(flight_id=flight_id).order_by("-seq").afirst()
+    if version is None:
+        return JsonResponse({"error": "Unknown flight or version"}, status=404)
+
+    bucket = settings.AWS_S3_BUCKET
+    stats = cached_stats(bucket, version.version_id)
+    if stats is None:
+        parts = await sync_to_async(version_parts)(flight_id, version)
+        stats = await sync_to_async(version_stats, thread_sensitive=False)(
+            s3_client(), bucket, flight_id, version, parts
+        )
+    return JsonResponse(stats)
 
 def home(request):
-    return render(request, "base.html")
+    return _render(request, "base.html")
+
+
+def _render(request, template: str, context=None):
+    # Timed separately from S3/RPC work in the request metrics
+    with track("template", template):
+        return render(request, template, context)
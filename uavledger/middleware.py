@@ -0,0 +1,77 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from services.metrics import REQUEST_SECONDS, begin_request, end_request
+
+# Label for requests that never reached a view (404s), to keep the
+# number of series bounded.
+UNMATCHED_VIEW = "unmatched"
+
+
+def _server_timing(timings, total: float) -> str:
+    """Server-Timing value: totals per category, then per RPC method / S3 op."""
+    parts = [f"total;dur={total * 1000:.1f}"]
+    for category, (count, seconds) in sorted(timings.by_category().items()):
+        parts.append(f'{category};dur={seconds * 1000:.1f};desc="{count} calls"')
+    for (category, name), (count, seconds) in sorted(timings.totals.items()):
+        parts.append(f'{category}.{name};dur={seconds * 1000:.1f};desc="{count} calls"')
+    return ", ".join(parts)
+
+
+class RequestMetricsMiddleware:
+    """
+    Times each request and collects the RPC / S3 / template calls made
+    while serving it (see services.metrics) under the resolved view name.
+
+    Durations go to the histograms served at /metrics; with DEBUG on,
+    the per-request breakdown is also sent as a Server-Timing header.
+    Works for sync and async views.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token, timings = self._begin(request)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        return self._finish(request, response, timings, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        token, timings = self._begin(request)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        return self._finish(request, response, timings, time.perf_counter() - start)
+
+    def _begin(self, request):
+        token, timings = begin_request()
+        timings.view = UNMATCHED_VIEW
+        request.metrics_timings = timings
+        return token, timings
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        # Resolved before the view runs, so its calls carry the view name
+        match = request.resolver_match
+        request.metrics_timings.view = match.view_name if match else UNMATCHED_VIEW
+        return None
+
+    def _finish(self, request, response, timings, total: float):
+        REQUEST_SECONDS.observe(total, timings.view, request.method, str(response.status_code))
+        if settings.DEBUG:
+            response["Server-Timing"] = _server_timing(timings, total)
+        return response
@@ -46,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so it times the whole stack (see /metrics)
+    'uavledger.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -134,7 +136,24 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AWS_REGION = os.environ.get("AWS_REGION", "us-east-1")
 AWS_S3_BUCKET = os.environ.get("AWS_S3_BUCKET", "")
 AWS_S3_FLIGHT_PREFIX = os.environ.get("AWS_S3_FLIGHT_PREFIX", "flights/")  # prefix for keys
+# "object": one cumulative flight.log, an S3 version per checkpoint.
+# "segmented": one gzip segment per checkpoint plus a versioned manifest.json
+# (see storage.segments).
+AWS_S3_FLIGHT_LAYOUT = os.environ.get("AWS_S3_FLIGHT_LAYOUT", "object")
+
+# Telemetry columns (storage.columns): field names of headerless log lines,
+# which of them is the timestamp, and its unit in seconds (0.001 = ms).
+TELEMETRY_COLUMNS = tuple(os.environ.get("TELEMETRY_COLUMNS", "t,lat,lon,alt,speed,battery").split(","))
+TELEMETRY_TIME_COLUMN = os.environ.get("TELEMETRY_TIME_COLUMN", "t")
+TELEMETRY_TIME_SCALE = float(os.environ.get("TELEMETRY_TIME_SCALE", "0.001"))
 
 # AWS creds: prefer IAM role in prod; use env for local only
 AWS_ACCESS_KEY_ID = os.environ.get("AWS_ACCESS_KEY_ID", "")
-AWS_SECRET_ACCESS_KEY = os.environ.get("AWS_SECRET_ACCESS_KEY", "")
\ No newline at end of file
+AWS_SECRET_ACCESS_KEY = os.environ.get("AWS_SECRET_ACCESS_KEY", "")
+
+# S3 client tuning (one shared, pooled client per process)
+AWS_S3_MAX_POOL_CONNECTIONS = int(os.environ.get("AWS_S3_MAX_POOL_CONNECTIONS", "50"))
+AWS_S3_RETRY_MODE = os.environ.get("AWS_S3_RETRY_MODE", "standard")  # legacy | standard | adaptive
+AWS_S3_MAX_ATTEMPTS = int(os.environ.get("AWS_S3_MAX_ATTEMPTS", "5"))
+AWS_S3_CONNECT_TIMEOUT = float(os.environ.get("AWS_S3_CONNECT_TIMEOUT", "5"))
+AWS_S3_READ_TIMEOUT = float(os.environ.get("AWS_S3_READ_TIMEOUT", "60"))
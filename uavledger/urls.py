@@ -1,10 +1,13 @@
 from django.contrib import admin
-from django.urls import path
+from django.urls import include, path
 
-from .views import chain_info_view
+from .views import chain_info_view, metrics_view
 
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/chain-info/", chain_info_view, name="chain-info"),
+    path("metrics", metrics_view, name="metrics"),
+    path("", include("ledger.urls")),
+    path("", include("storage.urls")),
 ]
@@ -1,6 +1,7 @@
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 
 from services.eth_client import get_chain_info
+from services.metrics import render_metrics
 
 
 def chain_info_view(request):
@@ -12,3 +13,11 @@ def chain_info_view(request):
     """
     data = get_chain_info()
     return JsonResponse(data)
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint: request, RPC, S3 and template timing
+    histograms per view (collected by RequestMetricsMiddleware).
+    """
+    return HttpResponse(render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8")